@@ -2,24 +2,71 @@
 Handelsalgorithmus – Einstiegspunkt
 ────────────────────────────────────
 Führt die TA-Analyse für alle Ticker aus tickers.txt durch.
+Kursabruf und Indikator-Berechnung laufen parallel (siehe src/scanner.py).
+Liegt ein ML-Modell vor (src/ml/inference.py), werden nach dem Scan alle
+Ticker in einem Batch-Aufruf bewertet und die Wahrscheinlichkeit neben dem
+TA-Ergebnis ausgegeben; ohne Modell erscheinen die Ergebnisse, sobald ein
+Ticker fertig ist.
 
 Verwendung:
     python main.py
+    python main.py --workers 4 --fetch-workers 8 --timeout 60
+    python main.py --panel          # Kurse vorab als Memory-Map, Worker ohne Datenladen
+    python main.py --no-ml          # ohne ML-Bewertung
 """
 
-from src.data.feature_store import get_features
-from src.data.price_fetcher import load_tickers
-from src.ta.TA_run import run, print_signal
+import argparse
+
+from src.data.price_fetcher import load_tickers, materialize_panel
+from src.ml import inference
+from src.scanner import FETCH_WORKERS, TIMEOUT, scan
+from src.ta.TA_run import print_signal
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="TA-Analyse für alle Ticker aus tickers.txt")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Prozesse für die Indikator-Berechnung (Standard: CPU-Kerne)")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS,
+                        help=f"Threads für den Kursabruf (Standard: {FETCH_WORKERS})")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT,
+                        help=f"Zeitlimit je Ticker und Stufe in Sekunden (Standard: {TIMEOUT:g})")
+    parser.add_argument("--panel", action="store_true",
+                        help="Kurse vorab als Memory-Map-Panel schreiben, Worker rechnen ohne Feature Store")
+    parser.add_argument("--no-ml", action="store_true",
+                        help="ML-Modell nicht laden, nur TA-Signale ausgeben")
+    return parser.parse_args()
 
 
 def main():
+    args = _parse_args()
     tickers = load_tickers()
     print(f"Analysiere {len(tickers)} Ticker...\n")
 
-    for ticker in tickers:
-        df = get_features(ticker)
-        result = run(df, ticker=ticker)
-        print_signal(result)
+    panel = materialize_panel(tickers) if args.panel else None
+    model = None if args.no_ml else inference.load_model()
+
+    fehler, ergebnisse = [], []
+    for item in scan(tickers, workers=args.workers, fetch_workers=args.fetch_workers,
+                     timeout=args.timeout, panel=panel):
+        if item["error"]:
+            fehler.append(item)
+            print(f"[main] {item['ticker']}: übersprungen – {item['error']}")
+        elif model is None:
+            print_signal(item["result"])
+        else:
+            ergebnisse.append(item["result"])
+
+    if ergebnisse:
+        # Ein predict-Aufruf für alle Ticker statt je Ticker
+        ml = inference.predict_latest([r["ticker"] for r in ergebnisse], model)
+        for result in ergebnisse:
+            result.update(ml.get(result["ticker"], {"ml_prob": None, "ml_datum": None}))
+            print_signal(result)
+
+    if fehler:
+        print(f"\n[main] {len(fehler)} von {len(tickers)} Ticker(n) fehlgeschlagen: "
+              + ", ".join(item["ticker"] for item in fehler))
 
 
 if __name__ == "__main__":
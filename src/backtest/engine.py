@@ -0,0 +1,339 @@
+"""
+Backtest: vektorisierte Engine mit Walk-Forward
+───────────────────────────────────────────────
+Setzt die BUY/WATCH/NEUTRAL-Klassifikation aus TA_run für jeden Tag und
+jeden Ticker in Positionen um und bewertet das Ergebnis über das ganze
+Universum – ohne run() je Tag und Ticker.
+
+Ablauf:
+    1. prepare(frames)   : Signal-Matrix je Ticker (score_history) →
+                           Würfel Signal × Datum × Ticker + Schlusskurse
+    2. simulate(data)    : Score = Σ weight × Signal, Klassifikation wie
+                           _classify(), Positionen, Portfolio-Returns, Trades
+    3. walk_forward(data): chronologische In-/Out-of-Sample-Blöcke
+                           (expandierend oder rollierend, 03d_backtesting.md)
+
+Handelsmodell:
+    - Long-only. Signal am Schlusskurs von Tag t → Position von t bis t+1
+      (keine Vorausschau: alle Indikatoren sind kausal)
+    - Gleichgewichtet über alle gehaltenen Ticker, Rest Cash (Return 0)
+    - Kosten je Seite auf den Umschlag der Portfolio-Gewichte
+      (Standard 0,05 % – Floor-Trader-Kosten nach Fama/Blume, 03d)
+    - Tage ohne Kurs eines Tickers (vor Börsengang, Lücken) → keine Position
+
+Metriken (03d_backtesting.md):
+    total_return, annual_return (geometrisch), sharpe, max_drawdown,
+    profit_mdd, trades, hit_rate, avg_trade (Ø Return/Trade), wwr, exposure
+
+Verwendung:
+    from src.backtest.engine import prepare, simulate, walk_forward
+
+    data = prepare({t: get_features(t) for t in tickers})
+    res  = simulate(data)                         # Modul-WEIGHTS, Einstieg bei BUY
+    res["metrics"]["sharpe"], res["equity"]
+
+    wf = walk_forward(data, n_blocks=4, train_ratio=0.7)
+    wf["oos_metrics"], wf["blocks"]
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.ta.TA_run import SCORE_THRESHOLDS, WEIGHTS, score_history
+
+TRADING_DAYS  = 252
+COST_PER_SIDE = 0.0005     # 0,05 % je Seite (0,1 % Round-Trip)
+
+# Einstieg → Mindest-Anteil an sum(weights)
+ENTRY_LEVELS = {
+    "BUY":   "MITTEL",     # BUY (MITTEL oder STARK)
+    "STARK": "STARK",      # nur BUY / STARK
+    "WATCH": "WATCH",      # ab WATCH
+}
+
+
+# ── Vorbereitung ──────────────────────────────────────────────────────────────
+
+def prepare(frames: dict[str, pd.DataFrame]) -> dict:
+    """
+    Baut die Signal-Matrix des ganzen Universums auf gemeinsamem Kalender.
+
+    Parameter:
+        frames : {ticker: DataFrame mit Indikatoren (z.B. get_features)
+                  oder OHLCV → Indikatoren werden berechnet}
+
+    Rückgabe:
+        dict mit:
+            signals      : ndarray bool (Signal × Datum × Ticker), n/a = False
+            close        : ndarray float64 (Datum × Ticker), NaN = kein Kurs
+            dates        : DatetimeIndex (Vereinigung aller Handelstage)
+            tickers      : list[str]
+            signal_names : list[str] – Reihenfolge wie _evaluate_signals()
+    """
+    tickers = list(frames)
+    histories = {t: score_history(frames[t]) for t in tickers}
+
+    close = pd.concat({t: frames[t]["Close"] for t in tickers}, axis=1).sort_index()
+    dates = close.index
+    signal_names = list(next(iter(histories.values()))["signals"].columns) if tickers else list(WEIGHTS)
+
+    signals = np.zeros((len(signal_names), len(dates), len(tickers)), dtype=bool)
+    for j, ticker in enumerate(tickers):
+        fired = histories[ticker]["signals"].reindex(dates).fillna(False).to_numpy(dtype=bool)
+        signals[:, :, j] = fired.T
+
+    return {
+        "signals":      signals,
+        "close":        close.to_numpy(dtype=np.float64),
+        "dates":        dates,
+        "tickers":      tickers,
+        "signal_names": signal_names,
+    }
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _scores(data: dict, weights: dict[str, float]) -> np.ndarray:
+    """
+    Score (Datum × Ticker) = Σ weight × Signal.
+    Summiert Signal für Signal in derselben Reihenfolge wie _compute_score()
+    → identische Scores, ohne den Würfel in float zu kopieren.
+    """
+    score = np.zeros(data["close"].shape)
+    for k, name in enumerate(data["signal_names"]):
+        score += np.where(data["signals"][k], weights[name], 0.0)
+    return score
+
+
+def _daily_returns(close: np.ndarray) -> np.ndarray:
+    """r[t] = close[t] / close[t-1] - 1; erster Tag und Tage ohne Kurs → 0."""
+    r = np.zeros_like(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r[1:] = close[1:] / close[:-1] - 1.0
+    return np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _trades(held: np.ndarray, returns: np.ndarray, cost: float) -> np.ndarray:
+    """
+    Return je Trade (zusammenhängende Halte-Phase eines Tickers), netto nach
+    Kosten für Ein- und Ausstieg. Vektorisiert über kumulierte Log-Returns.
+    """
+    n_days = held.shape[0]
+    log_cum = np.cumsum(np.log1p(returns), axis=0)
+
+    edges  = np.diff(np.vstack([np.zeros((1, held.shape[1]), dtype=np.int8),
+                                held.astype(np.int8),
+                                np.zeros((1, held.shape[1]), dtype=np.int8)]), axis=0)
+    # Spaltenweise (Ticker für Ticker) → Ein- und Ausstiege paaren sich in Reihenfolge
+    entry_t, entry_c = np.nonzero(edges.T == 1)[::-1]
+    exit_t,  _       = np.nonzero(edges.T == -1)[::-1]
+    # Gehalten an Tagen entry..exit-1 → Returns der Tage entry+1..exit
+    last = np.minimum(exit_t, n_days - 1)
+    gross = np.exp(log_cum[last, entry_c] - log_cum[entry_t, entry_c]) - 1.0
+    return gross - 2 * cost
+
+
+def _metrics(returns: np.ndarray, trades: np.ndarray, exposure: float) -> dict:
+    equity = np.cumprod(1.0 + returns)
+    total  = float(equity[-1] - 1.0) if len(equity) else 0.0
+    years  = len(returns) / TRADING_DAYS
+
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity) if len(equity) else np.zeros(0)
+    mdd = float(drawdown.max()) if len(drawdown) else 0.0
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+
+    wins, losses = trades[trades > 0], trades[trades <= 0]
+    return {
+        "total_return":  round(total, 6),
+        "annual_return": round((1.0 + total) ** (1.0 / years) - 1.0, 6) if years > 0 and total > -1 else None,
+        "sharpe":        round(float(returns.mean() / std * np.sqrt(TRADING_DAYS)), 4) if std > 0 else None,
+        "max_drawdown":  round(mdd, 6),
+        "profit_mdd":    round(total / mdd, 4) if mdd > 0 else None,
+        "trades":        int(len(trades)),
+        "hit_rate":      round(len(wins) / len(trades), 4) if len(trades) else None,
+        "avg_trade":     round(float(trades.mean()), 6) if len(trades) else None,
+        "wwr":           round(float(wins.mean() / -losses.mean()), 4)
+                         if len(wins) and len(losses) and losses.mean() < 0 else None,
+        "exposure":      round(exposure, 4),
+    }
+
+
+# ── Simulation ────────────────────────────────────────────────────────────────
+
+def positions(
+    data: dict,
+    weights: dict[str, float] | None = None,
+    thresholds: dict[str, float] | None = None,
+    entry: str = "BUY",
+) -> np.ndarray:
+    """
+    Positionen (Datum × Ticker, bool): Score-Anteil ≥ Schwelle der Einstiegsstufe.
+
+    Parameter:
+        weights    : Eigene Weights (Standard: Modul-WEIGHTS)
+        thresholds : Eigene Schwellen (Standard: SCORE_THRESHOLDS)
+        entry      : 'BUY' | 'STARK' | 'WATCH' (siehe ENTRY_LEVELS)
+    """
+    w = weights if weights is not None else WEIGHTS
+    t = thresholds if thresholds is not None else SCORE_THRESHOLDS
+    score_max = sum(w.values())
+    if score_max == 0:
+        return np.zeros(data["close"].shape, dtype=bool)
+
+    held = _scores(data, w) / score_max >= t[ENTRY_LEVELS[entry]]
+    return held & ~np.isnan(data["close"])
+
+
+def simulate(
+    data: dict,
+    weights: dict[str, float] | None = None,
+    thresholds: dict[str, float] | None = None,
+    entry: str = "BUY",
+    cost: float = COST_PER_SIDE,
+    start: int = 0,
+    end: int | None = None,
+    held: np.ndarray | None = None,
+) -> dict:
+    """
+    Simuliert das gleichgewichtete Long-Portfolio im Zeitraum [start, end).
+
+    Positionen außerhalb des Zeitraums werden verworfen: der erste Tag
+    eröffnet, der letzte Tag schließt alle Positionen (inkl. Kosten).
+
+    Parameter:
+        data       : Ergebnis von prepare()
+        weights    : Eigene Weights (Standard: Modul-WEIGHTS)
+        thresholds : Eigene Schwellen (Standard: SCORE_THRESHOLDS)
+        entry      : 'BUY' | 'STARK' | 'WATCH'
+        cost       : Kosten je Seite als Anteil (0.0005 = 0,05 %)
+        start, end : Zeilen-Indizes in data["dates"] (Standard: alles)
+        held       : vorberechnete positions() – spart die Score-Berechnung,
+                     wenn nur der Zeitraum wechselt
+
+    Rückgabe:
+        dict mit:
+            returns : Series – Portfolio-Return je Tag (netto)
+            equity  : Series – kumulierte Equity-Kurve (Start 1.0)
+            trades  : ndarray – Netto-Return je Trade
+            metrics : dict (siehe Modul-Docstring)
+    """
+    end = len(data["dates"]) if end is None else end
+    if held is None:
+        held = positions(data, weights, thresholds, entry)
+
+    held = held[start:end].copy()
+    held[-1:] = False                  # letzter Tag: alles schließen
+    r = _daily_returns(data["close"][start:end])
+
+    count  = held.sum(axis=1, keepdims=True)
+    weight = np.divide(held, count, out=np.zeros(held.shape), where=count > 0)
+    prev   = np.vstack([np.zeros((1, weight.shape[1])), weight[:-1]])
+
+    # Gewichte vom Vortag verdienen den heutigen Return; Umschlag kostet heute
+    gross    = (prev * r).sum(axis=1)
+    turnover = np.abs(weight - prev).sum(axis=1)
+    returns  = gross - cost * turnover
+
+    trades   = _trades(held, r, cost)
+    exposure = float((count[:, 0] > 0).mean()) if len(count) else 0.0
+
+    index = data["dates"][start:end]
+    return {
+        "returns": pd.Series(returns, index=index),
+        "equity":  pd.Series(np.cumprod(1.0 + returns), index=index),
+        "trades":  trades,
+        "metrics": _metrics(returns, trades, exposure),
+    }
+
+
+# ── Walk-Forward ──────────────────────────────────────────────────────────────
+
+def walk_forward_splits(
+    n_dates: int,
+    n_blocks: int = 4,
+    train_ratio: float = 0.7,
+    mode: str = "expanding",
+) -> list[dict]:
+    """
+    Chronologische Train/Test-Blöcke (Zeilen-Indizes, Ende exklusiv).
+
+    Die letzten (1 - train_ratio) der Historie werden in n_blocks
+    aufeinanderfolgende Test-Fenster geteilt. Training:
+        expanding : alles vor dem Test-Fenster (Serafini 2019)
+        rolling   : festes Fenster gleicher Länge wie im ersten Block
+
+    Rückgabe:
+        [{"train": (start, end), "test": (start, end)}, ...]
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError(f"Unbekannter Walk-Forward-Modus: {mode!r} (erlaubt: 'expanding', 'rolling')")
+
+    first_test = int(round(n_dates * train_ratio))
+    bounds = np.linspace(first_test, n_dates, n_blocks + 1).round().astype(int)
+
+    splits = []
+    for test_start, test_end in zip(bounds[:-1], bounds[1:]):
+        train_start = 0 if mode == "expanding" else max(0, int(test_start) - first_test)
+        splits.append({"train": (train_start, int(test_start)), "test": (int(test_start), int(test_end))})
+    return splits
+
+
+def walk_forward(
+    data: dict,
+    candidates: list[dict] | None = None,
+    metric: str = "sharpe",
+    n_blocks: int = 4,
+    train_ratio: float = 0.7,
+    mode: str = "expanding",
+    entry: str = "BUY",
+    cost: float = COST_PER_SIDE,
+) -> dict:
+    """
+    Walk-Forward-Test: je Block Parameter auf Train wählen, auf Test bewerten.
+
+    Parameter:
+        data       : Ergebnis von prepare()
+        candidates : Parameter-Sätze [{"weights": {...}, "thresholds": {...}}, ...]
+                     (fehlende Schlüssel → Modul-Standard). None = nur Standard,
+                     d.h. reiner Out-of-Sample-Test der aktuellen Weights.
+        metric     : Auswahlkriterium auf Train (Schlüssel aus metrics, größer = besser)
+        n_blocks, train_ratio, mode : siehe walk_forward_splits()
+        entry, cost                 : siehe simulate()
+
+    Rückgabe:
+        dict mit:
+            blocks      : Liste je Block {train, test, params, train_metrics, test_metrics}
+            oos_returns : Series – aneinandergehängte Test-Returns
+            oos_metrics : dict – Metriken über alle Test-Fenster zusammen
+    """
+    candidates = candidates or [{}]
+    held = [
+        positions(data, c.get("weights"), c.get("thresholds"), entry)
+        for c in candidates
+    ]
+
+    blocks, oos_returns, oos_trades, oos_exposure = [], [], [], []
+    for split in walk_forward_splits(len(data["dates"]), n_blocks, train_ratio, mode):
+        train = [simulate(data, cost=cost, start=split["train"][0], end=split["train"][1], held=h) for h in held]
+        scores = [res["metrics"][metric] for res in train]
+        best = max(range(len(candidates)), key=lambda i: -np.inf if scores[i] is None else scores[i])
+
+        test = simulate(data, cost=cost, start=split["test"][0], end=split["test"][1], held=held[best])
+        blocks.append({
+            "train":         (data["dates"][split["train"][0]], data["dates"][split["train"][1] - 1]),
+            "test":          (data["dates"][split["test"][0]], data["dates"][split["test"][1] - 1]),
+            "params":        candidates[best],
+            "train_metrics": train[best]["metrics"],
+            "test_metrics":  test["metrics"],
+        })
+        oos_returns.append(test["returns"])
+        oos_trades.append(test["trades"])
+        oos_exposure.append(test["metrics"]["exposure"] * len(test["returns"]))
+
+    returns = pd.concat(oos_returns)
+    trades  = np.concatenate(oos_trades)
+    return {
+        "blocks":      blocks,
+        "oos_returns": returns,
+        "oos_metrics": _metrics(returns.to_numpy(), trades, sum(oos_exposure) / max(len(returns), 1)),
+    }
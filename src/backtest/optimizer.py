@@ -0,0 +1,452 @@
+"""
+Backtest: Optimierung von WEIGHTS und SCORE_THRESHOLDS
+──────────────────────────────────────────────────────
+Sucht Weight-Vektoren und Einstiegs-Schwellen, die im Backtest (engine.py)
+am besten abschneiden. Suchverfahren:
+
+    grid               : kartesisches Produkt über vorgegebene Werte
+    random             : Zufallsstichprobe aus einem Werte-Raster
+    successive_halving : viele Kandidaten auf wenigen Tickern, die besten
+                         1/eta auf jeweils eta-mal so vielen weiterrechnen
+
+Auswertung:
+    Der Score ist linear in den Bool-Signalen. Die Signal-Matrix aus
+    prepare() wird einmal erstellt; je Zeitblock ergeben sich die Scores
+    ALLER Kandidaten eines Batches als eine Matrixmultiplikation
+    (Zeilen × Signale) @ (Signale × Kandidaten). Daraus folgen Positionen,
+    Portfolio-Returns und Metriken vektorisiert über die Kandidaten.
+    Trade-Metriken (hit_rate, avg_trade, wwr) entfallen dabei – die besten
+    Kandidaten lassen sich mit engine.simulate() vollständig nachrechnen.
+
+Parallelisierung:
+    Batches verteilt auf einen ProcessPool. Signal-Würfel und Kurse liegen
+    als .npy in einem temporären Verzeichnis und werden von den Workern per
+    Memory-Map geöffnet – nur ein Exemplar im RAM.
+
+Checkpoint:
+    Jeder ausgewertete Kandidat wird sofort als JSON-Zeile angehängt.
+    Ein erneuter Aufruf mit derselben Datei (und demselben seed) überspringt
+    bereits bewertete Kandidaten – ein abgebrochener Lauf setzt dort fort.
+    Der Schlüssel enthält einen Fingerprint der Daten (Ticker, Datumsindex,
+    Signal-Matrix, Kurse): mit neuen Kursen oder Signalen wird neu bewertet.
+
+Verwendung:
+    from src.backtest.engine import prepare, walk_forward
+    from src.backtest.optimizer import search
+
+    data = prepare(frames)
+    best = search(data, method="successive_halving", n=2000,
+                  checkpoint="data/backtest/opt.jsonl", workers=8)
+    best[0]["params"]                       # {"weights": {...}, "thresholds": {...}}
+    walk_forward(data, candidates=[b["params"] for b in best[:20]])
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.ta.TA_run import SCORE_THRESHOLDS, WEIGHTS
+
+from .engine import COST_PER_SIDE, ENTRY_LEVELS, TRADING_DAYS
+
+BATCH_SIZE    = 64                          # Kandidaten je Matrixmultiplikation
+CHUNK_DAYS    = 32                          # Tage je Zeitblock
+WEIGHT_VALUES = (0.0, 0.5, 1.0, 1.5, 2.0)   # Raster für random/successive_halving
+THRESHOLD_VALUES = (0.25, 0.30, 0.35, 0.40, 0.45, 0.50, 0.55, 0.60, 0.65)
+
+METRICS = ("total_return", "annual_return", "sharpe", "max_drawdown", "profit_mdd", "exposure")
+
+
+# ── Kandidaten ────────────────────────────────────────────────────────────────
+
+def _candidate(weights: dict[str, float], threshold: float, entry: str) -> dict:
+    """Parameter-Satz im Format von engine.walk_forward(candidates=...)."""
+    thresholds = dict(SCORE_THRESHOLDS)
+    level = ENTRY_LEVELS[entry]
+    thresholds[level] = threshold
+
+    # Reihenfolge STARK ≥ MITTEL ≥ WATCH erhalten, sonst ändert _classify() die Bedeutung
+    order = ["STARK", "MITTEL", "WATCH"]
+    i = order.index(level)
+    for j in range(i - 1, -1, -1):
+        thresholds[order[j]] = max(thresholds[order[j]], thresholds[order[j + 1]])
+    for j in range(i + 1, len(order)):
+        thresholds[order[j]] = min(thresholds[order[j]], thresholds[order[j - 1]])
+    return {"weights": dict(weights), "thresholds": thresholds}
+
+
+def grid_candidates(
+    space: dict[str, list[float]],
+    thresholds: list[float] | None = None,
+    entry: str = "BUY",
+) -> list[dict]:
+    """
+    Kartesisches Produkt über die angegebenen Weights (Rest: Modul-WEIGHTS).
+
+    Parameter:
+        space      : {signal_name: [werte, ...]}, z.B. {"rsi_oversold": [0, 1, 2]}
+        thresholds : Werte für die Einstiegs-Schwelle (Standard: aktuelle)
+        entry      : Einstiegsstufe, deren Schwelle variiert wird
+    """
+    unknown = set(space) - set(WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unbekannte Signale im Suchraum: {sorted(unknown)}")
+    thresholds = thresholds or [SCORE_THRESHOLDS[ENTRY_LEVELS[entry]]]
+
+    names = list(space)
+    candidates = []
+    for values in itertools.product(*space.values()):
+        weights = {**WEIGHTS, **dict(zip(names, values))}
+        candidates.extend(_candidate(weights, t, entry) for t in thresholds)
+    return candidates
+
+
+def random_candidates(
+    n: int,
+    weight_values: tuple[float, ...] = WEIGHT_VALUES,
+    threshold_values: tuple[float, ...] = THRESHOLD_VALUES,
+    entry: str = "BUY",
+    seed: int = 0,
+) -> list[dict]:
+    """
+    n zufällige Kandidaten: jedes Weight und die Einstiegs-Schwelle aus dem Raster.
+    Gleicher seed → gleiche Kandidaten (Voraussetzung für Resume per Checkpoint).
+    """
+    rng = np.random.default_rng(seed)
+    names = list(WEIGHTS)
+    picks = rng.choice(np.asarray(weight_values, dtype=float), size=(n, len(names)))
+    thresholds = rng.choice(np.asarray(threshold_values, dtype=float), size=n)
+    return [
+        _candidate(dict(zip(names, map(float, row))), float(t), entry)
+        for row, t in zip(picks, thresholds)
+    ]
+
+
+def _data_fingerprint(data: dict) -> str:
+    """Hash der vorbereiteten Daten: Ticker, Datumsindex, Signal-Namen, Signal-Matrix, Kurse."""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([list(data["tickers"]), list(data["signal_names"])]).encode())
+    digest.update(np.asarray(data["dates"], dtype="datetime64[ns]").view(np.int64).tobytes())
+    digest.update(np.ascontiguousarray(data["signals"], dtype=bool).tobytes())
+    digest.update(np.ascontiguousarray(data["close"], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _key(candidate: dict, context: dict) -> str:
+    """Checkpoint-Schlüssel: Kandidat + alles, was sein Ergebnis bestimmt."""
+    payload = json.dumps({"p": candidate, **context}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+# ── Auswertung (vektorisiert über Kandidaten) ────────────────────────────────
+
+_data = None       # im Worker: {"signals", "close"} als Memory-Map
+
+
+def _init_worker(directory: str) -> None:
+    global _data
+    _data = {
+        "signals": np.load(os.path.join(directory, "signals.npy"), mmap_mode="r"),
+        "close":   np.load(os.path.join(directory, "close.npy"), mmap_mode="r"),
+    }
+
+
+def _batch_returns(
+    signals: np.ndarray,
+    close: np.ndarray,
+    W: np.ndarray,
+    thr: np.ndarray,
+    cols: np.ndarray,
+    start: int,
+    end: int,
+    cost: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Portfolio-Returns aller Kandidaten eines Batches – gleiche Regeln wie
+    engine.simulate() (Position ab Signal-Tag, gleichgewichtet, Kosten auf
+    Umschlag, letzter Tag schließt alles).
+
+    Parameter:
+        signals : bool (Signal × Datum × Ticker)
+        close   : float (Datum × Ticker)
+        W       : Weights (Signal × Kandidat)
+        thr     : Einstiegs-Schwelle je Kandidat (Anteil an sum(weights))
+        cols    : Ticker-Spalten (Teilmenge für successive halving)
+
+    Rückgabe:
+        (returns (Kandidat × Tag), investiert (Kandidat × Tag, bool))
+    """
+    n_sig, k = W.shape
+    n_cols = len(cols)
+    w_sum = W.sum(axis=0)
+    w_div = np.where(w_sum > 0, w_sum, np.inf)          # sum(weights) = 0 → nie investiert
+
+    returns  = np.zeros((k, end - start))
+    invested = np.zeros((k, end - start), dtype=bool)
+    prev = np.zeros((n_cols, k), dtype=bool)
+    prev_close = None
+
+    for t0 in range(start, end, CHUNK_DAYS):
+        t1 = min(t0 + CHUNK_DAYS, end)
+        c = t1 - t0
+        px = np.asarray(close[t0:t1][:, cols], dtype=np.float64)
+
+        # (Tage·Ticker × Signale) @ (Signale × Kandidaten)
+        X = np.asarray(signals[:, t0:t1][:, :, cols], dtype=np.float64).reshape(n_sig, -1).T
+        held = ((X @ W) / w_div >= thr).reshape(c, n_cols, k)
+        held &= ~np.isnan(px)[:, :, None]
+        if t1 == end:
+            held[-1] = False
+
+        # Tages-Returns; am ersten Tag des Zeitraums 0
+        r = np.zeros_like(px)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if prev_close is not None:
+                r[0] = px[0] / prev_close - 1.0
+            r[1:] = px[1:] / px[:-1] - 1.0
+        r = np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0)
+        prev_close = px[-1]
+
+        # Gleichgewichtet → Gewichte und Umschlag folgen allein aus den Anzahlen
+        # gehaltener Titel; so bleibt alles bool statt (Tage × Ticker × Kandidat) float
+        before = np.concatenate([prev[None], held[:-1]])
+        n_now, n_before = held.sum(axis=1), before.sum(axis=1)      # (Tage × Kandidat)
+        kept = (held & before).sum(axis=1)
+        inv_now    = np.divide(1.0, n_now, out=np.zeros(n_now.shape), where=n_now > 0)
+        inv_before = np.divide(1.0, n_before, out=np.zeros(n_before.shape), where=n_before > 0)
+
+        gross    = np.einsum("tik,ti->tk", before, r) * inv_before
+        turnover = (kept * np.abs(inv_now - inv_before)
+                    + (n_before - kept) * inv_before + (n_now - kept) * inv_now)
+
+        returns[:, t0 - start : t1 - start]  = (gross - cost * turnover).T
+        invested[:, t0 - start : t1 - start] = (n_now > 0).T
+        prev = held[-1]
+
+    return returns, invested
+
+
+def _metrics(returns: np.ndarray, invested: np.ndarray) -> list[dict]:
+    """Metriken wie engine._metrics() (ohne Trade-Metriken), je Kandidat."""
+    equity = np.cumprod(1.0 + returns, axis=1)
+    total  = equity[:, -1] - 1.0
+    years  = returns.shape[1] / TRADING_DAYS
+    mdd    = (1.0 - equity / np.maximum.accumulate(equity, axis=1)).max(axis=1)
+    std    = returns.std(axis=1, ddof=1)
+    mean   = returns.mean(axis=1)
+
+    result = []
+    for i in range(len(returns)):
+        result.append({
+            "total_return":  round(float(total[i]), 6),
+            "annual_return": round(float((1.0 + total[i]) ** (1.0 / years) - 1.0), 6) if total[i] > -1 else None,
+            "sharpe":        round(float(mean[i] / std[i] * np.sqrt(TRADING_DAYS)), 4) if std[i] > 0 else None,
+            "max_drawdown":  round(float(mdd[i]), 6),
+            "profit_mdd":    round(float(total[i] / mdd[i]), 4) if mdd[i] > 0 else None,
+            "exposure":      round(float(invested[i].mean()), 4),
+        })
+    return result
+
+
+def _evaluate_batch(
+    W: np.ndarray, thr: np.ndarray, cols: np.ndarray, start: int, end: int, cost: float,
+) -> list[dict]:
+    """Worker-Einstieg: nutzt den per Memory-Map geöffneten Würfel."""
+    returns, invested = _batch_returns(_data["signals"], _data["close"], W, thr, cols, start, end, cost)
+    return _metrics(returns, invested)
+
+
+# ── Checkpoint ────────────────────────────────────────────────────────────────
+
+def _load_checkpoint(path: str | None) -> dict[str, dict]:
+    if path is None or not os.path.exists(path):
+        return {}
+    done = {}
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue            # abgebrochene letzte Zeile
+            done[entry["key"]] = entry
+    return done
+
+
+def _append_checkpoint(path: str | None, entries: list[dict]) -> None:
+    if path is None or not entries:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def evaluate(
+    data: dict,
+    candidates: list[dict],
+    entry: str = "BUY",
+    cost: float = COST_PER_SIDE,
+    start: int = 0,
+    end: int | None = None,
+    budget: float = 1.0,
+    workers: int | None = 1,
+    batch_size: int = BATCH_SIZE,
+    checkpoint: str | None = None,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Bewertet Kandidaten im Zeitraum [start, end) – Batch für Batch per Matrixmultiplikation.
+
+    Parameter:
+        data       : Ergebnis von engine.prepare()
+        candidates : [{"weights": {...}, "thresholds": {...}}, ...]
+        entry      : Einstiegsstufe (siehe engine.ENTRY_LEVELS)
+        cost       : Kosten je Seite
+        start, end : Zeilen-Indizes in data["dates"] (z.B. Train-Fenster)
+        budget     : Anteil der Ticker (0 < budget ≤ 1), Stichprobe per seed
+        workers    : Prozesse (1 = im aktuellen Prozess, None = alle CPU-Kerne)
+        batch_size : Kandidaten je Batch
+        checkpoint : JSONL-Datei für Zwischenergebnisse / Resume
+
+    Rückgabe:
+        [{"key", "budget", "params", "metrics"}, ...] in Reihenfolge der Kandidaten
+    """
+    end = len(data["dates"]) if end is None else end
+    names = data["signal_names"]
+    level = ENTRY_LEVELS[entry]
+
+    n_tickers = len(data["tickers"])
+    size = max(1, int(round(n_tickers * budget)))
+    cols = np.sort(np.random.default_rng(seed).choice(n_tickers, size=size, replace=False))
+
+    context = {
+        "budget": round(budget, 6), "start": start, "end": end, "cost": cost, "entry": entry, "seed": seed,
+        "data": _data_fingerprint(data),
+    }
+    done = _load_checkpoint(checkpoint)
+    keys = [_key(c, context) for c in candidates]
+    todo = [i for i, k in enumerate(keys) if k not in done]
+
+    batches = []
+    for b in range(0, len(todo), batch_size):
+        idx = todo[b : b + batch_size]
+        W   = np.array([[candidates[i]["weights"][n] for i in idx] for n in names], dtype=np.float64)
+        thr = np.array([candidates[i]["thresholds"][level] for i in idx], dtype=np.float64)
+        batches.append((idx, W, thr))
+
+    def _store(idx: list[int], metrics: list[dict]) -> None:
+        entries = [
+            {"key": keys[i], "budget": budget, "params": candidates[i], "metrics": m}
+            for i, m in zip(idx, metrics)
+        ]
+        _append_checkpoint(checkpoint, entries)
+        done.update({e["key"]: e for e in entries})
+
+    if workers == 1 or len(batches) <= 1:
+        for idx, W, thr in batches:
+            returns, invested = _batch_returns(data["signals"], data["close"], W, thr, cols, start, end, cost)
+            _store(idx, _metrics(returns, invested))
+    else:
+        with tempfile.TemporaryDirectory(prefix="ta_opt_") as directory:
+            np.save(os.path.join(directory, "signals.npy"), data["signals"])
+            np.save(os.path.join(directory, "close.npy"), data["close"])
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(directory,)) as pool:
+                futures = {
+                    pool.submit(_evaluate_batch, W, thr, cols, start, end, cost): idx
+                    for idx, W, thr in batches
+                }
+                for future, idx in futures.items():
+                    _store(idx, future.result())
+
+    return [done[k] for k in keys]
+
+
+def _rank(results: list[dict], metric: str) -> list[dict]:
+    if metric not in METRICS:
+        raise ValueError(f"Unbekannte Metrik: {metric!r} (erlaubt: {METRICS})")
+    sign = -1.0 if metric == "max_drawdown" else 1.0      # kleiner Drawdown = besser
+    return sorted(
+        results,
+        key=lambda r: -np.inf if r["metrics"][metric] is None else sign * r["metrics"][metric],
+        reverse=True,
+    )
+
+
+def successive_halving(
+    data: dict,
+    candidates: list[dict],
+    metric: str = "sharpe",
+    eta: int = 3,
+    min_budget: float = 1 / 9,
+    **kwargs,
+) -> list[dict]:
+    """
+    Successive Halving über den Ticker-Anteil als Budget.
+
+    Runde 1 bewertet alle Kandidaten auf min_budget der Ticker, jede weitere
+    Runde behält die besten 1/eta und verdreifacht (eta) das Budget, bis
+    alle Ticker genutzt werden.
+
+    Rückgabe:
+        Ergebnisse der letzten Runde (volles Budget), beste zuerst
+    """
+    budget = min_budget
+    while True:
+        results = _rank(evaluate(data, candidates, budget=min(budget, 1.0), **kwargs), metric)
+        if budget >= 1.0 - 1e-9 or len(results) <= 1:
+            return results
+        keep = max(1, len(results) // eta)
+        candidates = [r["params"] for r in results[:keep]]
+        budget *= eta
+
+
+def search(
+    data: dict,
+    method: str = "random",
+    n: int = 1000,
+    metric: str = "sharpe",
+    space: dict[str, list[float]] | None = None,
+    entry: str = "BUY",
+    seed: int = 0,
+    **kwargs,
+) -> list[dict]:
+    """
+    Sucht die besten Weights/Schwellen.
+
+    Parameter:
+        data   : Ergebnis von engine.prepare()
+        method : 'grid' (benötigt space) | 'random' | 'successive_halving'
+        n      : Anzahl Zufalls-Kandidaten (random, successive_halving)
+        metric : Zielmetrik aus METRICS (max_drawdown: kleiner = besser)
+        space  : Suchraum für grid, siehe grid_candidates()
+        entry  : Einstiegsstufe (siehe engine.ENTRY_LEVELS)
+        seed   : bestimmt Kandidaten und Ticker-Stichproben
+        kwargs : an evaluate() (start, end, cost, workers, checkpoint, ...)
+
+    Rückgabe:
+        [{"key", "budget", "params", "metrics"}, ...], beste zuerst
+    """
+    if method == "grid":
+        if not space:
+            raise ValueError("method='grid' benötigt space={signal: [werte, ...]}")
+        candidates = grid_candidates(space, entry=entry)
+    elif method in ("random", "successive_halving"):
+        candidates = random_candidates(n, entry=entry, seed=seed)
+    else:
+        raise ValueError(f"Unbekanntes Suchverfahren: {method!r} (erlaubt: 'grid', 'random', 'successive_halving')")
+
+    if method == "successive_halving":
+        return successive_halving(data, candidates, metric=metric, entry=entry, seed=seed, **kwargs)
+    return _rank(evaluate(data, candidates, entry=entry, seed=seed, **kwargs), metric)
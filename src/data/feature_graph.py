@@ -0,0 +1,330 @@
+"""
+Feature Graph – Abhängigkeitsgraph der Feature-Pipeline
+───────────────────────────────────────────────────────
+Jeder Schritt der FEATURE_PIPELINE deklariert, welche Spalten er liest und
+welche er schreibt:
+
+    {"fn": add_rsi, "reads": ["Close"], "writes": ["rsi", "rsi_zone", "rsi_above50"]}
+    {"fn": add_x,   "reads": [...], "writes": [...], "params": {"period": 20}, "name": "x20"}
+
+Daraus entsteht ein DAG: Schritt B hängt von A ab, wenn B eine Spalte liest,
+die A schreibt. Schritte ohne gegenseitige Abhängigkeit (ADX, EMAs,
+Bollinger, RSI, OBV …) laufen parallel in einem Thread-Pool – NumPy/pandas
+geben bei großen Arrays den GIL frei, numba-Kerne laufen ohnehin in C.
+Spätere Schritte (Regime-, ML-Features) warten nur auf die Spalten, die sie
+tatsächlich lesen.
+
+Vertrag je Schritt: fn folgt der add_*-Konvention (siehe spalten.py), also
+fn(df, out=dict, **params) im Builder-Modus. Geschrieben werden muss genau
+die Spaltenliste aus "writes" – Abweichungen sind ein Fehler, damit die
+Deklaration nicht unbemerkt veraltet.
+
+Kontext je Aufruf: Schritte, die mehr als die Kurse brauchen (z.B. den
+Ticker für News-Sentiment), nennen die Argumente unter "context":
+
+    {"fn": add_news_sentiment, "reads": [], "writes": [...], "context": ["ticker"]}
+
+run_graph(..., context={"ticker": "AAPL"}) übergibt sie als Keyword-Argumente;
+der Feature Store setzt den Ticker aus get_features().
+
+Versionierung:
+    fingerprints() liefert je Schritt einen Hash aus Funktion, Quelltext des
+    Moduls und aller davon (transitiv) importierten Projektmodule (z.B.
+    kernels.py, kategorien.py), Parametern, reads/writes, optionalem
+    "version"-Eintrag und den Fingerprints der Vorgänger. Ändert sich ein
+    Schritt, ändern sich damit auch alle Schritte, die seine Spalten lesen –
+    der Feature Store rechnet genau diese Spalten neu. "version" im Schritt
+    erhöhen, wenn sich das Ergebnis ändert, ohne dass sich Projektcode ändert
+    (z.B. durch ein Update von pandas oder numba).
+
+Verwendung:
+    from src.data.feature_graph import build_graph, run_graph, required
+
+    graph = build_graph(FEATURE_PIPELINE)
+    df    = run_graph(ohlcv, graph)                          # alle Schritte
+    todo  = required(graph, ["regime_score"], done=["add_adx"])
+    df    = run_graph(cached, graph, only=todo)              # nur fehlende
+"""
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from src.ta.indikatoren.spalten import assemble_columns
+
+BASE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+WORKERS = min(4, os.cpu_count() or 1)
+
+_code_hashes: dict[str, str] = {}
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _module_path(module: str) -> str | None:
+    """
+    Quelldatei eines Moduls – auch wenn es (noch) nicht geladen ist, damit
+    der Hash nicht davon abhängt, was im Prozess bereits importiert wurde.
+    """
+    path = getattr(sys.modules.get(module), "__file__", None)
+    if path:
+        return path
+    top = sys.modules.get(module.split(".")[0])
+    for root in getattr(top, "__path__", []):
+        base = os.path.join(os.path.dirname(root), *module.split("."))
+        for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def _source(module: str) -> bytes:
+    """Quelltext eines Moduls (leer, wenn keine Datei existiert)."""
+    path = _module_path(module)
+    if not path or not os.path.exists(path):
+        return b""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _project_imports(module: str, source: bytes) -> set[str]:
+    """
+    Module desselben Top-Level-Pakets, die `module` importiert – auch
+    relative Importe und Importe innerhalb von Funktionen.
+    """
+    path = _module_path(module)
+    if not source or not path:
+        return set()
+    top = module.split(".")[0]
+    package = module if os.path.basename(path) == "__init__.py" else module.rpartition(".")[0]
+    found = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            try:
+                base = importlib.util.resolve_name("." * node.level + (node.module or ""), package)
+            except (ImportError, ValueError):
+                continue
+            names = [base] + [f"{base}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        found.update(n for n in names if n.split(".")[0] == top and _module_path(n))
+    found.discard(module)
+    return found
+
+
+def _run_step(step: dict, df: pd.DataFrame, context: dict) -> dict:
+    """Führt einen Schritt im Builder-Modus aus und prüft die geschriebenen Spalten."""
+    missing = [k for k in step.get("context", []) if k not in context]
+    if missing:
+        raise ValueError(f"Schritt {step_name(step)!r} braucht Kontext: {', '.join(missing)}")
+    out: dict = {}
+    step["fn"](df, out=out, **step.get("params", {}), **{k: context[k] for k in step.get("context", [])})
+    if list(out) != list(step["writes"]):
+        raise ValueError(
+            f"Schritt {step_name(step)!r} schreibt {list(out)}, deklariert sind {list(step['writes'])}"
+        )
+    return out
+
+
+def _step_input(df: pd.DataFrame, step: dict, cols: dict) -> pd.DataFrame:
+    """
+    Eingabe eines Schritts: df, ergänzt um die in diesem Lauf berechneten
+    Spalten, die der Schritt liest. Liest er nur Spalten aus df, wird df
+    ohne Kopie übergeben.
+    """
+    fresh = {c: cols[c] for c in step["reads"] if c in cols}
+    return assemble_columns(df, fresh) if fresh else df
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def code_hash(fn) -> str:
+    """
+    Hash der Quelldatei des Moduls von fn und aller davon transitiv
+    importierten Module desselben Pakets (je Prozess einmal gelesen).
+    """
+    module = fn.__module__
+    if module not in _code_hashes:
+        sources, stack = {}, [module]
+        while stack:
+            name = stack.pop()
+            if name in sources:
+                continue
+            sources[name] = _source(name)
+            stack.extend(_project_imports(name, sources[name]) - set(sources))
+        digest = hashlib.sha1()
+        for name in sorted(sources):
+            digest.update(name.encode() + b"\0" + sources[name])
+        _code_hashes[module] = digest.hexdigest()
+    return _code_hashes[module]
+
+
+def step_name(step: dict) -> str:
+    """Name eines Schritts: "name" falls angegeben, sonst der Funktionsname."""
+    return step.get("name") or step["fn"].__name__
+
+
+def build_graph(steps: list[dict], base: list[str] | None = None) -> dict:
+    """
+    Baut und prüft den Abhängigkeitsgraph.
+
+    Parameter:
+        steps : Pipeline-Schritte {fn, reads, writes[, params, name, context]}
+        base  : Spalten, die bereits in den Eingabedaten stehen (Standard: OHLCV)
+
+    Rückgabe:
+        dict mit:
+            steps     : {name: Schritt}
+            deps      : {name: set der Vorgänger-Namen}
+            order     : Namen in topologischer Reihenfolge (stabil zur Listenreihenfolge)
+            producers : {spalte: name des schreibenden Schritts}
+
+    Raises:
+        ValueError bei doppelten Namen/Spalten, unbekannten Eingaben oder Zyklen
+    """
+    base = BASE_COLUMNS if base is None else base
+    by_name, producers = {}, {}
+    for step in steps:
+        name = step_name(step)
+        if name in by_name:
+            raise ValueError(f"Doppelter Pipeline-Schritt: {name!r}")
+        by_name[name] = step
+        for col in step["writes"]:
+            if col in producers:
+                raise ValueError(f"Spalte {col!r} wird von {producers[col]!r} und {name!r} geschrieben")
+            producers[col] = name
+
+    deps = {}
+    for name, step in by_name.items():
+        deps[name] = set()
+        for col in step["reads"]:
+            if col in producers:
+                deps[name].add(producers[col])
+            elif col not in base:
+                raise ValueError(f"Schritt {name!r} liest {col!r} – kein Schritt schreibt diese Spalte")
+
+    order, placed = [], set()
+    while len(order) < len(by_name):
+        ready = [n for n in by_name if n not in placed and deps[n] <= placed]
+        if not ready:
+            cycle = sorted(n for n in by_name if n not in placed)
+            raise ValueError(f"Zyklische Abhängigkeit zwischen: {', '.join(cycle)}")
+        order.extend(ready)
+        placed.update(ready)
+
+    return {"steps": by_name, "deps": deps, "order": order, "producers": producers}
+
+
+def fingerprints(graph: dict) -> dict[str, str]:
+    """
+    Versions-Fingerprint je Schritt (siehe Modul-Docstring).
+
+    Rückgabe:
+        {name: sha1-Hex}, gleiche Eingaben und Vorgänger → gleicher Wert
+    """
+    result = {}
+    for name in graph["order"]:
+        step = graph["steps"][name]
+        payload = json.dumps({
+            "fn":      f"{step['fn'].__module__}.{step['fn'].__qualname__}",
+            "code":    code_hash(step["fn"]),
+            "params":  step.get("params", {}),
+            "reads":   list(step["reads"]),
+            "writes":  list(step["writes"]),
+            "version": step.get("version", 0),
+            "deps":    sorted(result[d] for d in graph["deps"][name]),
+        }, sort_keys=True, default=str)
+        result[name] = hashlib.sha1(payload.encode()).hexdigest()
+    return result
+
+
+def required(graph: dict, columns: list[str] | None = None, done=()) -> list[str]:
+    """
+    Schritte, die laufen müssen, damit `columns` vorliegen.
+
+    Parameter:
+        graph   : Ergebnis von build_graph()
+        columns : gewünschte Spalten (Standard: alle Schritte)
+        done    : Namen der Schritte, deren Spalten bereits gültig vorliegen
+
+    Rückgabe:
+        Namen in topologischer Reihenfolge – Erzeuger der Spalten plus alle
+        noch nicht erledigten Vorgänger
+    """
+    done = set(done)
+    if columns is None:
+        targets = set(graph["order"])
+    else:
+        targets = {graph["producers"][c] for c in columns if c in graph["producers"]}
+
+    todo, stack = set(), [n for n in targets if n not in done]
+    while stack:
+        name = stack.pop()
+        if name in todo:
+            continue
+        todo.add(name)
+        stack.extend(d for d in graph["deps"][name] if d not in done)
+    return [n for n in graph["order"] if n in todo]
+
+
+def run_graph(
+    df: pd.DataFrame,
+    graph: dict,
+    only: list[str] | None = None,
+    workers: int | None = None,
+    context: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Führt die Schritte des Graphen aus, unabhängige parallel.
+
+    Parameter:
+        df      : Eingabe (OHLCV, ggf. mit bereits berechneten Spalten)
+        graph   : Ergebnis von build_graph()
+        only    : nur diese Schritte (Standard: alle); Eingaben übersprungener
+                  Schritte müssen bereits in df stehen
+        workers : Threads (Standard: WORKERS, 1 = sequentiell)
+        context : Argumente für Schritte mit "context", z.B. {"ticker": "AAPL"}
+
+    Rückgabe:
+        df mit den geschriebenen Spalten, in topologischer Schrittreihenfolge
+        angehängt (unabhängig davon, welcher Schritt zuerst fertig wurde)
+    """
+    names = [n for n in graph["order"] if only is None or n in only]
+    steps = graph["steps"]
+    results: dict[str, dict] = {}
+    cols: dict = {}
+    workers = WORKERS if workers is None else workers
+    context = context or {}
+
+    if workers <= 1 or len(names) <= 1:
+        for name in names:
+            results[name] = _run_step(steps[name], _step_input(df, steps[name], cols), context)
+            cols.update(results[name])
+    else:
+        pending = set(names)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n in names if n in pending]:
+                    if not (graph["deps"][name] & (pending | set(running.values()))):
+                        pending.discard(name)
+                        step = steps[name]
+                        running[pool.submit(_run_step, step, _step_input(df, step, cols), context)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    cols.update(results[name])
+
+    ordered = {}
+    for name in names:
+        ordered.update(results[name])
+    return assemble_columns(df, ordered) if ordered else df
@@ -6,99 +6,595 @@ Zwischenschicht zwischen rohen OHLCV-Daten und allen Analyse-Modulen.
 Ablauf:
     get_features("AAPL")
         1. Parquet-Cache prüfen → aktuell? → sofort zurückgeben
-        2. Sonst: OHLCV laden → FEATURE_PIPELINE ausführen → Parquet speichern
+        2. Veraltet, aber Zustand vorhanden → nur neue Handelstage berechnen
+           und als eigene Datei anhängen (inkrementell, O(neue Zeilen))
+        3. Sonst: OHLCV laden → FEATURE_PIPELINE ausführen → Parquet speichern
+
+Layout (wie im Price Store):
+    data/features/
+        ticker=AAPL/
+            part-….parquet      ← Vollberechnung bzw. kompaktierter Bestand
+            part-….parquet      ← inkrementell angehängte Handelstage
+        AAPL_state.json
+
+    Dateinamen = Schreibzeitpunkt (ns) → Reihenfolge ohne Lesen. Eine Datei,
+    die in den Datumsbereich älterer Dateien zurückreicht (Vollberechnung,
+    Kompaktierung), ersetzt diese; ein Abbruch vor dem Löschen der alten
+    Dateien hinterlässt daher keine doppelten Zeilen. Ab MAX_PARTS Dateien
+    wird kompaktiert. Alte Einzeldateien ({ticker}_features.parquet) werden
+    beim ersten Zugriff übernommen.
+
+Inkrementeller Modus:
+    Neben jedem Ticker-Verzeichnis liegt {ticker}_state.json mit dem ungerundeten
+    Endzustand der rekursiven Indikatoren (EMA-Niveaus, Wilder-Summen, PSAR
+    EP/AF, OBV-Summe). Voraussetzung: jeder Schritt der FEATURE_PIPELINE
+    gehört zu einer Gruppe in INCREMENTAL_STEPS. Ändern sich historische Kurse
+    (z.B. Dividenden-Anpassung durch auto_adjust), wird voll neu berechnet –
+    ebenso, wenn die im Zustand abgelegten Fingerprints der Schritte nicht
+    mehr zum aktuellen Code passen. Gelesen werden dafür nur die letzten
+    TAIL_ROWS Zeilen (Row-Groups am Ende), geschrieben nur die neuen.
 
 FEATURE_PIPELINE:
-    Geordnete Liste von Berechnungsfunktionen. Jedes Modul registriert hier
-    seine eigenen Feature-Funktionen. Der Feature Store orchestriert die
-    Ausführung — kein Modul muss ein anderes kennen.
+    Liste von Schritten {fn, reads, writes}. Jedes Modul registriert hier
+    seine eigenen Feature-Funktionen mit den Spalten, die sie lesen und
+    schreiben. Der Feature Store baut daraus einen Abhängigkeitsgraph
+    (feature_graph.py) und rechnet unabhängige Schritte parallel — kein
+    Modul muss ein anderes kennen.
 
     Neue Features hinzufügen:
-        1. Funktion in eigenem Modul implementieren (z.B. src/ml/features.py)
-        2. In FEATURE_PIPELINE eintragen → fertig
+        1. Funktion in eigenem Modul implementieren (z.B. src/ml/features.py),
+           add_*-Konvention mit Builder-Modus (out=dict, siehe spalten.py)
+        2. Mit reads/writes in FEATURE_PIPELINE eintragen → fertig
+
+    Schritte je Ticker: Braucht ein Schritt den Ticker (z.B. News-Sentiment),
+    deklariert er "context": ["ticker"] – get_features(ticker) reicht ihn
+    durch (siehe feature_graph.py). Solche Schritte werden nicht inkrementell
+    fortgeschrieben; ein veralteter Cache wird dann voll neu berechnet.
+
+        from src.sentiment.features import SENTIMENT_STEP
+        FEATURE_PIPELINE.append(SENTIMENT_STEP)
+
+Selektives Lesen:
+    Ist der Cache aktuell, wird nur gelesen, was angefragt ist: Spalten per
+    Parquet-Projektion, Zeilen über die Datums-Statistiken der Row-Groups
+    (ROW_GROUP_SIZE Zeilen je Gruppe). Fehlt eine angefragte Spalte, werden
+    nur die fehlenden Schritte nachgerechnet, nicht die ganze Pipeline.
+
+Versionierung:
+    Die Parquet-Metadaten speichern je Pipeline-Schritt seinen Fingerprint
+    (Code der Moduldatei, Parameter, reads/writes, Vorgänger – siehe
+    feature_graph.fingerprints). Beim Laden gelten nur Spalten von Schritten
+    mit unverändertem Fingerprint; geänderte Schritte und alles, was ihre
+    Spalten liest, werden auf dem Cache neu berechnet – ohne
+    force_refresh und ohne die übrigen Spalten anzufassen.
 
 Verwendung:
     from src.data.feature_store import get_features
 
     df = get_features("AAPL")          # alle Indikatoren als Spalten
     df = get_features("AAPL", force_refresh=True)  # Cache ignorieren
+    df = get_features("AAPL", columns=["adx", "regime"], start="2025-01-01")
+    df = get_features("AAPL", last_n=1)            # nur der letzte Handelstag
 """
 
+import json
 import os
-from datetime import date, timedelta
+import time
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from src.data import feature_graph, trading_calendar
 from src.data.price_fetcher import fetch_prices
-from src.ta.TA_run import add_all_indicators
+from src.ta import inkrementell
+from src.ta.muster import kerzen
+from src.ta.TA_run import INDICATOR_STEPS
 
 FEATURES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "features")
 
+ROW_GROUP_SIZE = 256     # Zeilen je Row-Group (~1 Handelsjahr) → Tail-Lesen ohne Historie
+MAX_PARTS      = 64      # ab so vielen Dateien je Ticker wird kompaktiert
+
+# Zeilen, die die Fortschreibung vom Cache braucht: Fenster der Indikatoren
+# bzw. Kerzen und die Mindesthistorie, die inkrementell.state_matches prüft
+TAIL_ROWS = max(inkrementell.TAIL_ROWS, inkrementell.MIN_HISTORY, kerzen.TAIL_ROWS)
+
+_META_KEY = b"feature_pipeline"
+
 
 # ── Feature Pipeline ──────────────────────────────────────────────────────────
-# Reihenfolge ist relevant: spätere Funktionen können Spalten früherer nutzen.
-# Jede Funktion nimmt einen DataFrame entgegen und gibt einen zurück.
+# Schritte {fn, reads, writes[, params, name]}. Die Ausführungsreihenfolge
+# ergibt sich aus reads/writes, nicht aus der Listenposition.
 
 FEATURE_PIPELINE = [
-    add_all_indicators,        # TA-Indikatoren (ADX, EMA, RSI, MACD, OBV ...)
-    # add_regime_features,     # TODO: Market Regime (src/market_regime/features.py)
-    # add_ml_features,         # TODO: ML-spezifische Features (src/ml/features.py)
+    *INDICATOR_STEPS,          # TA-Indikatoren (ADX, EMA, RSI, MACD, OBV ...), voneinander unabhängig
+    {"fn": kerzen.add_candle_codes, "reads": ["Open", "High", "Low", "Close"],
+     "writes": kerzen.CANDLE_COLUMNS},   # Candlestick Shape/Loc + 2-/3-Tages-Muster (PRML)
+    # {"fn": add_regime_features, "reads": ["adx", "regime", ...], "writes": [...]},
+    #                          # TODO: Market Regime (src/market_regime/features.py)
+    # {"fn": add_ml_features, ...},  # TODO: ML-spezifische Features (src/ml/features.py)
 ]
 
+# Inkrementelle Gegenstücke: Gruppe → (Schritte, init_state, extend, state_matches)
+#   Schritte                            → Namen der Pipeline-Schritte, die die Gruppe fortschreibt
+#   init_state(df, fps)                 → Zustand nach der letzten Zeile (oder None), mit fps
+#   extend(cached, new, state)          → (neue Zeilen, neuer Zustand)
+#   state_matches(state, cached, fps)   → Zustand passt zum Cache und zu den Fingerprints?
+# fps = {Schritt: Fingerprint} der Schritte der Gruppe (feature_graph.fingerprints)
+INCREMENTAL_STEPS = {
+    "add_all_indicators": (
+        [feature_graph.step_name(step) for step in INDICATOR_STEPS],
+        inkrementell.init_state,
+        inkrementell.extend_indicators,
+        inkrementell.state_matches,
+    ),
+    "add_candle_codes": (
+        ["add_candle_codes"],
+        kerzen.init_state,
+        kerzen.extend_codes,
+        kerzen.state_matches,
+    ),
+}
+
 
 # ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
 
-def _parquet_path(ticker: str) -> str:
+def _part_dir(ticker: str) -> str:
+    return os.path.join(FEATURES_DIR, f"ticker={ticker}")
+
+
+def _legacy_path(ticker: str) -> str:
+    """Frühere Einzeldatei je Ticker – nur noch für die Migration."""
     return os.path.join(FEATURES_DIR, f"{ticker}_features.parquet")
 
 
-def _is_up_to_date(df: pd.DataFrame) -> bool:
-    """Prüft ob der letzte Eintrag dem letzten Handelstag entspricht."""
-    last_cached = df.index.max().date()
-    expected = date.today() - timedelta(days=1)
-    while expected.weekday() >= 5:
-        expected -= timedelta(days=1)
-    return last_cached >= expected
+def _all_parts(ticker: str) -> list[str]:
+    """Alle Dateien eines Tickers in Schreibreihenfolge (auch ersetzte)."""
+    legacy = _legacy_path(ticker)
+    if os.path.exists(legacy):
+        os.makedirs(_part_dir(ticker), exist_ok=True)
+        os.replace(legacy, os.path.join(_part_dir(ticker), f"part-{time.time_ns()}.parquet"))
+    path = _part_dir(ticker)
+    if not os.path.isdir(path):
+        return []
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.endswith(".parquet") and not name.startswith(".")
+    ]
+
+
+def _is_up_to_date(last: pd.Timestamp) -> bool:
+    """Prüft ob der letzte Eintrag dem letzten abgeschlossenen Handelstag entspricht."""
+    return trading_calendar.is_up_to_date(last)
+
+
+def _graph() -> dict:
+    return feature_graph.build_graph(FEATURE_PIPELINE)
+
+
+def _run_pipeline(df: pd.DataFrame, steps: list[str] | None = None, ticker: str | None = None) -> pd.DataFrame:
+    """
+    Führt die FEATURE_PIPELINE (bzw. nur `steps`) als Graph aus, unabhängige
+    Schritte parallel. Schritte mit "context": ["ticker"] erhalten `ticker`.
+    """
+    return feature_graph.run_graph(df, _graph(), only=steps, context={"ticker": ticker})
+
+
+def _row_groups(pf: pq.ParquetFile) -> list[tuple[pd.Timestamp, pd.Timestamp, int]]:
+    """(erster Tag, letzter Tag, Zeilen) je Row-Group aus den Statistiken."""
+    date_idx = pf.metadata.schema.names.index("Date")
+    groups = []
+    for i in range(pf.metadata.num_row_groups):
+        group = pf.metadata.row_group(i)
+        stats = group.column(date_idx).statistics
+        if stats is None or not stats.has_min_max:
+            # Ohne Statistiken: Datumsspalte lesen (klein im Vergleich zum Rest)
+            dates = pf.read_row_group(i, columns=["Date"]).column("Date").to_pandas()
+            first, last = dates.min(), dates.max()
+        else:
+            first, last = stats.min, stats.max
+        groups.append((pd.Timestamp(first), pd.Timestamp(last), group.num_rows))
+    return groups
+
+
+def _file_info(ticker: str) -> dict | None:
+    """
+    Liest nur Footer und Schema der Parquet-Dateien eines Tickers, keine Daten.
+
+    Rückgabe:
+        None ohne Dateien, sonst dict mit:
+            columns : Spaltennamen
+            schema  : Arrow-Schema (angehängte Dateien werden darauf gecastet)
+            steps   : {Schritt: Fingerprint} der enthaltenen Pipeline-Schritte
+            parts   : gültige Dateien, chronologisch
+            groups  : [(Datei, Row-Group, erster Tag, letzter Tag, Zeilen)]
+            last    : letzter Handelstag
+    """
+    parts, groups = [], []
+    for path in _all_parts(ticker):
+        part_groups = [g for g in _row_groups(pq.ParquetFile(path)) if g[2]]
+        if not part_groups:
+            continue
+        if groups and part_groups[0][0] <= max(g[3] for g in groups):
+            # Reicht in ältere Dateien zurück → ersetzt sie (Vollberechnung, Kompaktierung)
+            parts, groups = [], []
+        parts.append(path)
+        groups.extend((path, i, *g) for i, g in enumerate(part_groups))
+    if not parts:
+        return None
+
+    schema = pq.read_schema(parts[0])
+    meta = schema.metadata or {}
+    steps = json.loads(meta[_META_KEY]) if _META_KEY in meta else {}
+    if not isinstance(steps, dict):
+        steps = {}                     # älteres Format ohne Fingerprints → nichts gültig
+
+    return {
+        "columns": [c for c in schema.names if c != "Date"],
+        "schema":  schema,
+        "steps":   steps,
+        "parts":   parts,
+        "groups":  groups,
+        "last":    max(g[3] for g in groups),
+    }
+
+
+def _valid_steps(info: dict) -> list[str]:
+    """Schritte der Datei, deren gespeicherter Fingerprint zum aktuellen Code passt."""
+    current = feature_graph.fingerprints(_graph())
+    return [name for name, fp in info["steps"].items() if current.get(name) == fp]
+
+
+def _missing_steps(info: dict, valid: list[str], columns: list[str] | None) -> list[str]:
+    """
+    Pipeline-Schritte, die für die Anfrage (neu) gerechnet werden müssen:
+    Erzeuger der angefragten Spalten und deren nicht gültige Vorgänger.
+    Liegen alle angefragten Spalten gültig vor, ist nichts zu tun.
+    """
+    graph = _graph()
+
+    def is_valid(col: str) -> bool:
+        if col not in info["columns"]:
+            return False
+        return col in feature_graph.BASE_COLUMNS or graph["producers"].get(col) in valid
+
+    if columns is not None and all(is_valid(c) for c in columns):
+        return []
+    return feature_graph.required(graph, columns, done=valid)
+
+
+def _read(
+    info: dict,
+    columns: list[str] | None,
+    start: str | None,
+    end: str | None,
+    last_n: int | None,
+) -> pd.DataFrame:
+    """Liest nur die benötigten Spalten und Row-Groups."""
+    start = None if start is None else pd.Timestamp(start)
+    end   = None if end is None else pd.Timestamp(end)
+
+    groups = [
+        g for g in info["groups"]
+        if (start is None or g[3] >= start) and (end is None or g[2] <= end)
+    ]
+    if last_n is not None:
+        # Von hinten so viele Gruppen nehmen, bis last_n Zeilen sicher enthalten sind;
+        # Gruppen, die über start/end hinausragen, zählen nicht mit
+        rows, keep = 0, []
+        for g in reversed(groups):
+            _, _, first, last, n = g
+            keep.append(g)
+            if (start is None or first >= start) and (end is None or last <= end):
+                rows += n
+            if rows >= last_n:
+                break
+        groups = keep[::-1]
+
+    cols = None if columns is None else ["Date"] + list(columns)
+    return _select(_read_table(info, groups, cols).to_pandas(), None, start, end, last_n)
+
+
+def _read_table(info: dict, groups: list[tuple], columns: list[str] | None = None) -> pa.Table:
+    """Row-Groups (Einträge aus info["groups"]) dateiweise lesen, in Reihenfolge."""
+    by_part: dict[str, list[int]] = {}
+    for path, i, *_ in groups:
+        by_part.setdefault(path, []).append(i)
+    tables = [
+        pq.ParquetFile(path).read_row_groups(idx, columns=columns, use_pandas_metadata=True)
+        for path, idx in by_part.items()
+    ]
+    if not tables:
+        return info["schema"].empty_table().select(columns or info["schema"].names)
+    return pa.concat_tables(tables)
+
+
+def _select(
+    df: pd.DataFrame,
+    columns: list[str] | None,
+    start,
+    end,
+    last_n: int | None,
+) -> pd.DataFrame:
+    """Spalten- und Zeilenauswahl auf einem bereits geladenen DataFrame."""
+    if columns is not None:
+        df = df[list(columns)]
+    if start is not None or end is not None:
+        df = df.loc[start:end]
+    if last_n is not None:
+        df = df.iloc[-last_n:] if last_n > 0 else df.iloc[:0]
+    return df
+
+
+def _check_columns(available, columns: list[str] | None) -> None:
+    unknown = [c for c in columns or [] if c not in available]
+    if unknown:
+        raise KeyError(f"Unbekannte Feature-Spalte(n): {', '.join(unknown)}")
+
+
+def _state_path(ticker: str) -> str:
+    return os.path.join(FEATURES_DIR, f"{ticker}_state.json")
+
+
+def _pipeline_names() -> list[str]:
+    return [feature_graph.step_name(step) for step in FEATURE_PIPELINE]
+
+
+def _is_incremental() -> bool:
+    """
+    True wenn jeder Pipeline-Schritt zu einer inkrementellen Gruppe gehört.
+    Die Fortschreibung kennt nur die Standard-Parameter und keinen Kontext –
+    Schritte mit eigenen "params" oder "context" werden daher immer voll
+    berechnet.
+    """
+    covered = {name for steps, *_ in INCREMENTAL_STEPS.values() for name in steps}
+    return all(
+        feature_graph.step_name(step) in covered and not step.get("params") and not step.get("context")
+        for step in FEATURE_PIPELINE
+    )
+
+
+def _group_fingerprints() -> dict[str, dict[str, str]]:
+    """Aktuelle Fingerprints je inkrementeller Gruppe: {Gruppe: {Schritt: Fingerprint}}."""
+    fps = feature_graph.fingerprints(_graph())
+    return {
+        group: {name: fps[name] for name in steps if name in fps}
+        for group, (steps, *_) in INCREMENTAL_STEPS.items()
+    }
+
+
+def _init_states(df: pd.DataFrame, done: list[str]) -> dict | None:
+    """Zustand aller Gruppen – nur wenn df das Ergebnis der ganzen Pipeline ist."""
+    if not _is_incremental() or set(_pipeline_names()) - set(done):
+        return None
+    fps = _group_fingerprints()
+    states = {}
+    for group, (_, init_state, _, _) in INCREMENTAL_STEPS.items():
+        state = init_state(df, fps[group])
+        if state is None:
+            return None
+        states[group] = state
+    return states
+
+
+def _load_states(ticker: str) -> dict | None:
+    path = _state_path(ticker)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_part(ticker: str, table: pa.Table) -> str:
+    """Schreibt eine neue Datei des Tickers (atomar)."""
+    directory = _part_dir(ticker)
+    os.makedirs(directory, exist_ok=True)
+    name = f"part-{time.time_ns()}.parquet"
+    path = os.path.join(directory, name)
+    tmp = os.path.join(directory, f".{name}.tmp")
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+    return path
+
+
+def _replace_parts(ticker: str, table: pa.Table) -> None:
+    """Neue Datei mit dem ganzen Bestand schreiben, danach alle älteren entfernen."""
+    old = _all_parts(ticker)
+    new = _write_part(ticker, table)
+    for path in old:
+        if path != new:
+            os.remove(path)
+
+
+def _save_states(ticker: str, states: dict | None) -> None:
+    """Speichert den Zustand; ohne gültigen Zustand wird dieser entfernt."""
+    state_path = _state_path(ticker)
+    if states is None:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return
+    tmp = state_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(states, f)
+    os.replace(tmp, state_path)
+
+
+def _save(ticker: str, df: pd.DataFrame, done: list[str], states: dict | None) -> None:
+    """
+    Speichert den ganzen DataFrame als neue Datei (ältere entfallen) und den Zustand.
+    Die Parquet-Metadaten vermerken die enthaltenen Pipeline-Schritte (done).
+    """
+    table = pa.Table.from_pandas(df)
+    fps = feature_graph.fingerprints(_graph())
+    steps = json.dumps({name: fps[name] for name in done}).encode()
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: steps})
+
+    _replace_parts(ticker, table)
+    _save_states(ticker, states)
+
+
+def _append(ticker: str, rows: pd.DataFrame, info: dict, states: dict) -> None:
+    """
+    Hängt neue Zeilen als eigene Datei an – bestehende Dateien bleiben
+    unverändert. Schema und Metadaten wie die vorhandenen Dateien.
+    """
+    _write_part(ticker, pa.Table.from_pandas(rows).cast(info["schema"]))
+    if len(info["parts"]) + 1 > MAX_PARTS:
+        compact(ticker)
+    _save_states(ticker, states)
 
 
-def _run_pipeline(df: pd.DataFrame) -> pd.DataFrame:
-    """Führt alle Funktionen der FEATURE_PIPELINE sequentiell aus."""
-    for fn in FEATURE_PIPELINE:
-        df = fn(df)
+def _recompute(ticker: str, cached: pd.DataFrame, valid: list[str], missing: list[str]) -> pd.DataFrame:
+    """
+    Rechnet ungültige/fehlende Schritte auf dem Cache neu und speichert ihn.
+    Spalten, die kein Pipeline-Schritt mehr schreibt, werden dabei entfernt.
+    """
+    graph = _graph()
+    keep = [c for c in cached.columns if c in feature_graph.BASE_COLUMNS or c in graph["producers"]]
+    df = _run_pipeline(cached[keep], missing, ticker)
+    # Spaltenreihenfolge wie nach einer Vollberechnung
+    written = [c for name in graph["order"] for c in graph["steps"][name]["writes"] if c in df.columns]
+    df = df[[c for c in df.columns if c not in graph["producers"]] + written]
+
+    done = [n for n in _pipeline_names() if n in missing or n in valid]
+    _save(ticker, df, done, _init_states(df, done))
+    print(f"[feature_store] {ticker}: {len(missing)} Pipeline-Schritt(e) neu berechnet")
     return df
 
 
+def _update_incremental(ticker: str, info: dict) -> pd.DataFrame | None:
+    """
+    Berechnet nur die Zeilen nach dem letzten Cache-Datum und hängt sie an.
+    Vom Cache werden nur die letzten TAIL_ROWS Zeilen gelesen.
+
+    Rückgabe:
+        Angehängte Zeilen (ggf. leer) oder None → Vollberechnung nötig
+    """
+    states = _load_states(ticker)
+    if states is None or not _is_incremental():
+        return None
+    cached = _read(info, None, None, None, TAIL_ROWS)
+    fps = _group_fingerprints()
+    for group, (_, _, _, matches) in INCREMENTAL_STEPS.items():
+        if not matches(states.get(group), cached, fps[group]):
+            return None
+
+    prices = fetch_prices(ticker)
+    last   = cached.index.max()
+
+    # Rückwirkend angepasste Kurse (Splits/Dividenden) → Zustand ungültig
+    if last not in prices.index or not np.isclose(
+        prices.at[last, "Close"], cached.at[last, "Close"], rtol=1e-9, atol=0.0,
+    ):
+        return None
+
+    new = prices.loc[prices.index > last]
+    if new.empty:
+        return new
+
+    rows = new
+    for group, (_, _, extend, _) in INCREMENTAL_STEPS.items():
+        rows, states[group] = extend(cached, rows, states[group])
+
+    _append(ticker, rows, info, states)
+    print(f"[feature_store] {ticker}: {len(rows)} neue Zeile(n) inkrementell angehängt")
+
+    return rows
+
+
 # ── Öffentliche API ───────────────────────────────────────────────────────────
 
-def get_features(ticker: str, force_refresh: bool = False) -> pd.DataFrame:
+def get_features(
+    ticker: str,
+    force_refresh: bool = False,
+    columns: list[str] | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    last_n: int | None = None,
+) -> pd.DataFrame:
     """
     Gibt einen DataFrame mit OHLCV-Daten und allen berechneten Indikatoren zurück.
 
     Beim ersten Aufruf werden die Indikatoren berechnet und als Parquet gespeichert.
-    Folgeaufrufe lesen direkt aus dem Cache — kein erneutes Rechnen.
+    Folgeaufrufe lesen direkt aus dem Cache — kein erneutes Rechnen. Ist der Cache
+    veraltet, werden nur die neuen Handelstage berechnet und angehängt.
+
+    Ist der Cache aktuell, werden nur die angefragten Spalten und die Row-Groups
+    im Datumsbereich gelesen. Fehlen angefragte Spalten in der Datei, werden nur
+    die Pipeline-Schritte nachgerechnet, die dort noch nicht enthalten sind.
 
     Parameter:
         ticker        : Ticker-Symbol, z.B. "AAPL"
         force_refresh : True = Cache ignorieren und neu berechnen
+        columns       : nur diese Spalten (Standard: alle)
+        start         : erster Tag (inklusive), "YYYY-MM-DD"
+        end           : letzter Tag (inklusive), "YYYY-MM-DD"
+        last_n        : nur die letzten n Zeilen (nach start/end)
 
     Rückgabe:
         DataFrame mit Spalten: Open, High, Low, Close, Volume + alle Indikatoren
-    """
-    path = _parquet_path(ticker)
+        bzw. nur `columns`
 
-    if not force_refresh and os.path.exists(path):
-        cached = pd.read_parquet(path)
-        if _is_up_to_date(cached):
-            return cached
+    Raises:
+        KeyError wenn angefragte Spalten auch nach der Pipeline fehlen
+    """
+    info = None if force_refresh else _file_info(ticker)
+
+    if info is not None:
+        valid   = _valid_steps(info)
+        current = _is_up_to_date(info["last"])
+        # Veralteter Cache wird ohnehin fortgeschrieben → dann alle ungültigen Schritte
+        missing = _missing_steps(info, valid, columns if current else None)
+        if missing:
+            cached = _recompute(ticker, _read(info, None, None, None, None), valid, missing)
+            if current:
+                _check_columns(cached.columns, columns)
+                return _select(cached, columns, start, end, last_n)
+            info = _file_info(ticker)
+        elif current:
+            _check_columns(info["columns"], columns)
+            return _read(info, columns, start, end, last_n)
+
+        if _update_incremental(ticker, info) is not None:
+            info = _file_info(ticker)
+            _check_columns(info["columns"], columns)
+            return _read(info, columns, start, end, last_n)
 
     df = fetch_prices(ticker)
-    df = _run_pipeline(df)
+    df = _run_pipeline(df, ticker=ticker)
 
-    os.makedirs(FEATURES_DIR, exist_ok=True)
-    df.to_parquet(path)
+    done = _pipeline_names()
+    _save(ticker, df, done, _init_states(df, done))
     print(f"[feature_store] {ticker}: Parquet gespeichert ({len(df)} Zeilen, {len(df.columns)} Spalten)")
 
-    return df
+    _check_columns(df.columns, columns)
+    return _select(df, columns, start, end, last_n)
+
+
+def parquet_parts(ticker: str) -> list[str]:
+    """
+    Gültige Feature-Dateien eines Tickers, chronologisch – für Leser, die
+    selbst blockweise lesen (z.B. src/ml/feature_matrix.py). Die Features
+    werden dabei weder berechnet noch aktualisiert.
+
+    Rückgabe:
+        Liste von Pfaden (leer ohne Feature-Cache); alle mit gleichem Schema
+    """
+    info = _file_info(ticker)
+    return [] if info is None else info["parts"]
+
+
+def compact(ticker: str) -> None:
+    """
+    Fasst alle Dateien eines Tickers zu einer zusammen (neue Datei zuerst,
+    dann alte entfernen).
+    """
+    info = _file_info(ticker)
+    if info is None or len(info["parts"]) <= 1:
+        return
+    _replace_parts(ticker, _read_table(info, info["groups"]))
 
 
 def refresh_all(tickers: list[str]) -> None:
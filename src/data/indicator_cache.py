@@ -0,0 +1,219 @@
+"""
+Indicator Cache – inhaltsadressierter Cache einzelner Indikator-Spalten
+───────────────────────────────────────────────────────────────────────
+Der Feature Store speichert je Ticker genau eine Konfiguration: die
+Standard-Parameter aus add_all_indicators(). Parameter-Sweeps (RSI 7…28,
+MACD-Varianten, Bollinger mit 1.5/2.0/2.5 σ …) würden jede Variante bei
+jedem Lauf neu berechnen. Dieser Cache speichert die Spalten EINES
+Indikator-Aufrufs unter einem Schlüssel aus:
+
+    - Funktion       : Modul + Name, z.B. src.ta.indikatoren.oszillatoren.add_rsi
+    - Code-Stand     : Hash der Quelldatei des Indikator-Moduls
+    - Parameter      : alle Argumente inkl. Standardwerte (add_rsi() ≡ add_rsi(period=14))
+    - Kursdaten      : Fingerprint über Datum + OHLCV (fingerprint())
+    - Kernel         : "lfilter" rechnet nicht bitgleich → eigener Schlüssel
+
+Gleiche Eingaben → gleicher Schlüssel → Spalten aus der Datei statt neu
+rechnen, unabhängig vom Ticker (identische Kurse teilen sich den Eintrag).
+
+Speicher (data/features/columns/):
+    {schlüssel}.parquet   ← Spalten eines Aufrufs, ohne Index
+    Schreiben atomar (.tmp + os.replace). Jeder Treffer setzt die mtime neu;
+    übersteigt der Cache MAX_BYTES, werden die am längsten nicht genutzten
+    Einträge gelöscht (LRU nach mtime).
+
+Voraussetzung: die Funktion folgt der add_*-Konvention (siehe spalten.py),
+also add_x(df, <parameter>, out=None) mit Builder-Modus.
+
+Verwendung:
+    from src.data.indicator_cache import add_cached, fingerprint
+    from src.ta.indikatoren.oszillatoren import add_rsi
+
+    key = fingerprint(df)                          # einmal je Kursreihe
+    for period in range(7, 29):
+        cols = {}
+        add_cached(add_rsi, df, period=period, out=cols, data_key=key)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_graph import code_hash
+from src.ta.indikatoren import kernels
+from src.ta.indikatoren.spalten import emit_columns
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "features", "columns")
+
+MAX_BYTES = 512 * 1024 ** 2      # Obergrenze des Caches auf der Platte
+
+CACHE_VERSION = 1                # erhöhen, wenn sich das Dateiformat ändert
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _params(fn, params: dict) -> dict:
+    """Alle Parameter von fn außer df/out, fehlende mit ihren Standardwerten."""
+    bound = inspect.signature(fn).bind_partial(**params)
+    bound.apply_defaults()
+    return {k: v for k, v in bound.arguments.items() if k not in ("df", "out")}
+
+
+def _key(fn, params: dict, data_key: str) -> str:
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "fn":      f"{fn.__module__}.{fn.__qualname__}",
+        "code":    code_hash(fn),
+        "params":  _params(fn, params),
+        "data":    data_key,
+        "kernel":  "lfilter" if kernels.get_backend() == "lfilter" else "exact",
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def _entries() -> list[os.DirEntry]:
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    return [
+        e for e in os.scandir(CACHE_DIR)
+        if e.name.endswith(".parquet") and not e.name.startswith(".")
+    ]
+
+
+def _load(key: str) -> dict | None:
+    """Gespeicherte Spalten als {spalte: ndarray | Categorical} oder None."""
+    path = _path(key)
+    try:
+        frame = pd.read_parquet(path)
+        os.utime(path)                                  # LRU: zuletzt genutzt
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+    return {
+        col: frame[col].array if isinstance(frame[col].dtype, pd.CategoricalDtype)
+        else frame[col].to_numpy()
+        for col in frame.columns
+    }
+
+
+def _store(key: str, cols: dict, n_rows: int) -> None:
+    """Schreibt die Spalten eines Aufrufs atomar und räumt danach ggf. auf."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    frame = pd.DataFrame(
+        {col: v.to_numpy() if isinstance(v, pd.Series) else v for col, v in cols.items()},
+        index=pd.RangeIndex(n_rows),
+    )
+    path = _path(key)
+    tmp = os.path.join(CACHE_DIR, f".{key}.parquet.tmp")
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    evict()
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """
+    Inhalts-Hash der Kursdaten: Datums-Index und die vorhandenen OHLCV-Spalten.
+
+    Für mehrere Aufrufe auf derselben Kursreihe einmal berechnen und als
+    data_key übergeben – sonst wird der Hash bei jedem Aufruf neu gebildet.
+    """
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(df.index).as_unit("ns").asi8).tobytes())
+    for col in OHLCV:
+        if col in df.columns:
+            values = np.ascontiguousarray(df[col].to_numpy())
+            digest.update(f"{col}:{values.dtype.str}".encode())
+            digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def cached_columns(fn, df: pd.DataFrame, data_key: str | None = None, **params) -> dict:
+    """
+    Spalten eines Indikator-Aufrufs – aus dem Cache oder frisch berechnet.
+
+    Parameter:
+        fn       : Indikator-Funktion nach add_*-Konvention, z.B. add_macd
+        df       : OHLCV-DataFrame
+        data_key : fingerprint(df), falls schon bekannt
+        **params : Parameter für fn, z.B. fast=8, slow=21
+
+    Rückgabe:
+        {spalte: ndarray | Categorical} in Ausgabereihenfolge von fn
+    """
+    key = _key(fn, params, data_key or fingerprint(df))
+    cols = _load(key)
+    if cols is not None:
+        return cols
+
+    cols = {}
+    fn(df, out=cols, **params)
+    _store(key, cols, len(df))
+    return cols
+
+
+def add_cached(
+    fn,
+    df: pd.DataFrame,
+    out: dict | None = None,
+    data_key: str | None = None,
+    **params,
+) -> pd.DataFrame:
+    """
+    Wie fn(df, **params, out=out), aber über den Cache.
+
+    Parameter:
+        fn       : Indikator-Funktion nach add_*-Konvention
+        df       : OHLCV-DataFrame
+        out      : Spalten-Puffer (Builder-Modus, siehe spalten.py)
+        data_key : fingerprint(df), falls schon bekannt
+        **params : Parameter für fn
+
+    Rückgabe:
+        Kopie von df mit den Spalten von fn, im Builder-Modus df selbst
+    """
+    return emit_columns(df, cached_columns(fn, df, data_key=data_key, **params), out)
+
+
+def cache_size() -> int:
+    """Belegter Platz aller Cache-Einträge in Bytes."""
+    return sum(e.stat().st_size for e in _entries())
+
+
+def evict(max_bytes: int | None = None) -> int:
+    """
+    Löscht die am längsten nicht genutzten Einträge, bis der Cache unter
+    max_bytes liegt (Standard: MAX_BYTES).
+
+    Rückgabe:
+        Anzahl gelöschter Einträge
+    """
+    limit = MAX_BYTES if max_bytes is None else max_bytes
+    entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in _entries()]
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:                       # parallel schon entfernt
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear() -> int:
+    """Leert den Cache vollständig. Rückgabe: Anzahl gelöschter Einträge."""
+    return evict(0)
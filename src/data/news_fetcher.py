@@ -1,31 +1,315 @@
+"""
+News Fetcher – Alpha Vantage NEWS_SENTIMENT
+───────────────────────────────────────────
+fetch_news()      : ein Ticker, ein Tag (blockierend, wie bisher)
+fetch_news_many() : ganzes Universum über viele Tage (asyncio, gebündelt)
+
+Bündelung:
+    Der Parameter tickers= der API verknüpft mehrere Symbole mit UND (nur
+    Artikel, die ALLE nennen) – für Einzel-Ticker-News nicht bündelbar.
+    Gebündelt wird daher über die Zeit: ein Request je Ticker deckt bis zu
+    RANGE_DAYS Tage ab (limit=FEED_LIMIT) und wird lokal auf die einzelnen
+    Tage (Fenster 00:00–09:30) aufgeteilt. Liefert die API volle FEED_LIMIT
+    Artikel, wird der Bereich halbiert und erneut abgefragt.
+
+Durchsatz und Quoten:
+    - Ein gemeinsamer requests.Session-Pool (Keep-Alive) für alle Requests.
+      Die Requests selbst sind blockierend (requests) und laufen in einem
+      eigenen ThreadPool mit `concurrency` Threads; asyncio koordiniert nur
+      Rate-Limit, Wiederholungen und Halbierung – die Nebenläufigkeit ist
+      thread-basiert, begrenzt durch concurrency (nicht durch den
+      Standard-Executor der Event-Loop)
+    - Token-Bucket mit RATE_PER_MINUTE (Umgebungsvariable
+      ALPHA_VANTAGE_RPM, Standard 5 = Free Tier)
+    - Wiederholung mit exponentiellem Backoff bei Netzwerkfehlern, HTTP
+      429/5xx und den Rate-Limit-Hinweisen der API ("Note"/"Information")
+
+Speicher: News Store (src/data/news_store.py) – jeder Artikel einmal, dazu
+das Sentiment je Ticker; bereits abgefragte (Ticker, Tag) werden nicht
+erneut angefragt, auch wenn es keine Treffer gab. Als abgefragt gilt ein
+Tag erst, wenn sein Fenster (bis 09:30 New York) bei der Antwort schon
+geschlossen war – ein Abruf um 08:00 wird beim nächsten Lauf wiederholt.
+Alte CSV-Dateien ({ticker}_{datum}_news.csv) werden beim ersten Aufruf
+übernommen.
+
+Verwendung:
+    from src.data.news_fetcher import fetch_news, fetch_news_many
+
+    df   = fetch_news("AAPL", "2025-03-03")
+    news = fetch_news_many(["AAPL", "MSFT"], ["2025-03-03", "2025-03-04"])
+    news["AAPL"]["2025-03-03"]                       # DataFrame
+"""
+
+import asyncio
 import os
-import requests
-import pandas as pd
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from functools import partial
+
+import pandas as pd
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from src.data import news_store
 
 load_dotenv()
 
 NEWS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "news")
 ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
 
+RATE_PER_MINUTE = float(os.getenv("ALPHA_VANTAGE_RPM", "5"))   # API-Quote
+CONCURRENCY     = 4       # gleichzeitige Requests
+MAX_RETRIES     = 4       # Wiederholungen je Request
+BACKOFF         = 2.0     # Sekunden, verdoppelt je Versuch (+ Zufall)
+TIMEOUT         = 10.0    # Sekunden je Request
+RANGE_DAYS      = 30      # Tage je Request
+FEED_LIMIT      = 1000    # Maximum der API je Request
+
+COLUMNS = ["title", "summary", "time_published", "sentiment_score", "sentiment_label"]
+
+MARKET_TZ    = "America/New_York"
+WINDOW_CLOSE = "09:30"    # Ende des News-Fensters eines Tages (Ortszeit MARKET_TZ)
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _params(ticker: str, first: str, last: str, api_key: str, limit: int) -> dict:
+    """Request-Parameter für das Fenster first 00:00 bis last 09:30."""
+    return {
+        "function": "NEWS_SENTIMENT",
+        "tickers": ticker,
+        "time_from": first.replace("-", "") + "T0000",
+        "time_to": last.replace("-", "") + "T0930",
+        "apikey": api_key,
+        "sort": "EARLIEST",
+        "limit": limit,
+    }
+
+
+def _parse_time(values) -> pd.Series:
+    """Alpha-Vantage-Zeitstempel "20250303T081500" → Timestamp."""
+    return pd.to_datetime(pd.Series(values, dtype=object), format="%Y%m%dT%H%M%S", errors="coerce")
+
+
+def _parse_feed(feed: list[dict]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Feed → (Artikel, Ticker-Sentiments) im Format des News Store. Übernommen
+    werden die Sentiments ALLER genannten Ticker, nicht nur des gesuchten.
+    """
+    articles, links = [], []
+    for item in feed:
+        published = item.get("time_published")
+        aid = news_store.article_id(item.get("url"), item.get("title"), _parse_time([published])[0])
+        articles.append({
+            "article_id": aid,
+            "time_published": published,
+            "url": item.get("url"),
+            "title": item.get("title"),
+            "summary": item.get("summary"),
+            "source": item.get("source"),
+            "overall_sentiment_score": item.get("overall_sentiment_score"),
+            "overall_sentiment_label": item.get("overall_sentiment_label"),
+        })
+        for ts in item.get("ticker_sentiment", []):
+            links.append({
+                "article_id": aid,
+                "ticker": ts["ticker"],
+                "time_published": published,
+                "relevance_score": ts.get("relevance_score"),
+                "sentiment_score": float(ts.get("ticker_sentiment_score", 0)),
+                "sentiment_label": ts.get("ticker_sentiment_label"),
+            })
+    articles, links = pd.DataFrame(articles), pd.DataFrame(links)
+    for df in (articles, links):
+        if not df.empty:
+            df["time_published"] = _parse_time(df["time_published"])
+    return articles, links
+
+
+def _split_by_day(rows: pd.DataFrame, dates: list[str]) -> dict[str, pd.DataFrame]:
+    """Verteilt Zeilen auf die Tage (Fenster 00:00–09:30 wie fetch_news)."""
+    result = {}
+    day = rows["time_published"].dt.normalize()
+    clock = rows["time_published"].dt.strftime("%H%M")
+    for fetch_date in dates:
+        hits = rows[(day == pd.Timestamp(fetch_date)) & (clock <= "0930")]
+        if not hits.empty:
+            result[fetch_date] = hits[COLUMNS].reset_index(drop=True)
+    return result
+
+
+def _from_store(ticker: str, dates: list[str]) -> dict[str, pd.DataFrame]:
+    """News eines Tickers für die Tage aus dem Store – eine Bereichsabfrage."""
+    rows = news_store.read_sentiment([ticker], min(dates), max(dates), with_articles=True)
+    return _split_by_day(rows, dates)
+
+
+def _migrate_csv() -> int:
+    """
+    Übernimmt alte {ticker}_{datum}_news.csv in den Store und löscht sie.
+    Ohne URL wird die article_id aus Titel und Zeitpunkt gebildet.
+
+    Rückgabe:
+        Anzahl übernommener Dateien
+    """
+    if not os.path.isdir(NEWS_DIR):
+        return 0
+    files = [f for f in sorted(os.listdir(NEWS_DIR)) if f.endswith("_news.csv")]
+    for name in files:
+        ticker, fetch_date = name[:-len("_news.csv")].rsplit("_", 1)
+        df = pd.read_csv(os.path.join(NEWS_DIR, name), dtype={"time_published": str})
+        if not df.empty:
+            df["time_published"] = _parse_time(df["time_published"])
+            df["article_id"] = [
+                news_store.article_id(None, title, ts)
+                for title, ts in zip(df["title"], df["time_published"])
+            ]
+            df["ticker"] = ticker
+            news_store.append(df, df)
+        news_store.mark_fetched(ticker, [fetch_date])
+        os.remove(os.path.join(NEWS_DIR, name))
+    return len(files)
+
+
+def _window_closed(fetch_date: str) -> bool:
+    """True wenn das Fenster des Tages (bis 09:30 New York) bereits vorbei ist."""
+    close = pd.Timestamp(f"{fetch_date} {WINDOW_CLOSE}").tz_localize(MARKET_TZ)
+    return pd.Timestamp.now(tz=MARKET_TZ) >= close
+
+
+def _mark_closed(ticker: str, dates: list[str]) -> None:
+    """Vermerkt nur Tage mit geschlossenem Fenster als abgefragt (offene kommen später erneut)."""
+    closed = [d for d in dates if _window_closed(d)]
+    if closed:
+        news_store.mark_fetched(ticker, closed)
 
-def _csv_path(ticker: str, fetch_date: str) -> str:
-    return os.path.join(NEWS_DIR, f"{ticker}_{fetch_date}_news.csv")
 
+def _ranges(dates: list[str], max_days: int) -> list[list[str]]:
+    """Sortierte Tage → zusammenhängende Blöcke von höchstens max_days Kalendertagen."""
+    blocks: list[list[str]] = []
+    for d in sorted(set(dates)):
+        if blocks and (date.fromisoformat(d) - date.fromisoformat(blocks[-1][0])).days < max_days:
+            blocks[-1].append(d)
+        else:
+            blocks.append([d])
+    return blocks
 
-def _load_cache(ticker: str, fetch_date: str) -> pd.DataFrame | None:
-    path = _csv_path(ticker, fetch_date)
-    if not os.path.exists(path):
-        return None
-    return pd.read_csv(path)
 
+def _session(pool_size: int) -> requests.Session:
+    """Session mit Keep-Alive-Pool für alle Requests eines Laufs."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _bucket(rate_per_minute: float, burst: int = 1) -> dict:
+    """Token-Bucket: rate_per_minute Tokens je Minute, höchstens burst auf Vorrat."""
+    return {
+        "rate": rate_per_minute / 60.0,
+        "capacity": float(burst),
+        "tokens": float(burst),
+        "updated": time.monotonic(),
+        "lock": asyncio.Lock(),
+    }
+
+
+async def _acquire(bucket: dict) -> None:
+    """Wartet, bis ein Token frei ist, und verbraucht es."""
+    async with bucket["lock"]:
+        while True:
+            now = time.monotonic()
+            bucket["tokens"] = min(
+                bucket["capacity"], bucket["tokens"] + (now - bucket["updated"]) * bucket["rate"],
+            )
+            bucket["updated"] = now
+            if bucket["tokens"] >= 1.0:
+                bucket["tokens"] -= 1.0
+                return
+            await asyncio.sleep((1.0 - bucket["tokens"]) / bucket["rate"])
+
+
+def _throttled(data: dict) -> bool:
+    """Alpha Vantage meldet Quotenüberschreitung mit HTTP 200 und Hinweistext."""
+    note = data.get("Note") or data.get("Information") or ""
+    return "feed" not in data and ("call frequency" in note or "rate limit" in note.lower())
+
+
+async def _request(
+    session: requests.Session,
+    executor: ThreadPoolExecutor,
+    bucket: dict,
+    url: str,
+    params: dict,
+) -> dict:
+    """
+    Ein API-Request mit Rate-Limit und Wiederholung.
+
+    Raises:
+        requests.HTTPError bei nicht wiederholbaren HTTP-Fehlern (4xx außer 429)
+        RuntimeError wenn alle Versuche gescheitert sind
+    """
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(BACKOFF * 2 ** (attempt - 1) * (1 + random.random()))
+        await _acquire(bucket)
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                executor, partial(session.get, url, params=params, timeout=TIMEOUT),
+            )
+        except requests.RequestException as e:
+            last_error = e
+            continue
+        if response.status_code == 429 or response.status_code >= 500:
+            last_error = requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            continue
+        response.raise_for_status()
+        data = response.json()
+        if _throttled(data):
+            last_error = RuntimeError(data.get("Note") or data.get("Information"))
+            continue
+        return data
+    raise RuntimeError(f"{params.get('tickers')}: {MAX_RETRIES + 1} Versuche gescheitert – {last_error}")
+
+
+async def _fetch_block(
+    session: requests.Session,
+    executor: ThreadPoolExecutor,
+    bucket: dict,
+    limit: asyncio.Semaphore,
+    url: str,
+    api_key: str,
+    ticker: str,
+    dates: list[str],
+) -> list[dict]:
+    """Ein Request für einen Datumsblock; bei vollem Feed rekursiv halbiert."""
+    async with limit:
+        data = await _request(session, executor, bucket, url, _params(ticker, dates[0], dates[-1], api_key, FEED_LIMIT))
+    if "feed" not in data:
+        raise RuntimeError(data.get("Information") or data.get("Error Message") or "Antwort ohne feed")
+    feed = data["feed"]
+    if len(feed) >= FEED_LIMIT and len(dates) > 1:
+        mid = len(dates) // 2
+        left, right = await asyncio.gather(
+            _fetch_block(session, executor, bucket, limit, url, api_key, ticker, dates[:mid]),
+            _fetch_block(session, executor, bucket, limit, url, api_key, ticker, dates[mid:]),
+        )
+        return left + right
+    return feed
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
 
 def fetch_news(ticker: str, fetch_date: str = None) -> pd.DataFrame | None:
     """
     Gibt Finanznachrichten mit Sentiment-Score für einen Ticker zurück.
     Benötigt einen Alpha Vantage API-Key in der .env Datei (ALPHA_VANTAGE_KEY).
-    Prüft zuerst den lokalen CSV-Cache.
+    Prüft zuerst den News Store.
 
     Parameter:
         ticker:     z.B. "AAPL"
@@ -33,55 +317,123 @@ def fetch_news(ticker: str, fetch_date: str = None) -> pd.DataFrame | None:
 
     Rückgabe:
         DataFrame mit Spalten: title, summary, time_published, sentiment_score, sentiment_label
-        None wenn kein API-Key vorhanden oder Fehler aufgetreten
+        None wenn keine News, kein API-Key vorhanden oder Fehler aufgetreten
     """
     if fetch_date is None:
         fetch_date = date.today().strftime("%Y-%m-%d")
 
-    cached = _load_cache(ticker, fetch_date)
-    if cached is not None:
-        return cached
+    _migrate_csv()
+    if not news_store.fetched([ticker], fetch_date, fetch_date):
+        api_key = os.getenv("ALPHA_VANTAGE_KEY")
+        if not api_key:
+            print("[news_fetcher] Kein ALPHA_VANTAGE_KEY in .env gefunden. News-Abruf übersprungen.")
+            return None
+
+        params = _params(ticker, fetch_date, fetch_date, api_key, 50)
+        response = requests.get(ALPHA_VANTAGE_URL, params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+
+        if "feed" not in data:
+            print(f"[news_fetcher] Keine News für {ticker} am {fetch_date}.")
+            return None
+
+        news_store.append(*_parse_feed(data["feed"]))
+        _mark_closed(ticker, [fetch_date])
+
+    return _from_store(ticker, [fetch_date]).get(fetch_date)
 
-    api_key = os.getenv("ALPHA_VANTAGE_KEY")
-    if not api_key:
+
+async def fetch_news_many_async(
+    tickers: list[str],
+    dates: list[str] | None = None,
+    api_key: str | None = None,
+    url: str = ALPHA_VANTAGE_URL,
+    rate_per_minute: float = RATE_PER_MINUTE,
+    concurrency: int = CONCURRENCY,
+    range_days: int = RANGE_DAYS,
+) -> dict[str, dict[str, pd.DataFrame]]:
+    """
+    Coroutine zu fetch_news_many() – für Aufrufer mit eigener Event-Loop.
+    Parameter und Rückgabe siehe fetch_news_many().
+    """
+    if dates is None:
+        dates = [date.today().strftime("%Y-%m-%d")]
+    api_key = api_key or os.getenv("ALPHA_VANTAGE_KEY")
+
+    dates   = sorted(set(dates))
+    tickers = list(dict.fromkeys(tickers))
+
+    _migrate_csv()
+    done = news_store.fetched(tickers, dates[0], dates[-1])
+    todo: dict[str, list[str]] = {}
+    for ticker in tickers:
+        missing = [d for d in dates if (ticker, d) not in done]
+        if missing:
+            todo[ticker] = missing
+
+    if todo and not api_key:
         print("[news_fetcher] Kein ALPHA_VANTAGE_KEY in .env gefunden. News-Abruf übersprungen.")
-        return None
+        todo = {}
 
-    params = {
-        "function": "NEWS_SENTIMENT",
-        "tickers": ticker,
-        "time_from": fetch_date.replace("-", "") + "T0000",
-        "time_to": fetch_date.replace("-", "") + "T0930",
-        "apikey": api_key,
-        "sort": "EARLIEST",
-        "limit": 50,
-    }
+    bucket = _bucket(rate_per_minute)
+    limit  = asyncio.Semaphore(concurrency)
+    jobs   = [(t, block) for t, ds in todo.items() for block in _ranges(ds, range_days)]
 
-    response = requests.get(ALPHA_VANTAGE_URL, params=params, timeout=10)
-    response.raise_for_status()
-    data = response.json()
+    session  = _session(concurrency)
+    executor = ThreadPoolExecutor(max(1, concurrency), thread_name_prefix="news")
+    try:
+        outcomes = await asyncio.gather(
+            *(_fetch_block(session, executor, bucket, limit, url, api_key, t, block) for t, block in jobs),
+            return_exceptions=True,
+        )
+    finally:
+        executor.shutdown(wait=False)
+        session.close()
 
-    if "feed" not in data:
-        print(f"[news_fetcher] Keine News für {ticker} am {fetch_date}.")
-        return None
-
-    rows = []
-    for article in data["feed"]:
-        for ts in article.get("ticker_sentiment", []):
-            if ts["ticker"] == ticker:
-                rows.append({
-                    "title": article.get("title"),
-                    "summary": article.get("summary"),
-                    "time_published": article.get("time_published"),
-                    "sentiment_score": float(ts.get("ticker_sentiment_score", 0)),
-                    "sentiment_label": ts.get("ticker_sentiment_label"),
-                })
-
-    if not rows:
-        return None
-
-    df = pd.DataFrame(rows)
-    os.makedirs(NEWS_DIR, exist_ok=True)
-    df.to_csv(_csv_path(ticker, fetch_date), index=False)
-
-    return df
+    failed: set[tuple[str, str]] = set()
+    for (ticker, block), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"[news_fetcher] {ticker} {block[0]}…{block[-1]}: {type(outcome).__name__}: {outcome}")
+            failed.update((ticker, d) for d in block)
+            continue
+        news_store.append(*_parse_feed(outcome))
+        _mark_closed(ticker, block)
+
+    result: dict[str, dict[str, pd.DataFrame]] = {}
+    for ticker in tickers:
+        available = [d for d in dates if (ticker, d) not in failed and (ticker in todo or (ticker, d) in done)]
+        result[ticker] = _from_store(ticker, available) if available else {}
+    return result
+
+
+def fetch_news_many(
+    tickers: list[str],
+    dates: list[str] | None = None,
+    api_key: str | None = None,
+    url: str = ALPHA_VANTAGE_URL,
+    rate_per_minute: float = RATE_PER_MINUTE,
+    concurrency: int = CONCURRENCY,
+    range_days: int = RANGE_DAYS,
+) -> dict[str, dict[str, pd.DataFrame]]:
+    """
+    News für viele Ticker und Tage: gebündelte, parallele Requests mit
+    Rate-Limit und Wiederholung (Details siehe Modul-Docstring).
+
+    Parameter:
+        tickers         : Ticker-Symbole
+        dates           : Tage "YYYY-MM-DD" (Standard: heute)
+        api_key         : Alpha Vantage Key (Standard: ALPHA_VANTAGE_KEY aus .env)
+        url             : API-Endpunkt (z.B. lokaler Test-Server)
+        rate_per_minute : Request-Quote (Standard: RATE_PER_MINUTE)
+        concurrency     : gleichzeitige Requests
+        range_days      : Tage je Request
+
+    Rückgabe:
+        {ticker: {datum: DataFrame}} – nur Tage mit News; fehlgeschlagene
+        Blöcke werden gemeldet und fehlen im Ergebnis
+    """
+    return asyncio.run(fetch_news_many_async(
+        tickers, dates, api_key=api_key, url=url, rate_per_minute=rate_per_minute,
+        concurrency=concurrency, range_days=range_days,
+    ))
@@ -0,0 +1,291 @@
+"""
+News Store – spaltenbasiertes, dedupliziertes News-Archiv
+─────────────────────────────────────────────────────────
+Ersetzt die CSV-Dateien je Ticker und Tag ({ticker}_{datum}_news.csv).
+Ein Artikel, der mehrere Ticker nennt, wird genau einmal gespeichert; das
+Sentiment je Ticker liegt in einer eigenen Verknüpfungstabelle.
+
+Layout (Parquet, Hive-partitioniert nach Monat der Veröffentlichung):
+    data/news/store/
+        articles/month=2025-03/part-….parquet           ← je Artikel eine Zeile
+        ticker_sentiment/month=2025-03/part-….parquet   ← je Artikel × Ticker
+        fetched/month=2025-03/part-….parquet            ← abgefragte (Ticker, Tag)
+
+    articles         : article_id, time_published, url, title, summary, source,
+                       overall_sentiment_score, overall_sentiment_label
+    ticker_sentiment : article_id, ticker, time_published, relevance_score,
+                       sentiment_score, sentiment_label
+    fetched          : ticker, date – auch Tage ohne Treffer, damit sie nicht
+                       bei jedem Lauf erneut angefragt werden
+
+article_id = sha1 der URL (ohne URL: Titel + Zeitpunkt). Gleicher Artikel →
+gleicher Zeitpunkt → gleiche Monatspartition; beim Anhängen werden nur die
+article_ids dieser Partitionen gelesen (Spaltenprojektion) und Duplikate
+verworfen.
+
+Eigenschaften wie im Price Store: append-only, atomare Dateien (.tmp +
+os.replace), Kompaktierung ab MAX_PARTS Dateien je Partition. Abfragen über
+lange Zeiträume öffnen nur die Monatspartitionen im Bereich; Ticker- und
+Zeitfilter wirken bereits beim Lesen.
+
+Verwendung:
+    from src.data import news_store
+
+    news_store.append(articles, links)
+    df = news_store.read_sentiment(["AAPL"], start="2025-01-01")         # 90-Tage-Fenster u.ä.
+    df = news_store.read_sentiment(["AAPL"], start="2025-01-01", with_articles=True)
+"""
+
+import hashlib
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "news", "store")
+
+MAX_PARTS = 64     # ab so vielen Dateien je Monatspartition wird kompaktiert
+
+ARTICLE_SCHEMA = pa.schema([
+    ("article_id",              pa.string()),
+    ("time_published",          pa.timestamp("ns")),
+    ("url",                     pa.string()),
+    ("title",                   pa.string()),
+    ("summary",                 pa.string()),
+    ("source",                  pa.string()),
+    ("overall_sentiment_score", pa.float64()),
+    ("overall_sentiment_label", pa.string()),
+])
+
+LINK_SCHEMA = pa.schema([
+    ("article_id",      pa.string()),
+    ("ticker",          pa.string()),
+    ("time_published",  pa.timestamp("ns")),
+    ("relevance_score", pa.float64()),
+    ("sentiment_score", pa.float64()),
+    ("sentiment_label", pa.string()),
+])
+
+FETCHED_SCHEMA = pa.schema([
+    ("ticker", pa.string()),
+    ("date",   pa.timestamp("ns")),
+])
+
+# Tabelle → (Schema, Zeitspalte für die Partition, Schlüssel für die Deduplizierung)
+TABLES = {
+    "articles":         (ARTICLE_SCHEMA, "time_published", ["article_id"]),
+    "ticker_sentiment": (LINK_SCHEMA,    "time_published", ["article_id", "ticker"]),
+    "fetched":          (FETCHED_SCHEMA, "date",           ["ticker", "date"]),
+}
+
+_PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _table_dir(table: str) -> str:
+    return os.path.join(STORE_DIR, table)
+
+
+def _partition_dir(table: str, month: str) -> str:
+    return os.path.join(_table_dir(table), f"month={month}")
+
+
+def _parts(table: str, month: str) -> list[str]:
+    path = _partition_dir(table, month)
+    if not os.path.isdir(path):
+        return []
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.endswith(".parquet") and not name.startswith(".")
+    ]
+
+
+def _write_part(table: str, month: str, df: pd.DataFrame) -> str:
+    """Schreibt df als neue Datei der Monatspartition (atomar)."""
+    schema = TABLES[table][0]
+    directory = _partition_dir(table, month)
+    os.makedirs(directory, exist_ok=True)
+    name = f"part-{time.time_ns()}.parquet"
+    path = os.path.join(directory, name)
+    tmp = os.path.join(directory, f".{name}.tmp")
+
+    pq.write_table(pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False), tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _read_parts(table: str, month: str, columns: list[str] | None = None) -> pd.DataFrame:
+    schema = TABLES[table][0]
+    parts = _parts(table, month)
+    if not parts:
+        return schema.empty_table().select(columns or schema.names).to_pandas()
+    return ds.dataset(parts, schema=schema, format="parquet").to_table(columns=columns).to_pandas()
+
+
+def _normalize(table: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Spalten und Typen wie im Schema, fehlende Spalten als leer."""
+    schema, time_col, _ = TABLES[table]
+    out = pd.DataFrame(index=range(len(df)))
+    for field in schema:
+        values = df[field.name].to_numpy() if field.name in df.columns else None
+        if pa.types.is_timestamp(field.type):
+            out[field.name] = pd.to_datetime(values).as_unit("ns")
+        elif pa.types.is_floating(field.type):
+            out[field.name] = pd.to_numeric(values, errors="coerce") if values is not None else float("nan")
+        else:
+            out[field.name] = pd.Series(values, dtype=object) if values is not None else None
+    return out.dropna(subset=[time_col])
+
+
+def _append_table(table: str, df: pd.DataFrame) -> int:
+    """Hängt neue Zeilen an (Duplikate innerhalb df und gegenüber dem Bestand entfallen)."""
+    _, time_col, key = TABLES[table]
+    df = _normalize(table, df).drop_duplicates(subset=key, keep="last")
+    if df.empty:
+        return 0
+
+    added = 0
+    months = df[time_col].dt.strftime("%Y-%m")
+    for month, rows in df.groupby(months):
+        existing = _read_parts(table, month, columns=key)
+        if not existing.empty:
+            seen = pd.MultiIndex.from_frame(existing[key])
+            rows = rows[~pd.MultiIndex.from_frame(rows[key]).isin(seen)]
+        if rows.empty:
+            continue
+        _write_part(table, month, rows)
+        added += len(rows)
+        if len(_parts(table, month)) > MAX_PARTS:
+            compact(table, month)
+    return added
+
+
+def _month_filter(start, end) -> ds.Expression | None:
+    """Partitionsfilter auf month=YYYY-MM – Monate außerhalb werden nicht geöffnet."""
+    expr = None
+    if start is not None:
+        expr = ds.field("month") >= pd.Timestamp(start).strftime("%Y-%m")
+    if end is not None:
+        cond = ds.field("month") <= pd.Timestamp(end).strftime("%Y-%m")
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def _scan(table: str, start=None, end=None, extra: ds.Expression | None = None, columns=None) -> pd.DataFrame:
+    """Liest eine Tabelle mit Monats-, Zeit- und Zusatzfilter."""
+    schema, time_col, _ = TABLES[table]
+    columns = columns or schema.names
+    if not os.path.isdir(_table_dir(table)):
+        return schema.empty_table().select(columns).to_pandas()
+
+    expr = _month_filter(start, end)
+    for cond in (
+        None if start is None else ds.field(time_col) >= pd.Timestamp(start),
+        None if end is None else ds.field(time_col) < pd.Timestamp(end) + pd.Timedelta(days=1),
+        extra,
+    ):
+        if cond is not None:
+            expr = cond if expr is None else expr & cond
+
+    dataset = ds.dataset(_table_dir(table), format="parquet", partitioning=_PARTITIONING)
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def article_id(url: str | None, title: str | None = None, time_published=None) -> str:
+    """Schlüssel eines Artikels: sha1 der URL, ohne URL aus Titel und Zeitpunkt."""
+    key = url if url else f"{title}|{pd.Timestamp(time_published).isoformat()}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def append(articles: pd.DataFrame, links: pd.DataFrame) -> tuple[int, int]:
+    """
+    Hängt Artikel und Ticker-Sentiments an; bereits gespeicherte entfallen.
+
+    Parameter:
+        articles : Spalten wie ARTICLE_SCHEMA (fehlende werden leer)
+        links    : Spalten wie LINK_SCHEMA
+
+    Rückgabe:
+        (neue Artikel, neue Ticker-Sentiments)
+    """
+    return _append_table("articles", articles), _append_table("ticker_sentiment", links)
+
+
+def mark_fetched(ticker: str, dates: list[str]) -> None:
+    """Vermerkt (ticker, Tag) als abgefragt – auch wenn es keine Treffer gab."""
+    _append_table("fetched", pd.DataFrame({"ticker": ticker, "date": pd.to_datetime(list(dates))}))
+
+
+def fetched(tickers: list[str], start=None, end=None) -> set[tuple[str, str]]:
+    """
+    Bereits abgefragte (ticker, "YYYY-MM-DD") im Zeitraum.
+    """
+    df = _scan("fetched", start, end, ds.field("ticker").isin(list(tickers)))
+    return set(zip(df["ticker"], df["date"].dt.strftime("%Y-%m-%d")))
+
+
+def read_sentiment(
+    tickers: list[str] | None = None,
+    start=None,
+    end=None,
+    with_articles: bool = False,
+) -> pd.DataFrame:
+    """
+    Ticker-Sentiment im Zeitraum, z.B. alle Werte für AAPL der letzten 90 Tage.
+
+    Parameter:
+        tickers       : Ticker-Symbole (Standard: alle)
+        start         : erster Tag (inklusive)
+        end           : letzter Tag (inklusive)
+        with_articles : True = title, summary, url, source dazu
+
+    Rückgabe:
+        DataFrame sortiert nach time_published, ticker mit den Spalten
+        aus LINK_SCHEMA (+ Artikelspalten)
+    """
+    extra = None if tickers is None else ds.field("ticker").isin(list(tickers))
+    df = _scan("ticker_sentiment", start, end, extra)
+    if with_articles and not df.empty:
+        articles = _scan(
+            "articles", df["time_published"].min(), df["time_published"].max(),
+            ds.field("article_id").isin(df["article_id"].unique().tolist()),
+            columns=["article_id", "title", "summary", "url", "source"],
+        )
+        df = df.merge(articles, on="article_id", how="left")
+    elif with_articles:
+        df = df.assign(title=None, summary=None, url=None, source=None)
+    return df.sort_values(["time_published", "ticker"], kind="stable").reset_index(drop=True)
+
+
+def read_articles(start=None, end=None, ids: list[str] | None = None) -> pd.DataFrame:
+    """Artikel im Zeitraum (optional nur bestimmte article_ids), sortiert nach Zeit."""
+    extra = None if ids is None else ds.field("article_id").isin(list(ids))
+    return _scan("articles", start, end, extra).sort_values("time_published", kind="stable").reset_index(drop=True)
+
+
+def compact(table: str | None = None, month: str | None = None) -> None:
+    """
+    Fasst die Dateien je Monatspartition zu einer zusammen (Standard: alle
+    Tabellen, alle Monate). Neue Datei zuerst, dann alte entfernen.
+    """
+    for name in ([table] if table else TABLES):
+        root = _table_dir(name)
+        if not os.path.isdir(root):
+            continue
+        months = [month] if month else [d.split("=", 1)[1] for d in os.listdir(root) if d.startswith("month=")]
+        key = TABLES[name][2]
+        for m in months:
+            parts = _parts(name, m)
+            if len(parts) <= 1:
+                continue
+            df = _read_parts(name, m).drop_duplicates(subset=key, keep="last")
+            new = _write_part(name, m, df)
+            for path in parts:
+                if path != new:
+                    os.remove(path)
@@ -0,0 +1,228 @@
+"""
+Pattern Index – invertierter Index Candlestick-Muster → Vorkommen
+──────────────────────────────────────────────────────────────────
+Für PRML (03_ml_analyse/03a_modelle/prml_candlestick_rf.md) braucht jedes
+der 169 (2 Tage) bzw. 2.197 (3 Tage) Muster seinen eigenen Trainingssatz.
+Statt dafür je Muster die ganze Historie aller Ticker zu durchsuchen,
+kodiert build_index() einmal jede Kerze des Price Panels (kerzen.py,
+vektorisiert über Ticker × Tag) und legt die Vorkommen nach Muster-Code
+sortiert ab. occurrences() ist danach ein Slice – O(1) bis auf die Größe
+des Ergebnisses.
+
+Layout (Verzeichnis data/features/patterns/d{days}/, CSR-Format):
+    offsets.npy : int64 (N_CODES + 1) – Vorkommen von Code k liegen in [offsets[k], offsets[k+1])
+    ticker.npy  : int32  Zeile in tickers (index.json)
+    pos.npy     : int32  Handelstag im Ticker (wie im Price Panel, ab 0) – letzte Kerze des Musters
+    date.npy    : int64  Datum der letzten Kerze in ns seit Epoche
+    loc.npy     : int8   Loc der letzten Kerze (kerzen.LOC_LABELS)
+    index.json  : Version, days, Ticker-Liste, Anzahl Handelstage je Ticker
+
+Innerhalb eines Codes sind die Vorkommen nach (Ticker, Tag) sortiert. Die
+Codes sind identisch zu den Spalten pattern2/pattern3 des Feature Stores.
+
+Verwendung:
+    from src.data.pattern_index import build_index, occurrences, open_index
+
+    build_index()                              # nach materialize_panel()
+    index = open_index(days=2)
+    hits  = occurrences(index, code=27, before="2025-01-01")
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data.price_panel import FIELDS, _swap_dir, open_panel
+from src.ta.muster import kerzen
+
+PATTERNS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "features", "patterns")
+
+DAYS = (2, 3)
+TICKER_CHUNK = 64        # Ticker je Kodier-Block (Speicher: Block × Tage × ~40 Byte)
+
+INDEX_VERSION = 1
+
+_ARRAYS = ("offsets", "ticker", "pos", "date", "loc")
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _index_path(days: int) -> str:
+    return os.path.join(PATTERNS_DIR, f"d{days}")
+
+
+def _n_codes(days: int) -> int:
+    return kerzen.N_SHAPES ** days
+
+
+def _encode(panel: dict, rows: slice, days: tuple) -> dict:
+    """
+    Muster-Codes eines Ticker-Blocks (Ticker × Tag, NaN-Auffüllung → ungültig).
+
+    Rückgabe:
+        {days: (code, ticker, pos, loc)} – nur gültige Vorkommen, zeilenweise
+    """
+    block = np.asarray(panel["prices"][rows], dtype=np.float64)
+    o, h, l, c = (block[:, FIELDS.index(f), :] for f in ("Open", "High", "Low", "Close"))
+    shapes = kerzen.shape_codes(o, h, l, c)
+    locs = kerzen.loc_codes(h, l, c)
+
+    result = {}
+    for d in days:
+        codes = kerzen.pattern_codes(shapes, d)
+        t, p = np.nonzero(codes >= 0)
+        result[d] = (codes[t, p], (t + rows.start).astype(np.int32), p.astype(np.int32), locs[t, p])
+    return result
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def build_index(panel: dict | None = None, days=DAYS) -> dict[int, str]:
+    """
+    Kodiert alle Kerzen des Price Panels und schreibt je Musterlänge einen
+    invertierten Index. Fertige Verzeichnisse ersetzen die alten atomar.
+
+    Parameter:
+        panel : open_panel()-Ergebnis (Standard: data/prices/panel)
+        days  : Musterlängen in Kerzen
+
+    Rückgabe:
+        {days: Pfad des Index-Verzeichnisses}
+
+    Raises:
+        FileNotFoundError wenn kein Price Panel existiert
+    """
+    panel = panel or open_panel()
+    if panel is None:
+        raise FileNotFoundError("Kein Price Panel – zuerst materialize_panel() ausführen")
+    days = tuple(days)
+    tickers = panel["tickers"]
+
+    parts: dict = {d: [] for d in days}
+    for start in range(0, len(tickers), TICKER_CHUNK):
+        encoded = _encode(panel, slice(start, min(start + TICKER_CHUNK, len(tickers))), days)
+        for d in days:
+            parts[d].append(encoded[d])
+
+    paths = {}
+    for d in days:
+        code, ticker, pos, loc = (
+            np.concatenate([p[i] for p in parts[d]]) if parts[d] else np.empty(0, dtype=dt)
+            for i, dt in enumerate((np.int16, np.int32, np.int32, np.int8))
+        )
+        order = np.argsort(code, kind="stable")      # stabil → je Code nach (Ticker, Tag)
+        offsets = np.zeros(_n_codes(d) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(code, minlength=_n_codes(d)))
+
+        path = _index_path(d)
+        tmp = path + ".tmp"
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+
+        def array(name, values):
+            arr = np.lib.format.open_memmap(
+                os.path.join(tmp, f"{name}.npy"), mode="w+", dtype=values.dtype, shape=values.shape,
+            )
+            arr[:] = values
+            arr.flush()
+
+        array("offsets", offsets)
+        array("ticker", ticker[order])
+        array("pos", pos[order])
+        array("date", np.asarray(panel["dates"])[ticker[order], pos[order]])
+        array("loc", loc[order])
+
+        with open(os.path.join(tmp, "index.json"), "w") as f:
+            json.dump({
+                "version": INDEX_VERSION, "days": d,
+                "tickers": tickers, "lengths": [panel["lengths"][t] for t in tickers],
+            }, f)
+
+        _swap_dir(tmp, path)
+        paths[d] = path
+    return paths
+
+
+def open_index(days: int = 2) -> dict | None:
+    """
+    Öffnet einen Index read-only als Memory-Map.
+
+    Rückgabe:
+        dict mit den Arrays (siehe Modul-Docstring) und days, tickers,
+        lengths – oder None wenn kein passender Index existiert
+    """
+    path = _index_path(days)
+    meta_path = os.path.join(path, "index.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    if meta.get("version") != INDEX_VERSION or meta.get("days") != days:
+        return None
+
+    index = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+    index.update({"days": days, "tickers": meta["tickers"]})
+    index["lengths"] = dict(zip(meta["tickers"], meta["lengths"]))
+    return index
+
+
+def counts(index: dict) -> np.ndarray:
+    """Anzahl Vorkommen je Muster-Code (Länge N_SHAPES ** days)."""
+    return np.diff(np.asarray(index["offsets"]))
+
+
+def occurrence_arrays(index: dict, code: int) -> dict[str, np.ndarray]:
+    """
+    Vorkommen eines Codes als Sichten auf die Memory-Map (ohne Kopie).
+
+    Rückgabe:
+        dict {"ticker", "pos", "date", "loc"} → ndarray
+    """
+    if not 0 <= code < _n_codes(index["days"]):
+        raise ValueError(f"Muster-Code {code} außerhalb 0…{_n_codes(index['days']) - 1}")
+    block = slice(int(index["offsets"][code]), int(index["offsets"][code + 1]))
+    return {name: index[name][block] for name in _ARRAYS[1:]}
+
+
+def occurrences(
+    index: dict,
+    code: int,
+    before=None,
+    tickers: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Alle Vorkommen eines Muster-Codes.
+
+    Parameter:
+        index   : open_index()-Ergebnis
+        code    : Muster-Code (Spalte pattern2/pattern3)
+        before  : nur Vorkommen mit Datum davor (z.B. Trainingsende)
+        tickers : nur diese Ticker (Standard: alle)
+
+    Rückgabe:
+        DataFrame mit ticker, date, pos (Handelstag im Price Panel) und
+        loc (Loc der letzten Kerze), sortiert nach Ticker und Datum
+
+    Raises:
+        ValueError bei Code außerhalb des Wertebereichs
+    """
+    hits = occurrence_arrays(index, code)
+    mask = np.ones(len(hits["date"]), dtype=bool)
+    if before is not None:
+        mask &= hits["date"] < pd.Timestamp(before).value
+    if tickers is not None:
+        wanted = set(tickers)
+        wanted = [i for i, t in enumerate(index["tickers"]) if t in wanted]
+        mask &= np.isin(hits["ticker"], wanted)
+
+    names = np.asarray(index["tickers"], dtype=object)
+    return pd.DataFrame({
+        "ticker": names[hits["ticker"][mask]],
+        "date":   hits["date"][mask].view("M8[ns]"),
+        "pos":    hits["pos"][mask],
+        "loc":    hits["loc"][mask],
+    })
@@ -1,32 +1,48 @@
+import json
 import os
 import pandas as pd
 import yfinance as yf
-from datetime import date, timedelta
+from datetime import date
+
+from src.data import price_panel, price_store, trading_calendar
 
 PRICES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "prices")
 TICKERS_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "tickers.txt")
-ALL_TICKERS_CSV = os.path.join(PRICES_DIR, "all_daily.csv")
+NAMES_FILE = os.path.join(PRICES_DIR, "names.json")
+
+BATCH_SIZE = 100   # Ticker je Sammel-Download (yf.download mit Symbol-Liste)
 
 
 def _csv_path(ticker: str) -> str:
+    """Alter CSV-Cache je Ticker (vor dem Price Store) – nur noch für die Migration."""
     return os.path.join(PRICES_DIR, f"{ticker}_daily.csv")
 
 
-def _load_cache(ticker: str) -> pd.DataFrame | None:
+def _migrate_csv(ticker: str) -> bool:
+    """Übernimmt einen alten CSV-Cache in den Price Store und löscht die CSV."""
     path = _csv_path(ticker)
     if not os.path.exists(path):
-        return None
-    df = pd.read_csv(path, index_col="Date", parse_dates=True)
+        return False
+    price_store.append(ticker, pd.read_csv(path, index_col="Date", parse_dates=True))
+    os.remove(path)
+    print(f"[price_fetcher] {ticker}: CSV-Cache in den Price Store übernommen")
+    return True
+
+
+def _load_cache(ticker: str) -> pd.DataFrame | None:
+    df = price_store.read(ticker)
+    if df is None and _migrate_csv(ticker):
+        df = price_store.read(ticker)
     return df
 
 
 def _is_up_to_date(df: pd.DataFrame) -> bool:
-    last_cached = df.index.max().date()
-    expected = date.today() - timedelta(days=1)
-    # Wochenenden überspringen
-    while expected.weekday() >= 5:
-        expected -= timedelta(days=1)
-    return last_cached >= expected
+    return trading_calendar.is_up_to_date(df.index.max())
+
+
+def _fetch_start(cached: pd.DataFrame) -> str:
+    """Erster Handelstag nach dem Cache – Wochenenden/Feiertage nicht anfragen."""
+    return trading_calendar.next_session(cached.index.max()).strftime("%Y-%m-%d")
 
 
 def _fetch_from_yfinance(ticker: str, start: str, end: str) -> pd.DataFrame:
@@ -38,18 +54,107 @@ def _fetch_from_yfinance(ticker: str, start: str, end: str) -> pd.DataFrame:
     return df
 
 
-def _get_company_name(ticker: str) -> str:
+def _fetch_batch_from_yfinance(tickers: list[str], start: str, end: str) -> dict[str, pd.DataFrame]:
+    """
+    Lädt mehrere Ticker in einem Request und teilt das MultiIndex-Ergebnis auf.
+    Ticker ohne Daten (unbekannt, delisted) fehlen im Ergebnis.
+    """
+    df = yf.download(
+        tickers, start=start, end=end, interval="1d", auto_adjust=True,
+        progress=False, group_by="ticker",
+    )
+    if df.empty:
+        return {}
+
+    result = {}
+    for ticker in tickers:
+        if ticker not in df.columns.get_level_values(0):
+            continue
+        # Gemeinsamer Datumsindex aller Ticker → fremde Handelstage sind NaN
+        sub = df[ticker].dropna(how="all").copy()
+        if sub.empty:
+            continue
+        sub.columns.name = None
+        if "Volume" in sub.columns:
+            sub["Volume"] = sub["Volume"].fillna(0).astype("int64")
+        sub.index.name = "Date"
+        result[ticker] = sub
+    return result
+
+
+def _merge_and_save(ticker: str, cached: pd.DataFrame | None, new_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Hängt neue Handelstage an den Price Store an (append-only, bereits
+    gespeicherte Tage bleiben unverändert) und gibt den Gesamtbestand zurück.
+    """
+    if new_data.empty:
+        return cached if cached is not None else new_data
+
+    appended = price_store.append(ticker, new_data)
+    if cached is None:
+        return appended
+
+    gap = trading_calendar.missing_sessions(
+        appended.index, start=trading_calendar.next_session(cached.index.max()),
+    )
+    if len(gap):
+        print(f"[price_fetcher] {ticker}: {len(gap)} Handelstag(e) ohne Kurse ab {gap[0].date()}")
+    return pd.concat([cached, appended])
+
+
+def _load_names() -> dict[str, str]:
+    if not os.path.exists(NAMES_FILE):
+        return {}
+    with open(NAMES_FILE, "r") as f:
+        return json.load(f)
+
+
+def _save_names(names: dict[str, str]) -> None:
+    os.makedirs(PRICES_DIR, exist_ok=True)
+    tmp = NAMES_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(names, f, indent=1, sort_keys=True)
+    os.replace(tmp, NAMES_FILE)
+
+
+def _get_company_name(ticker: str) -> str | None:
+    """Unternehmensname über yfinance; None wenn der Abruf fehlschlägt."""
     try:
         info = yf.Ticker(ticker).info
         return info.get("longName", ticker)
     except Exception:
-        return ticker
+        return None
+
+
+def get_company_names(tickers: list[str]) -> dict[str, str]:
+    """
+    Unternehmensnamen aus dem persistenten Cache (names.json).
+    Nur unbekannte Ticker werden bei yfinance abgefragt; fehlgeschlagene
+    Abrufe fallen auf das Ticker-Symbol zurück und werden beim nächsten
+    Aufruf erneut versucht.
+
+    Rückgabe:
+        Dict {ticker: name}
+    """
+    names = _load_names()
+    missing = [t for t in tickers if t not in names]
+
+    fetched = {}
+    for ticker in missing:
+        name = _get_company_name(ticker)
+        if name is not None:
+            fetched[ticker] = name
+    if fetched:
+        names.update(fetched)
+        _save_names(names)
+
+    return {t: names.get(t, t) for t in tickers}
 
 
 def fetch_prices(ticker: str, start: str = "2019-01-01", end: str = None) -> pd.DataFrame:
     """
     Gibt OHLCV-Tagesdaten für einen Ticker zurück.
-    Prüft zuerst den lokalen CSV-Cache, ruft yfinance nur bei Bedarf ab.
+    Prüft zuerst den lokalen Price Store, ruft yfinance nur bei Bedarf ab.
 
     Parameter:
         ticker: z.B. "AAPL"
@@ -69,20 +174,65 @@ def fetch_prices(ticker: str, start: str = "2019-01-01", end: str = None) -> pd.
 
     if cached is not None:
         # Nur fehlende Daten nachladen
-        fetch_start = (cached.index.max() + timedelta(days=1)).strftime("%Y-%m-%d")
+        fetch_start = _fetch_start(cached)
         new_data = _fetch_from_yfinance(ticker, start=fetch_start, end=end)
-        if not new_data.empty:
-            df = pd.concat([cached, new_data])
-            df = df[~df.index.duplicated(keep="last")]
-        else:
-            df = cached
     else:
-        df = _fetch_from_yfinance(ticker, start=start, end=end)
+        new_data = _fetch_from_yfinance(ticker, start=start, end=end)
 
-    os.makedirs(PRICES_DIR, exist_ok=True)
-    df.to_csv(_csv_path(ticker))
+    return _merge_and_save(ticker, cached, new_data)
 
-    return df
+
+def fetch_many(
+    tickers: list[str],
+    start: str = "2019-01-01",
+    end: str = None,
+    batch_size: int = BATCH_SIZE,
+) -> dict[str, pd.DataFrame]:
+    """
+    Wie fetch_prices(), aber für viele Ticker mit Sammel-Downloads.
+
+    Ticker mit gleichem Nachlade-Start (letzter Cache-Tag + 1, bzw. `start`
+    ohne Cache) werden gruppiert und je `batch_size` Symbole in EINEM
+    yf.download-Request geladen. Aktuelle Caches lösen keinen Request aus.
+
+    Parameter:
+        tickers    : Liste von Ticker-Symbolen
+        start      : Startdatum im Format "YYYY-MM-DD" (nur ohne Cache)
+        end        : Enddatum im Format "YYYY-MM-DD" (Standard: heute)
+        batch_size : max. Symbole je Request
+
+    Rückgabe:
+        Dict {ticker: DataFrame mit Spalten Open, High, Low, Close, Volume}
+        Ticker ohne Cache, für die yfinance nichts liefert, fehlen.
+    """
+    if end is None:
+        end = date.today().strftime("%Y-%m-%d")
+
+    result = {}
+    caches = {}
+    groups: dict[str, list[str]] = {}
+    for ticker in dict.fromkeys(tickers):
+        cached = _load_cache(ticker)
+        if cached is not None and _is_up_to_date(cached):
+            result[ticker] = cached
+            continue
+        caches[ticker] = cached
+        fetch_start = start if cached is None else _fetch_start(cached)
+        groups.setdefault(fetch_start, []).append(ticker)
+
+    for fetch_start, group in groups.items():
+        for i in range(0, len(group), batch_size):
+            batch = group[i : i + batch_size]
+            downloaded = _fetch_batch_from_yfinance(batch, start=fetch_start, end=end)
+            for ticker in batch:
+                new_data = downloaded.get(ticker)
+                if new_data is None:
+                    if caches[ticker] is not None:
+                        result[ticker] = caches[ticker]
+                    continue
+                result[ticker] = _merge_and_save(ticker, caches[ticker], new_data)
+
+    return result
 
 
 def load_tickers(path: str = None) -> list[str]:
@@ -103,7 +253,9 @@ def load_tickers(path: str = None) -> list[str]:
 
 def fetch_all(tickers: list[str] = None, start: str = "2019-01-01") -> pd.DataFrame:
     """
-    Lädt OHLCV-Daten für alle Ticker und speichert sie kombiniert in all_daily.csv.
+    Lädt OHLCV-Daten für alle Ticker in den Price Store und gibt sie kombiniert
+    zurück (ersetzt die frühere all_daily.csv – Teilmengen direkt über
+    price_store.read_many() lesen).
 
     Parameter:
         tickers: Liste von Ticker-Symbolen (Standard: aus tickers.txt)
@@ -115,18 +267,37 @@ def fetch_all(tickers: list[str] = None, start: str = "2019-01-01") -> pd.DataFr
     if tickers is None:
         tickers = load_tickers()
 
-    frames = []
-    for ticker in tickers:
-        print(f"[fetch_all] Lade {ticker}...")
-        df = fetch_prices(ticker, start=start).copy()
-        df.insert(0, "Name", _get_company_name(ticker))
-        df.insert(0, "Ticker", ticker)
-        frames.append(df)
+    print(f"[fetch_all] Lade {len(tickers)} Ticker...")
+    prices = fetch_many(tickers, start=start)
+    names  = get_company_names(list(prices))
 
-    combined = pd.concat(frames).sort_values(["Date", "Ticker"])
+    missing = [t for t in tickers if t not in prices]
+    if missing:
+        print(f"[fetch_all] Keine Daten: {', '.join(missing)}")
 
-    os.makedirs(PRICES_DIR, exist_ok=True)
-    combined.to_csv(ALL_TICKERS_CSV)
-    print(f"[fetch_all] Gespeichert: {ALL_TICKERS_CSV}")
+    combined = price_store.read_many(list(prices))
+    combined.insert(1, "Name", combined["Ticker"].map(names))
+    print(f"[fetch_all] {len(prices)} Ticker im Price Store: {price_store.STORE_DIR}")
 
     return combined
+
+
+def materialize_panel(tickers: list[str] = None, path: str = None) -> str:
+    """
+    Aktualisiert die Kurse und schreibt das ganze Universum als Memory-Map-Panel
+    (siehe price_panel.py) – Worker-Prozesse lesen danach ohne eigenes Laden.
+
+    Parameter:
+        tickers: Liste von Ticker-Symbolen (Standard: aus tickers.txt)
+        path:    Zielverzeichnis (Standard: data/prices/panel)
+
+    Rückgabe:
+        Pfad des Panel-Verzeichnisses
+    """
+    if tickers is None:
+        tickers = load_tickers()
+
+    prices = fetch_many(tickers)
+    path = price_panel.write_panel(prices, path)
+    print(f"[price_fetcher] Panel geschrieben: {len(prices)} Ticker → {path}")
+    return path
@@ -0,0 +1,182 @@
+"""
+Price Panel – OHLCV des ganzen Universums als Memory-Map
+────────────────────────────────────────────────────────
+Schreibt alle Kurse einmal in feste Binär-Arrays (.npy) und öffnet sie in
+jedem Worker-Prozess per np.load(mmap_mode="r"). Die Prozesse teilen sich
+dieselben Seiten im Page-Cache des Betriebssystems:
+
+    - RAM bleibt konstant, egal wie viele Worker laufen
+    - Worker-Start ohne Datenladen: Öffnen = Header lesen, Seiten kommen
+      erst beim Zugriff
+    - ticker_frame() liefert DataFrames, deren Spalten direkte (read-only)
+      Sichten auf die Map sind – ohne Kopie an die Indikator-Funktionen
+
+Layout (Verzeichnis data/prices/panel/):
+    prices.npy  : float64 (Ticker × Feld × Tag), Feld = Open, High, Low, Close
+    volume.npy  : int64   (Ticker × Tag)
+    dates.npy   : int64   (Ticker × Tag), Datum in ns seit Epoche, NaT = leer
+    index.json  : Ticker-Liste, Anzahl Handelstage je Ticker
+
+"Tag" zählt die Handelstage des jeweiligen Tickers (lückenlos ab Index 0),
+nicht einen gemeinsamen Kalender – so ist jede Zeitreihe eines Tickers ein
+zusammenhängender 1-D-Block und exakt der DataFrame aus dem Price Store,
+ohne NaN-Zeilen für fremde Handelstage. Feld liegt vor Tag, damit z.B. der
+Close-Verlauf zusammenhängend im Speicher liegt (rolling/ewm/Kerne lesen
+ihn ohne Zwischenkopie).
+
+Verwendung:
+    from src.data.price_fetcher import materialize_panel
+    from src.data.price_panel import open_panel, ticker_frame
+
+    materialize_panel(tickers)                 # einmal nach dem Kursabruf
+    panel = open_panel()                       # in jedem Worker
+    df    = ticker_frame(panel, "AAPL")        # zero-copy, read-only
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+PANEL_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "prices", "panel")
+
+FIELDS = ["Open", "High", "Low", "Close"]
+
+PANEL_VERSION = 1
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _swap_dir(tmp: str, path: str) -> None:
+    """
+    Ersetzt path durch tmp. Offene Memory-Maps der alten Dateien bleiben
+    gültig (Linux/macOS: gelöschte Dateien leben bis zum letzten munmap).
+    """
+    old = path + ".old"
+    if os.path.exists(old):
+        shutil.rmtree(old)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    if os.path.exists(old):
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def write_panel(frames: dict[str, pd.DataFrame], path: str | None = None) -> str:
+    """
+    Schreibt OHLCV-DataFrames als Memory-Map-Panel.
+
+    Die Arrays werden direkt in die Dateien geschrieben (open_memmap), ein
+    Ticker nach dem anderen – der Speicherbedarf ist der eines Tickers, nicht
+    des ganzen Universums. Das fertige Verzeichnis ersetzt das alte atomar.
+
+    Parameter:
+        frames : {ticker: DataFrame mit Open, High, Low, Close, Volume}
+        path   : Zielverzeichnis (Standard: data/prices/panel)
+
+    Rückgabe:
+        Pfad des Panel-Verzeichnisses
+    """
+    path = path or PANEL_DIR
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+
+    tickers = list(frames)
+    lengths = [len(frames[t]) for t in tickers]
+    n_days  = max(lengths, default=0)
+
+    prices = np.lib.format.open_memmap(
+        os.path.join(tmp, "prices.npy"), mode="w+", dtype=np.float64,
+        shape=(len(tickers), len(FIELDS), n_days),
+    )
+    volume = np.lib.format.open_memmap(
+        os.path.join(tmp, "volume.npy"), mode="w+", dtype=np.int64, shape=(len(tickers), n_days),
+    )
+    dates = np.lib.format.open_memmap(
+        os.path.join(tmp, "dates.npy"), mode="w+", dtype=np.int64, shape=(len(tickers), n_days),
+    )
+
+    for i, ticker in enumerate(tickers):
+        df, n = frames[ticker].sort_index(), lengths[i]
+        for j, field in enumerate(FIELDS):
+            prices[i, j, :n] = df[field].to_numpy(dtype=np.float64)
+            prices[i, j, n:] = np.nan
+        volume[i, :n] = df["Volume"].to_numpy(dtype=np.int64)
+        volume[i, n:] = 0
+        dates[i, :n]  = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+        dates[i, n:]  = np.iinfo(np.int64).min        # NaT
+
+    for arr in (prices, volume, dates):
+        arr.flush()
+    del prices, volume, dates
+
+    with open(os.path.join(tmp, "index.json"), "w") as f:
+        json.dump({"version": PANEL_VERSION, "fields": FIELDS, "tickers": tickers, "lengths": lengths}, f)
+
+    _swap_dir(tmp, path)
+    return path
+
+
+def open_panel(path: str | None = None) -> dict | None:
+    """
+    Öffnet ein Panel read-only als Memory-Map (kein Datenladen).
+
+    Rückgabe:
+        dict mit:
+            prices  : np.memmap float64 (Ticker × Feld × Tag)
+            volume  : np.memmap int64   (Ticker × Tag)
+            dates   : np.memmap int64   (Ticker × Tag)
+            tickers : list[str]
+            lengths : dict {ticker: Anzahl Handelstage}
+            pos     : dict {ticker: Zeile im Panel}
+        oder None wenn kein (passendes) Panel existiert
+    """
+    path = path or PANEL_DIR
+    index_path = os.path.join(path, "index.json")
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    if index.get("version") != PANEL_VERSION or index.get("fields") != FIELDS:
+        return None
+
+    tickers = index["tickers"]
+    return {
+        "prices":  np.load(os.path.join(path, "prices.npy"), mmap_mode="r"),
+        "volume":  np.load(os.path.join(path, "volume.npy"), mmap_mode="r"),
+        "dates":   np.load(os.path.join(path, "dates.npy"), mmap_mode="r"),
+        "tickers": tickers,
+        "lengths": dict(zip(tickers, index["lengths"])),
+        "pos":     {t: i for i, t in enumerate(tickers)},
+    }
+
+
+def ticker_arrays(panel: dict, ticker: str) -> dict[str, np.ndarray]:
+    """
+    Zusammenhängende 1-D-Sichten (ohne Kopie) auf die Kurse eines Tickers.
+
+    Rückgabe:
+        dict {"Open", "High", "Low", "Close", "Volume", "Date"} → ndarray
+    """
+    i, n = panel["pos"][ticker], panel["lengths"][ticker]
+    arrays = {field: panel["prices"][i, j, :n] for j, field in enumerate(FIELDS)}
+    arrays["Volume"] = panel["volume"][i, :n]
+    arrays["Date"]   = panel["dates"][i, :n].view("M8[ns]")
+    return arrays
+
+
+def ticker_frame(panel: dict, ticker: str) -> pd.DataFrame:
+    """
+    OHLCV-DataFrame eines Tickers, dessen Spalten Sichten auf die Memory-Map sind.
+    Gleicher Aufbau wie price_store.read(ticker); direkt an add_all_indicators()
+    und run() übergebbar (die Indikatoren verändern ihre Eingabe nicht).
+    """
+    arrays = ticker_arrays(panel, ticker)
+    index = pd.DatetimeIndex(arrays.pop("Date"), name="Date")
+    return pd.DataFrame(arrays, index=index, copy=False)
@@ -0,0 +1,262 @@
+"""
+Price Store – spaltenbasierter OHLCV-Speicher
+─────────────────────────────────────────────
+Ersetzt die CSV-Dateien je Ticker und die kombinierte all_daily.csv.
+
+Layout (Parquet, Hive-partitioniert nach Ticker):
+    data/prices/ohlcv/
+        ticker=AAPL/
+            20190102_20260227.parquet     ← kompaktierter Bestand
+            20260302_20260302.parquet     ← angehängte Handelstage
+        ticker=MSFT/
+            ...
+
+Eigenschaften:
+    - Append-only: neue Handelstage werden als eigene Datei geschrieben,
+      bestehende Dateien nie umgeschrieben (Ausnahme: compact())
+    - Atomar: jede Datei entsteht als versteckte .tmp-Datei + os.replace –
+      Leser sehen nie halbe Dateien (Dateien mit "." werden ignoriert)
+    - Typisiert: Date timestamp, Open/High/Low/Close float64, Volume int64
+    - Dateinamen = erster_letzter Handelstag → letzter Stand ohne Lesen
+    - Lesen beliebiger Ticker-/Datums-Ausschnitte ohne Text-Parsing; Filter
+      auf Ticker (Partition) und Datum (Row-Group-Statistiken) wirken
+      bereits beim Lesen
+
+Kurse bleiben float64: Indikatoren und Feature Store (Close-Vergleich mit
+rtol=1e-9 beim inkrementellen Update) rechnen auf exakt den Werten, die
+yfinance liefert. float32 würde jede Zahl ab der 8. Stelle verändern.
+
+Verwendung:
+    from src.data import price_store
+
+    price_store.append("AAPL", df)                          # nur neue Tage
+    df   = price_store.read("AAPL", start="2024-01-01")
+    long = price_store.read_many(["AAPL", "MSFT"], start="2025-01-01")
+"""
+
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "prices", "ohlcv")
+
+MAX_PARTS = 64     # ab so vielen Dateien je Ticker wird kompaktiert
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+SCHEMA = pa.schema([
+    ("Date",   pa.timestamp("ns")),
+    ("Open",   pa.float64()),
+    ("High",   pa.float64()),
+    ("Low",    pa.float64()),
+    ("Close",  pa.float64()),
+    ("Volume", pa.int64()),
+])
+
+_PARTITIONING = ds.partitioning(pa.schema([("ticker", pa.string())]), flavor="hive")
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _partition_dir(ticker: str) -> str:
+    return os.path.join(STORE_DIR, f"ticker={ticker}")
+
+
+def _parts(ticker: str) -> list[str]:
+    """Alle Dateien eines Tickers, chronologisch (Dateiname = Datumsbereich)."""
+    path = _partition_dir(ticker)
+    if not os.path.isdir(path):
+        return []
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.endswith(".parquet") and not name.startswith(".")
+    ]
+
+
+def _part_range(path: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    first, last = os.path.basename(path).removesuffix(".parquet").split("_")
+    return pd.Timestamp(datetime.strptime(first, "%Y%m%d")), pd.Timestamp(datetime.strptime(last, "%Y%m%d"))
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """OHLCV im Store-Format: Date-Index ohne Zeitzone, sortiert, feste Spalten und Typen."""
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    out = pd.DataFrame(
+        {col: df[col].to_numpy(dtype="float64") for col in COLUMNS[:-1]},
+        index=index.rename("Date"),
+    )
+    out["Volume"] = df["Volume"].fillna(0).to_numpy().astype("int64")
+    out = out[~out.index.duplicated(keep="last")]
+    return out.sort_index()
+
+
+def _write_part(ticker: str, df: pd.DataFrame) -> str:
+    """Schreibt df als neue Datei der Partition (atomar)."""
+    directory = _partition_dir(ticker)
+    os.makedirs(directory, exist_ok=True)
+    name = f"{df.index[0]:%Y%m%d}_{df.index[-1]:%Y%m%d}.parquet"
+    path = os.path.join(directory, name)
+    tmp = os.path.join(directory, f".{name}.tmp")
+
+    table = pa.Table.from_pandas(df.reset_index(), schema=SCHEMA, preserve_index=False)
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _to_frame(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas()
+    df = df.set_index("Date")
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _to_long(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas().rename(columns={"ticker": "Ticker"})
+    # Doppelte Zeilen aus einer unterbrochenen Kompaktierung entfernen
+    df = df.drop_duplicates(subset=["Ticker", "Date"], keep="last")
+    df = df.sort_values(["Date", "Ticker"]).set_index("Date")
+    return df[["Ticker"] + [c for c in df.columns if c != "Ticker"]]
+
+
+def _date_filter(start, end) -> ds.Expression | None:
+    expr = None
+    if start is not None:
+        expr = ds.field("Date") >= pd.Timestamp(start)
+    if end is not None:
+        cond = ds.field("Date") <= pd.Timestamp(end)
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def tickers() -> list[str]:
+    """Alle Ticker mit gespeicherten Kursen."""
+    if not os.path.isdir(STORE_DIR):
+        return []
+    return sorted(
+        name.split("=", 1)[1] for name in os.listdir(STORE_DIR)
+        if name.startswith("ticker=") and _parts(name.split("=", 1)[1])
+    )
+
+
+def last_date(ticker: str) -> pd.Timestamp | None:
+    """Letzter gespeicherter Handelstag (aus den Dateinamen, ohne Lesen)."""
+    parts = _parts(ticker)
+    if not parts:
+        return None
+    return max(_part_range(p)[1] for p in parts)
+
+
+def append(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Hängt alle Zeilen von df an, die nach dem letzten gespeicherten Tag liegen.
+    Bereits gespeicherte Tage werden nicht überschrieben.
+
+    Parameter:
+        ticker : Ticker-Symbol
+        df     : OHLCV-DataFrame mit Datums-Index
+
+    Rückgabe:
+        Die tatsächlich angehängten Zeilen im Store-Format (ggf. leer)
+    """
+    df = _normalize(df)
+    last = last_date(ticker)
+    if last is not None:
+        df = df.loc[df.index > last]
+    if df.empty:
+        return df
+
+    _write_part(ticker, df)
+    if len(_parts(ticker)) > MAX_PARTS:
+        compact(ticker)
+    return df
+
+
+def compact(ticker: str) -> None:
+    """
+    Fasst alle Dateien eines Tickers zu einer zusammen.
+    Erst wird die neue Datei geschrieben, dann werden die alten entfernt –
+    ein Abbruch dazwischen hinterlässt nur doppelte Zeilen, die read()
+    ohnehin entfernt.
+    """
+    parts = _parts(ticker)
+    if len(parts) <= 1:
+        return
+    df = read(ticker)
+    new = _write_part(ticker, df)
+    for path in parts:
+        if path != new:
+            os.remove(path)
+
+
+def read(
+    ticker: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame | None:
+    """
+    Kurse eines Tickers, optional auf einen Datumsbereich beschränkt.
+
+    Parameter:
+        ticker  : Ticker-Symbol
+        start   : erster Tag (inklusive), "YYYY-MM-DD"
+        end     : letzter Tag (inklusive), "YYYY-MM-DD"
+        columns : Teilmenge von Open, High, Low, Close, Volume
+
+    Rückgabe:
+        DataFrame mit Date-Index oder None wenn nichts gespeichert ist
+    """
+    parts = _parts(ticker)
+    if not parts:
+        return None
+    # Dateien außerhalb des Bereichs gar nicht erst öffnen
+    if start is not None:
+        parts = [p for p in parts if _part_range(p)[1] >= pd.Timestamp(start)]
+    if end is not None:
+        parts = [p for p in parts if _part_range(p)[0] <= pd.Timestamp(end)]
+
+    cols = ["Date"] + (columns or COLUMNS)
+    if not parts:
+        return _to_frame(SCHEMA.empty_table().select(cols))
+    dataset = ds.dataset(parts, schema=SCHEMA, format="parquet")
+    return _to_frame(dataset.to_table(columns=cols, filter=_date_filter(start, end)))
+
+
+def read_many(
+    tickers: list[str] | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Kurse mehrerer Ticker im Langformat (eine Zeile je Ticker und Tag).
+
+    Parameter:
+        tickers : Ticker-Symbole (Standard: alle gespeicherten)
+        start   : erster Tag (inklusive)
+        end     : letzter Tag (inklusive)
+        columns : Teilmenge von Open, High, Low, Close, Volume
+
+    Rückgabe:
+        DataFrame mit Date-Index und Spalten: Ticker, <columns>,
+        sortiert nach Date, Ticker
+    """
+    cols = ["Date"] + (columns or COLUMNS)
+    if not os.path.isdir(STORE_DIR):
+        return _to_long(SCHEMA.empty_table().select(cols).append_column("ticker", pa.array([], pa.string())))
+
+    dataset = ds.dataset(STORE_DIR, format="parquet", partitioning=_PARTITIONING)
+    expr = _date_filter(start, end)
+    if tickers is not None:
+        cond = ds.field("ticker").isin(list(tickers))
+        expr = cond if expr is None else cond & expr
+    return _to_long(dataset.to_table(columns=cols + ["ticker"], filter=expr))
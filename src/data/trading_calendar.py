@@ -0,0 +1,201 @@
+"""
+Handelskalender – Börsentage der NYSE/NASDAQ, offline
+─────────────────────────────────────────────────────
+Gemeinsame Grundlage für alle Aktualitätsprüfungen (Price Store, Feature
+Store). Bisher galt nur "Wochenende = kein Handel": an jedem Börsenfeiertag
+sah jeder Ticker veraltet aus und löste einen yfinance-Abruf plus Pipeline-
+Lauf aus.
+
+Feiertage werden aus den festen NYSE-Regeln berechnet (keine Abhängigkeit,
+kein Netzwerk), dazu die außerordentlichen Schließungen seit 2001:
+
+    New Year's Day      1.1.  (Sa → keine Ersatz-Schließung, So → Mo)
+    Martin Luther King  3. Montag im Januar (ab 1998)
+    Presidents' Day     3. Montag im Februar
+    Good Friday         Karfreitag (Ostern − 2 Tage)
+    Memorial Day        letzter Montag im Mai
+    Juneteenth          19.6. (ab 2022)
+    Independence Day    4.7.
+    Labor Day           1. Montag im September
+    Thanksgiving        4. Donnerstag im November
+    Christmas           25.12.
+    Fällt ein Feiertag auf Samstag → Freitag davor, Sonntag → Montag danach.
+
+Frühschluss-Tage (z.B. 24.12.) sind normale Handelstage.
+
+Der Sitzungs-Index (alle Handelstage von FIRST_YEAR bis zwei Jahre nach
+heute) wird einmal je Prozess berechnet; alle Abfragen sind danach
+Binärsuchen auf einem sortierten datetime64-Array.
+
+Verwendung:
+    from src.data import trading_calendar as cal
+
+    cal.is_up_to_date(df.index.max())       # letzter abgeschlossener Handelstag im Cache?
+    cal.next_session(df.index.max())        # Startdatum für das Nachladen
+    cal.missing_sessions(df.index)          # Lücken in einer Kursreihe
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR = 1990
+
+# Außerordentliche Schließungen (Ereignisse, Staatstrauer)
+SPECIAL_CLOSURES = [
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",   # 11. September
+    "2004-06-11",                                             # Ronald Reagan
+    "2007-01-02",                                             # Gerald Ford
+    "2012-10-29", "2012-10-30",                               # Hurrikan Sandy
+    "2018-12-05",                                             # George H. W. Bush
+    "2025-01-09",                                             # Jimmy Carter
+]
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _easter(year: int) -> date:
+    """Ostersonntag (gregorianisch, Meeus/Jones/Butcher)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-ter Wochentag im Monat (n = -1: letzter)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Samstag → Freitag davor, Sonntag → Montag danach."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _holidays(year: int) -> list[date]:
+    days = []
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:            # Samstag: keine Schließung am 31.12. davor
+        days.append(_observed(new_year))
+    if year >= 1998:
+        days.append(_nth_weekday(year, 1, 0, 3))
+    days.append(_nth_weekday(year, 2, 0, 3))
+    days.append(_easter(year) - timedelta(days=2))
+    days.append(_nth_weekday(year, 5, 0, -1))
+    if year >= 2022:
+        days.append(_observed(date(year, 6, 19)))
+    days.append(_observed(date(year, 7, 4)))
+    days.append(_nth_weekday(year, 9, 0, 1))
+    days.append(_nth_weekday(year, 11, 3, 4))
+    days.append(_observed(date(year, 12, 25)))
+    return days
+
+
+@lru_cache(maxsize=1)
+def _index(last_year: int) -> np.ndarray:
+    """Alle Handelstage FIRST_YEAR … last_year als sortiertes datetime64[D]-Array."""
+    closed = [d for y in range(FIRST_YEAR, last_year + 1) for d in _holidays(y)]
+    closed = np.array(closed + SPECIAL_CLOSURES, dtype="datetime64[D]")
+    days = np.arange(f"{FIRST_YEAR}-01-01", f"{last_year + 1}-01-01", dtype="datetime64[D]")
+    return days[np.is_busday(days, holidays=closed)]
+
+
+def _sessions() -> np.ndarray:
+    return _index(date.today().year + 2)
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def holidays(year: int) -> list[date]:
+    """Börsenfeiertage (Wochentage ohne Handel) eines Jahres, sortiert."""
+    special = [date.fromisoformat(d) for d in SPECIAL_CLOSURES if d.startswith(str(year))]
+    return sorted(d for d in set(_holidays(year) + special) if d.weekday() < 5)
+
+
+def sessions(start=None, end=None) -> pd.DatetimeIndex:
+    """
+    Handelstage im Bereich [start, end] (beide inklusive).
+
+    Parameter:
+        start : erster Tag (Standard: Anfang des Index)
+        end   : letzter Tag (Standard: Ende des Index)
+    """
+    index = _sessions()
+    lo = 0 if start is None else np.searchsorted(index, _day(start), side="left")
+    hi = len(index) if end is None else np.searchsorted(index, _day(end), side="right")
+    return pd.DatetimeIndex(index[lo:hi].astype("datetime64[ns]"), name="Date")
+
+
+def is_session(day) -> bool:
+    """True wenn an `day` gehandelt wird."""
+    index, d = _sessions(), _day(day)
+    i = np.searchsorted(index, d)
+    return i < len(index) and index[i] == d
+
+
+def previous_session(day) -> pd.Timestamp:
+    """Letzter Handelstag strikt vor `day`."""
+    index = _sessions()
+    return pd.Timestamp(index[np.searchsorted(index, _day(day), side="left") - 1])
+
+
+def next_session(day) -> pd.Timestamp:
+    """Erster Handelstag strikt nach `day`."""
+    index = _sessions()
+    return pd.Timestamp(index[np.searchsorted(index, _day(day), side="right")])
+
+
+def last_completed_session(today=None) -> pd.Timestamp:
+    """
+    Letzter Handelstag, dessen Tagesdaten vorliegen müssen: der letzte
+    Handelstag vor heute (die laufende Sitzung zählt noch nicht).
+    """
+    return previous_session(date.today() if today is None else today)
+
+
+def is_up_to_date(last, today=None) -> bool:
+    """
+    Prüft ob ein Bestand bis `last` den letzten abgeschlossenen Handelstag enthält.
+
+    Parameter:
+        last  : letzter Tag im Cache (Timestamp/date/str)
+        today : Stichtag (Standard: heute)
+    """
+    return _day(last) >= _day(last_completed_session(today))
+
+
+def missing_sessions(index, start=None, end=None) -> pd.DatetimeIndex:
+    """
+    Handelstage ohne Zeile in `index` – Lücken in einer Kursreihe.
+
+    Parameter:
+        index : Datums-Index der Kursreihe
+        start : Prüfbereich ab (Standard: erster Tag in index)
+        end   : Prüfbereich bis (Standard: letzter Tag in index)
+    """
+    days = pd.DatetimeIndex(index).normalize()
+    if len(days) == 0 and (start is None or end is None):
+        return pd.DatetimeIndex([], name="Date")
+    expected = sessions(days.min() if start is None else start, days.max() if end is None else end)
+    return expected.difference(days.tz_localize(None) if days.tz is not None else days)
@@ -0,0 +1,558 @@
+"""
+DTW-Suche – k ähnlichste historische Kursfenster (UCR-Suite-Verfahren)
+──────────────────────────────────────────────────────────────────────
+Grundlage: 03_ml_analyse/03a_modelle/dtw_generic_pattern.md. Die Query
+(letzte `length` Schlusskurse, z-normalisiert) wird gegen ALLE historischen
+Fenster aller Ticker verglichen; zurück kommen die k ähnlichsten Fenster mit
+ihren Folgerenditen. Das Ergebnis ist exakt das der naiven DTW-Suche mit
+Sakoe-Chiba-Band – die Beschleunigung kommt nur aus dem Verwerfen von
+Kandidaten, die nachweislich nicht unter die besten k kommen:
+
+    1. LB_Kim (erster + letzter Punkt) und LB_Keogh (Kandidat gegen die
+       Hülle der Query) für alle Fenster – vektorisiert, O(length) je Fenster
+    2. Kandidaten nach dieser Schranke sortiert; sobald die Schranke ≥ der
+       k-besten Distanz ist, sind ALLE restlichen verworfen (Abbruch)
+    3. LB_Keogh umgekehrt (Query gegen die vorab gespeicherte Hülle des
+       Kandidaten)
+    4. DTW im Band mit frühem Abbruch: Zeilenminimum + kumulierte
+       LB_Keogh-Reste ≥ k-beste Distanz → Kandidat verworfen
+
+Index (data/ml/dtw/m{length}_r{radius}/, Memory-Map wie das Price Panel):
+    windows.npy : float32 (Fenster × length) z-normalisierte Fenster
+    upper.npy   : float32 (Fenster × length) obere Sakoe-Chiba-Hülle
+    lower.npy   : float32 (Fenster × length) untere Hülle
+    ticker.npy  : int32   Ticker-Nummer je Fenster
+    start.npy   : int64   erster Tag des Fensters (ns seit Epoche)
+    end.npy     : int64   letzter Tag des Fensters
+    returns.npy : float32 (Fenster × Horizonte) Close[t+h] / Close[t] − 1
+    index.json  : Länge, Radius, Horizonte, Ticker, Tage je Ticker
+
+Fenster mit Standardabweichung 0 (z.B. Handelsaussetzung) werden als
+Nullfolge normalisiert. Die DTW-Schleife läuft mit numba, falls installiert
+(sonst reines Python – gleiches Ergebnis, deutlich langsamer).
+
+Überlappende Treffer: je Ticker höchstens ein Treffer in einem Abstand von
+`exclusion` Tagen (Standard: length) – sonst wären die k Treffer oft
+dasselbe Muster, um einen Tag verschoben. Maßgeblich ist die gierige
+Auswahl in Distanz-Reihenfolge über alle Fenster (bestes Fenster nehmen,
+seine Nachbarn streichen, nächstbestes freies nehmen …); die Suche liefert
+genau deren k Distanzen, "k-beste Distanz" oben meint den k-ten Treffer
+dieser Auswahl.
+
+Verwendung:
+    from src.data.price_panel import open_panel
+    from src.ml import dtw_search
+
+    dtw_search.build_index(open_panel(), length=20)          # nach materialize_panel()
+    index   = dtw_search.open_index(length=20)
+    matches = dtw_search.search_ticker(index, open_panel(), "AAPL", k=10)
+    matches[["ticker", "end", "distance", "ret_10"]]
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data.price_panel import _swap_dir, open_panel, ticker_arrays
+
+try:
+    import numba
+except ImportError:           # optionale Abhängigkeit
+    numba = None
+
+INDEX_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "ml", "dtw")
+
+LENGTH   = 20               # Query-Länge (Handelstage), siehe Parameter-Empfehlung
+BAND     = 0.1              # Sakoe-Chiba-Radius als Anteil der Länge
+HORIZONS = (5, 10, 20)      # Folgerenditen in Handelstagen
+CHUNK    = 65536            # Fenster je Block bei den vektorisierten Schranken
+
+INDEX_VERSION = 1
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _radius(length: int, band: float) -> int:
+    return int(band * length)
+
+
+def _index_path(length: int, radius: int) -> str:
+    return os.path.join(INDEX_DIR, f"m{length}_r{radius}")
+
+
+def _windows(close: np.ndarray, length: int) -> np.ndarray:
+    """Alle z-normalisierten Fenster einer Kursreihe (Fenster × length)."""
+    win = np.lib.stride_tricks.sliding_window_view(close, length)
+    mean = win.mean(axis=1, keepdims=True)
+    std = win.std(axis=1, keepdims=True)
+    return np.divide(win - mean, std, out=np.zeros(win.shape), where=std > 0)
+
+
+def _envelopes(z: np.ndarray, radius: int) -> tuple[np.ndarray, np.ndarray]:
+    """Obere/untere Hülle je Zeile: max/min über ±radius Positionen."""
+    if radius == 0:
+        return z.copy(), z.copy()
+    pad = ((0, 0), (radius, radius))
+    upper = np.lib.stride_tricks.sliding_window_view(
+        np.pad(z, pad, constant_values=-np.inf), 2 * radius + 1, axis=1,
+    ).max(axis=2)
+    lower = np.lib.stride_tricks.sliding_window_view(
+        np.pad(z, pad, constant_values=np.inf), 2 * radius + 1, axis=1,
+    ).min(axis=2)
+    return upper, lower
+
+
+def _forward_returns(close: np.ndarray, length: int, horizons) -> np.ndarray:
+    """Rendite vom letzten Tag jedes Fensters bis h Tage danach (NaN am Ende)."""
+    n = len(close) - length + 1
+    end = np.arange(length - 1, len(close))
+    result = np.full((n, len(horizons)), np.nan)
+    for j, h in enumerate(horizons):
+        ok = end + h < len(close)
+        result[ok, j] = close[end[ok] + h] / close[end[ok]] - 1.0
+    return result
+
+
+def _lower_bounds(index: dict, q: np.ndarray, uq: np.ndarray, lq: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """max(LB_Kim, LB_Keogh(Query-Hülle, Kandidat)) für alle Fenster; inf = ausgeschlossen."""
+    windows = index["windows"]
+    lb = np.full(len(windows), np.inf)
+    for lo in range(0, len(windows), CHUNK):
+        hi = min(lo + CHUNK, len(windows))
+        keep = mask[lo:hi]
+        if not keep.any():
+            continue
+        c = np.asarray(windows[lo:hi], dtype=np.float64)
+        kim = (c[:, 0] - q[0]) ** 2 + (c[:, -1] - q[-1]) ** 2
+        above = np.maximum(c - uq, 0.0)
+        below = np.maximum(lq - c, 0.0)
+        keogh = (above * above + below * below).sum(axis=1)
+        lb[lo:hi] = np.where(keep, np.maximum(kim, keogh), np.inf)
+    return lb
+
+
+def _dtw_loop(q: np.ndarray, c: np.ndarray, cb: np.ndarray, radius: int, bsf: float) -> float:
+    """
+    DTW (quadrierte Abstände) im Sakoe-Chiba-Band mit frühem Abbruch.
+    cb[i] = Summe der LB_Keogh-Beiträge ab Position i (0 hinter dem Ende).
+    Rückgabe inf, sobald feststeht, dass das Ergebnis ≥ bsf wird.
+    """
+    m = len(q)
+    prev = np.full(m, np.inf)
+    cur = np.full(m, np.inf)
+    for i in range(m):
+        lo = max(0, i - radius)
+        hi = min(m - 1, i + radius)
+        for j in range(m):
+            cur[j] = np.inf
+        row_min = np.inf
+        for j in range(lo, hi + 1):
+            if i == 0 and j == 0:
+                best = 0.0
+            else:
+                best = np.inf
+                if i > 0:
+                    best = prev[j]
+                    if j > 0 and prev[j - 1] < best:
+                        best = prev[j - 1]
+                if j > 0 and cur[j - 1] < best:
+                    best = cur[j - 1]
+            d = q[i] - c[j]
+            cur[j] = d * d + best
+            if cur[j] < row_min:
+                row_min = cur[j]
+        rest = cb[i + radius + 1] if i + radius + 1 < m else 0.0
+        if row_min + rest >= bsf:
+            return np.inf
+        for j in range(m):
+            prev[j] = cur[j]
+    return prev[m - 1]
+
+
+def _suppress_loop(
+    buf_idx: np.ndarray,
+    buf_dist: np.ndarray,
+    count: int,
+    tickers: np.ndarray,
+    k: int,
+    exclusion: int,
+    chosen: np.ndarray,
+) -> int:
+    """
+    Gierige Überlappungs-Unterdrückung über den nach Distanz sortierten
+    Puffer: ein Fenster wird angenommen, wenn kein bereits angenommenes
+    desselben Tickers näher als exclusion liegt. Schreibt die Puffer-Positionen
+    der angenommenen Fenster nach chosen. Rückgabe: Anzahl (≤ k).
+    """
+    n = 0
+    for p in range(count):
+        idx = buf_idx[p]
+        free = True
+        for e in range(n):
+            other = buf_idx[chosen[e]]
+            if tickers[other] == tickers[idx] and abs(other - idx) < exclusion:
+                free = False
+                break
+        if free:
+            chosen[n] = p
+            n += 1
+            if n == k:
+                break
+    return n
+
+
+def _search_loop(
+    q: np.ndarray,
+    uq: np.ndarray,
+    lq: np.ndarray,
+    windows: np.ndarray,
+    upper: np.ndarray,
+    lower: np.ndarray,
+    order: np.ndarray,
+    lb: np.ndarray,
+    tickers: np.ndarray,
+    radius: int,
+    k: int,
+    exclusion: int,
+    buf_idx: np.ndarray,
+    buf_dist: np.ndarray,
+):
+    """
+    Kaskade 2–4 über die nach Schranke sortierten Kandidaten.
+
+    Der Puffer enthält ALLE bisher gefundenen Fenster mit Distanz < bsf,
+    aufsteigend sortiert – auch solche, die gerade von einem Nachbarn
+    unterdrückt werden (fällt der Nachbar später heraus, sind sie wieder
+    frei). bsf ist die Distanz des k-ten Treffers nach gieriger
+    Unterdrückung über den Puffer; alles dahinter wird abgeschnitten.
+    Jedes Fenster außerhalb des Puffers hat damit Distanz ≥ bsf, und die
+    Unterdrückung über den Puffer ergibt dieselben Distanzen wie über alle
+    Fenster.
+
+    Rückgabe:
+        (buf_idx, buf_dist, count) – Puffer wächst bei Bedarf
+    """
+    m = len(q)
+    count = 0
+    bsf = np.inf
+    chosen = np.empty(k, dtype=np.int64)
+    cb1 = np.empty(m)
+    cb2 = np.empty(m)
+    cb = np.empty(m + 1)
+    c = np.empty(m)
+    for n in range(len(order)):
+        idx = order[n]
+        if lb[idx] >= bsf:
+            break                                   # sortiert: alle weiteren ebenso
+
+        # LB_Keogh umgekehrt: Query gegen die Hülle des Kandidaten
+        lb1 = 0.0
+        lb2 = 0.0
+        for i in range(m):
+            c[i] = windows[idx, i]
+            d1 = 0.0
+            if c[i] > uq[i]:
+                d1 = (c[i] - uq[i]) ** 2
+            elif c[i] < lq[i]:
+                d1 = (lq[i] - c[i]) ** 2
+            cb1[i] = d1
+            lb1 += d1
+            d2 = 0.0
+            if q[i] > upper[idx, i]:
+                d2 = (q[i] - upper[idx, i]) ** 2
+            elif q[i] < lower[idx, i]:
+                d2 = (lower[idx, i] - q[i]) ** 2
+            cb2[i] = d2
+            lb2 += d2
+        if lb2 >= bsf:
+            continue
+
+        # kumulierte Reste der stärkeren Schranke für den frühen Abbruch
+        src = cb1 if lb1 > lb2 else cb2
+        cb[m] = 0.0
+        for i in range(m - 1, -1, -1):
+            cb[i] = cb[i + 1] + src[i]
+        dist = _dtw(q, c, cb, radius, bsf)
+        if dist >= bsf:
+            continue
+
+        # sortiert in den Puffer einfügen (bei gleicher Distanz hinter die vorhandenen)
+        if count == len(buf_idx):
+            grown_idx = np.empty(2 * count, dtype=buf_idx.dtype)
+            grown_dist = np.empty(2 * count, dtype=buf_dist.dtype)
+            grown_idx[:count] = buf_idx
+            grown_dist[:count] = buf_dist
+            buf_idx, buf_dist = grown_idx, grown_dist
+        pos = count
+        while pos > 0 and buf_dist[pos - 1] > dist:
+            buf_idx[pos] = buf_idx[pos - 1]
+            buf_dist[pos] = buf_dist[pos - 1]
+            pos -= 1
+        buf_idx[pos] = idx
+        buf_dist[pos] = dist
+        count += 1
+
+        # Überlappung: bsf und Puffer-Ende aus der gierigen Unterdrückung neu bestimmen
+        if _suppress(buf_idx, buf_dist, count, tickers, k, exclusion, chosen) == k:
+            count = chosen[k - 1] + 1
+            bsf = buf_dist[count - 1]
+    return buf_idx, buf_dist, count
+
+
+if numba is not None:
+    _dtw = numba.njit(cache=True)(_dtw_loop)
+    _suppress = numba.njit(cache=True)(_suppress_loop)
+    _search = numba.njit(cache=True)(_search_loop)
+else:
+    _dtw, _suppress, _search = _dtw_loop, _suppress_loop, _search_loop
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def znorm(values) -> np.ndarray:
+    """Z-Normalisierung (Mittelwert 0, Standardabweichung 1; konstante Folge → 0)."""
+    values = np.asarray(values, dtype=np.float64)
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros(len(values))
+
+
+def dtw_distance(a, b, radius: int | None = None) -> float:
+    """
+    DTW-Distanz zweier gleich langer Folgen (Wurzel der Summe quadrierter
+    Abstände), ohne Normalisierung und ohne Schranken – Referenz für Tests.
+
+    Parameter:
+        radius : Sakoe-Chiba-Radius (Standard: unbeschränkt)
+    """
+    a = np.ascontiguousarray(a, dtype=np.float64)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    radius = len(a) if radius is None else radius
+    return float(np.sqrt(_dtw(a, b, np.zeros(len(a) + 1), radius, np.inf)))
+
+
+def build_index(
+    panel: dict | None = None,
+    length: int = LENGTH,
+    band: float = BAND,
+    horizons=HORIZONS,
+) -> str:
+    """
+    Berechnet Fenster, Hüllen und Folgerenditen aller Ticker und schreibt
+    den Index (ein Ticker nach dem anderen direkt in die Memory-Map).
+
+    Parameter:
+        panel    : open_panel()-Ergebnis (Standard: data/prices/panel)
+        length   : Fensterlänge in Handelstagen
+        band     : Sakoe-Chiba-Radius als Anteil der Länge
+        horizons : Folgerenditen in Handelstagen
+
+    Rückgabe:
+        Pfad des Index-Verzeichnisses
+
+    Raises:
+        FileNotFoundError wenn kein Price Panel existiert
+    """
+    panel = panel or open_panel()
+    if panel is None:
+        raise FileNotFoundError("Kein Price Panel – zuerst materialize_panel() ausführen")
+    radius, horizons = _radius(length, band), list(horizons)
+    tickers = [t for t in panel["tickers"] if panel["lengths"][t] >= length]
+    counts = [panel["lengths"][t] - length + 1 for t in tickers]
+    total = sum(counts)
+
+    path = _index_path(length, radius)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+
+    def array(name, dtype, shape):
+        return np.lib.format.open_memmap(os.path.join(tmp, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+
+    arrays = {
+        "windows": array("windows", np.float32, (total, length)),
+        "upper":   array("upper",   np.float32, (total, length)),
+        "lower":   array("lower",   np.float32, (total, length)),
+        "ticker":  array("ticker",  np.int32,   (total,)),
+        "start":   array("start",   np.int64,   (total,)),
+        "end":     array("end",     np.int64,   (total,)),
+        "returns": array("returns", np.float32, (total, len(horizons))),
+    }
+
+    row = 0
+    for i, (ticker, n) in enumerate(zip(tickers, counts)):
+        series = ticker_arrays(panel, ticker)
+        close = np.asarray(series["Close"], dtype=np.float64)
+        dates = np.asarray(series["Date"]).view(np.int64)
+        # float32 zuerst, Hüllen daraus: Schranken gelten exakt für die gespeicherten Werte
+        z = _windows(close, length).astype(np.float32).astype(np.float64)
+        upper, lower = _envelopes(z, radius)
+        block = slice(row, row + n)
+        arrays["windows"][block] = z
+        arrays["upper"][block] = upper
+        arrays["lower"][block] = lower
+        arrays["ticker"][block] = i
+        arrays["start"][block] = dates[:n]
+        arrays["end"][block] = dates[length - 1:]
+        arrays["returns"][block] = _forward_returns(close, length, horizons)
+        row += n
+
+    for arr in arrays.values():
+        arr.flush()
+    del arrays
+
+    with open(os.path.join(tmp, "index.json"), "w") as f:
+        json.dump({
+            "version": INDEX_VERSION, "length": length, "radius": radius, "horizons": horizons,
+            "tickers": tickers, "lengths": [panel["lengths"][t] for t in tickers],
+        }, f)
+
+    _swap_dir(tmp, path)
+    return path
+
+
+def open_index(length: int = LENGTH, band: float = BAND) -> dict | None:
+    """
+    Öffnet einen Index read-only als Memory-Map.
+
+    Rückgabe:
+        dict mit den Arrays (siehe Modul-Docstring) und length, radius,
+        horizons, tickers, lengths – oder None wenn kein passender Index existiert
+    """
+    path = _index_path(length, _radius(length, band))
+    meta_path = os.path.join(path, "index.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    if meta.get("version") != INDEX_VERSION:
+        return None
+
+    index = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        for name in ("windows", "upper", "lower", "ticker", "start", "end", "returns")
+    }
+    index.update({k: meta[k] for k in ("length", "radius", "horizons", "tickers")})
+    index["lengths"] = dict(zip(meta["tickers"], meta["lengths"]))
+    return index
+
+
+def search(
+    index: dict,
+    query,
+    k: int = 10,
+    before=None,
+    exclude: list[str] | None = None,
+    exclusion: int | None = None,
+) -> pd.DataFrame:
+    """
+    Die k ähnlichsten Fenster zur Query.
+
+    Parameter:
+        index     : open_index()-Ergebnis
+        query     : Schlusskurse, Länge = index["length"] (wird z-normalisiert)
+        k         : Anzahl Treffer
+        before    : nur Fenster, deren längster Folgehorizont vor diesem Tag
+                    endet (Walk-Forward: keine Information aus der Zukunft)
+        exclude   : Ticker, die nicht durchsucht werden
+        exclusion : Mindestabstand (Tage) zweier Treffer desselben Tickers
+                    (Standard: length)
+
+    Rückgabe:
+        DataFrame je Treffer (nach Distanz sortiert): ticker, start, end,
+        distance, ret_{h} je Horizont
+
+    Raises:
+        ValueError wenn die Query-Länge nicht zum Index passt
+    """
+    length, radius = index["length"], index["radius"]
+    q = np.asarray(query, dtype=np.float64)
+    if len(q) != length:
+        raise ValueError(f"Query hat {len(q)} Werte, der Index erwartet {length}")
+    q = znorm(q)
+    uq, lq = _envelopes(q[None, :], radius)
+    uq, lq = uq[0], lq[0]
+
+    ends, owner = np.asarray(index["end"]), np.asarray(index["ticker"])
+    mask = np.ones(len(ends), dtype=bool)
+    if before is not None:
+        cutoff = pd.Timestamp(before).as_unit("ns").value
+        horizon = max(index["horizons"], default=0)
+        if horizon:
+            # Tag der längsten Folgerendite = Ende des Fensters `horizon` Zeilen weiter (gleicher Ticker)
+            mask[:] = False
+            mask[:-horizon] = (owner[horizon:] == owner[:-horizon]) & (ends[horizon:] < cutoff)
+        else:
+            mask &= ends < cutoff
+    if exclude:
+        excluded = [i for i, t in enumerate(index["tickers"]) if t in set(exclude)]
+        mask &= ~np.isin(owner, excluded)
+
+    lb = _lower_bounds(index, q, uq, lq, mask)
+    candidates = np.flatnonzero(np.isfinite(lb))
+    order = candidates[np.argsort(lb[candidates], kind="stable")]
+
+    exclusion = length if exclusion is None else exclusion
+    chosen = np.zeros(max(k, 0), dtype=np.int64)
+    buf_idx, buf_dist, found = np.zeros(0, dtype=np.int64), np.zeros(0), 0
+    if len(order) and k > 0:
+        buf_idx, buf_dist, count = _search(
+            q, uq, lq, np.asarray(index["windows"]), np.asarray(index["upper"]), np.asarray(index["lower"]),
+            order, lb, owner, radius, k, exclusion,
+            np.zeros(4 * k, dtype=np.int64), np.full(4 * k, np.inf),
+        )
+        found = _suppress(buf_idx, buf_dist, count, owner, k, exclusion, chosen)
+
+    rows = buf_idx[chosen[:found]]
+    result = pd.DataFrame({
+        "ticker":   [index["tickers"][t] for t in index["ticker"][rows]],
+        "start":    pd.to_datetime(np.asarray(index["start"][rows])),
+        "end":      pd.to_datetime(np.asarray(index["end"][rows])),
+        "distance": np.sqrt(buf_dist[chosen[:found]]),
+    })
+    for j, h in enumerate(index["horizons"]):
+        result[f"ret_{h}"] = np.asarray(index["returns"][rows, j], dtype=np.float64)
+    return result
+
+
+def search_ticker(
+    index: dict,
+    panel: dict,
+    ticker: str,
+    k: int = 10,
+    at=None,
+    exclude_self: bool = False,
+) -> pd.DataFrame:
+    """
+    Query = die letzten `length` Schlusskurse eines Tickers bis `at`;
+    durchsucht wird nur Historie, deren Folgerenditen vor dem Query-Start
+    feststanden.
+
+    Parameter:
+        index        : open_index()-Ergebnis
+        panel        : open_panel()-Ergebnis
+        ticker       : z.B. "AAPL"
+        k            : Anzahl Treffer
+        at           : letzter Tag der Query (Standard: letzter Tag im Panel)
+        exclude_self : True = nur andere Ticker durchsuchen
+
+    Rückgabe:
+        wie search()
+
+    Raises:
+        ValueError wenn vor `at` weniger als length Handelstage vorliegen
+    """
+    series = ticker_arrays(panel, ticker)
+    dates = pd.DatetimeIndex(series["Date"])
+    n = len(dates) if at is None else int(dates.searchsorted(pd.Timestamp(at), side="right"))
+    length = index["length"]
+    if n < length:
+        raise ValueError(f"{ticker}: {n} Handelstage bis {at}, benötigt {length}")
+    query = np.asarray(series["Close"][n - length:n], dtype=np.float64)
+    return search(
+        index, query, k=k, before=dates[n - length],
+        exclude=[ticker] if exclude_self else None,
+    )
@@ -0,0 +1,400 @@
+"""
+Feature-Matrix – (Ticker, Datum) × Feature für XGBoost, blockweise
+──────────────────────────────────────────────────────────────────
+Baut die Trainingsmatrix direkt aus den Parquet-Dateien des Feature Stores,
+ohne je die ganze Matrix als DataFrame zu halten:
+
+    Parquet je Ticker (pyarrow, nur benötigte Spalten/Zeilen)
+        → float32-Block (Zeilen × Features) + Ziele
+        → Teil-Dateien .npy auf Platte (CHUNK_ROWS Zeilen je Teil)
+        → xgboost.DataIter → QuantileDMatrix (in-memory, quantisiert)
+                            oder DMatrix im External-Memory-Modus
+
+Im Speicher liegt höchstens ein Block plus ein Ticker.
+
+Spalten:
+    Standard sind alle Spalten der FEATURE_PIPELINE ohne EXCLUDED (OHLCV
+    und absolute Volumen-Niveaus, die zwischen Tickern nicht vergleichbar
+    sind). Kurs-Niveaus (PRICE_COLUMNS: EMAs, Bänder, PSAR, Donchian) werden
+    als Abstand zum Schlusskurs (Wert/Close − 1) übernommen, Kurs-Differenzen
+    (PRICE_DIFF_COLUMNS: MACD-Linie, Signal, Histogramm) relativ zum
+    Schlusskurs (Wert/Close) – beide sonst zwischen Tickern nicht vergleichbar.
+    Label-Spalten (kategorien.LABELS) → Index in der festen Kategorienliste,
+    Candlestick-Codes (kerzen.CANDLE_COLUMNS) → Code; beide als kategoriale
+    Features ("c"), fehlend = NaN. bool → 0/1.
+
+Ziele (ohne Lookahead):
+    ret_{h} = Close[t+h] / Close[t] − 1 je Horizont, nur innerhalb eines
+    Tickers. Liegt t+h nach `end` oder hinter dem letzten Kurs, ist das Ziel
+    NaN – eine Matrix bis end enthält keine Information von danach. Die
+    Features in Zeile t stammen aus dem Feature Store und nutzen nur Kurse
+    bis t.
+
+Layout (Verzeichnis data/ml/matrix/{name}/):
+    X-00000.npy      : float32 (Zeilen × Features)
+    y-00000.npy      : float32 (Zeilen × Horizonte)
+    ticker-00000.npy : int32   Index in tickers (meta.json)
+    date-00000.npy   : int64   Datum in ns seit Epoche
+    meta.json        : Version, Features, Feature-Typen, Horizonte, Ticker, Zeilen je Teil
+
+Verwendung:
+    from src.ml import feature_matrix
+
+    feature_matrix.build_matrix(tickers, name="train", end="2024-12-31")
+    matrix = feature_matrix.open_matrix("train")
+    dtrain = feature_matrix.to_dmatrix(matrix, horizon=5)        # Ziel: ret_5 > 0
+    booster = xgboost.train(params, dtrain)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    import xgboost
+except ImportError:           # optionale Abhängigkeit
+    xgboost = None
+
+from src.data import feature_store
+from src.data.price_panel import _swap_dir
+from src.ta.indikatoren.kategorien import LABELS
+
+MATRIX_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "ml", "matrix")
+
+HORIZONS   = (5, 10, 20)      # Folgerenditen in Handelstagen (wie dtw_search)
+CHUNK_ROWS = 262_144          # Zeilen je Teil (~45 Features → ~50 MB float32)
+
+EXCLUDED = ["Open", "High", "Low", "Close", "Volume", "obv", "obv_ema", "vol_sma20"]
+
+PRICE_COLUMNS = [
+    "psar", "ema_9", "ema_21", "ema_50", "ema_200",
+    "bb_mid", "bb_upper", "bb_lower", "donchian_high", "donchian_low",
+]
+
+PRICE_DIFF_COLUMNS = ["macd", "macd_signal", "macd_hist"]
+
+# Candlestick-Codes: kleinster gültiger Wert (darunter = undefiniert)
+CODE_COLUMNS = {"candle_shape": 1, "candle_loc": 0, "pattern2": 0, "pattern3": 0}
+
+MATRIX_VERSION = 2
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _matrix_path(name: str) -> str:
+    return os.path.join(MATRIX_DIR, name)
+
+
+def _part(directory: str, kind: str, i: int) -> str:
+    return os.path.join(directory, f"{kind}-{i:05d}.npy")
+
+
+def _label_codes(col: str, values: pa.ChunkedArray) -> np.ndarray:
+    """Dictionary-Spalte → Index in LABELS[col] (fehlend/unbekannt = NaN)."""
+    if values.num_chunks == 0:
+        return np.empty(0, dtype=np.float32)
+    values = values.chunk(0)           # Tabelle ist zusammengefasst (ein Chunk je Spalte)
+    if not pa.types.is_dictionary(values.type):
+        values = values.dictionary_encode()
+    categories = LABELS[col]
+    lut = np.array(
+        [categories.index(v) if v in categories else np.nan for v in values.dictionary.to_pylist()] + [np.nan],
+        dtype=np.float32,
+    )
+    indices = pc.fill_null(values.indices, len(lut) - 1).to_numpy(zero_copy_only=False)
+    return lut[indices]
+
+
+def _column(table: pa.Table, col: str, close: np.ndarray) -> np.ndarray:
+    """Eine Feature-Spalte als float32 (siehe Modul-Docstring)."""
+    if col not in table.column_names:
+        return np.full(table.num_rows, np.nan, dtype=np.float32)
+    values = table.column(col)
+    if col in LABELS:
+        return _label_codes(col, values)
+    result = np.array(pc.cast(values, pa.float64()).to_numpy(zero_copy_only=False))
+    if col in CODE_COLUMNS:
+        result = np.where(result >= CODE_COLUMNS[col], result, np.nan)
+    elif col in PRICE_COLUMNS:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = result / close - 1
+    elif col in PRICE_DIFF_COLUMNS:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = result / close
+    result[~np.isfinite(result)] = np.nan
+    return result.astype(np.float32)
+
+
+def _targets(close: np.ndarray, horizons: tuple) -> np.ndarray:
+    result = np.full((len(close), len(horizons)), np.nan, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j, h in enumerate(horizons):
+            if len(close) > h:
+                result[:-h, j] = close[h:] / close[:-h] - 1
+    return result
+
+
+def _read_ticker(ticker: str, columns: list[str], horizons: tuple, start, end) -> dict | None:
+    """Block eines Tickers (Zeilen in [start, end]) oder None ohne Parquet-Datei."""
+    parts = feature_store.parquet_parts(ticker)
+    if not parts:
+        return None
+    available = set(pq.read_schema(parts[0]).names)
+    wanted = ["Date", "Close"] + [c for c in columns if c in available and c != "Close"]
+    filters = []
+    if start is not None:
+        filters.append(("Date", ">=", np.datetime64(start, "ns")))
+    if end is not None:
+        filters.append(("Date", "<=", np.datetime64(end, "ns")))
+    table = pq.read_table(parts, columns=wanted, filters=filters or None)
+    table = table.unify_dictionaries().combine_chunks().sort_by("Date")
+
+    X, close = _features(table, columns)
+    # Ziele nur aus Kursen bis end: der Block ist bereits auf [start, end] begrenzt
+    return {"X": X, "y": _targets(close, horizons), "date": _dates(table)}
+
+
+def _features(table: pa.Table, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(float32-Features Zeilen × Spalten, Schlusskurse) einer Arrow-Tabelle mit Close."""
+    close = pc.cast(table.column("Close"), pa.float64()).to_numpy(zero_copy_only=False)
+    X = np.empty((table.num_rows, len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        X[:, j] = _column(table, col, close)
+    return X, close
+
+
+def _dates(table: pa.Table) -> np.ndarray:
+    return pc.cast(table.column("Date"), pa.timestamp("ns")).to_numpy(zero_copy_only=False).view(np.int64)
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def default_columns() -> list[str]:
+    """Alle Spalten der FEATURE_PIPELINE ohne EXCLUDED, in Pipeline-Reihenfolge."""
+    columns = []
+    for step in feature_store.FEATURE_PIPELINE:
+        columns.extend(c for c in step["writes"] if c not in EXCLUDED and c not in columns)
+    return columns
+
+
+def feature_types(columns: list[str]) -> list[str]:
+    """XGBoost-Feature-Typen: "c" für Label-Spalten und Candlestick-Codes, sonst "q"."""
+    return ["c" if col in LABELS or col in CODE_COLUMNS else "q" for col in columns]
+
+
+def latest_row(ticker: str, columns: list[str] | None = None) -> tuple[int, np.ndarray] | None:
+    """
+    Feature-Vektor der letzten Zeile eines Tickers, gleich kodiert wie in der
+    Matrix. Liest nur die letzte Row-Group der jüngsten Parquet-Datei.
+
+    Rückgabe:
+        (Datum in ns seit Epoche, float32-Vektor) – None ohne Feature-Datei
+    """
+    columns = list(columns or default_columns())
+    parts = feature_store.parquet_parts(ticker)
+    if not parts:
+        return None
+    pf = pq.ParquetFile(parts[-1])
+    if pf.metadata.num_row_groups == 0:
+        return None
+    available = set(pf.schema_arrow.names)
+    wanted = ["Date", "Close"] + [c for c in columns if c in available and c != "Close"]
+    table = pf.read_row_group(pf.metadata.num_row_groups - 1, columns=wanted)
+    if table.num_rows == 0:
+        return None
+    table = table.sort_by("Date").slice(table.num_rows - 1).combine_chunks()
+    X, _ = _features(table, columns)
+    return int(_dates(table)[0]), X[0]
+
+
+def iter_chunks(
+    tickers: list[str],
+    columns: list[str] | None = None,
+    horizons=HORIZONS,
+    start=None,
+    end=None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[dict]:
+    """
+    Liest die Feature-Dateien Ticker für Ticker und liefert Blöcke von etwa
+    chunk_rows Zeilen (ein Ticker wird nicht geteilt).
+
+    Parameter:
+        tickers    : Ticker-Liste; Ticker ohne Parquet-Datei werden übersprungen
+        columns    : Feature-Spalten (Standard: default_columns())
+        horizons   : Horizonte der Folgerenditen
+        start, end : Datumsbereich der Zeilen (inklusive); Ziele nach end = NaN
+        chunk_rows : Zielgröße eines Blocks
+
+    Rückgabe:
+        Iterator über dicts {"X": float32 (n × Features), "y": float32 (n × Horizonte),
+        "ticker": int32 (Index in tickers), "date": int64 (ns)}
+    """
+    columns = list(columns or default_columns())
+    horizons = tuple(horizons)
+    pending, rows = [], 0
+
+    def flush() -> dict:
+        block = {key: np.concatenate([p[key] for p in pending]) for key in ("X", "y", "ticker", "date")}
+        pending.clear()
+        return block
+
+    for i, ticker in enumerate(tickers):
+        block = _read_ticker(ticker, columns, horizons, start, end)
+        if block is None:
+            print(f"[feature_matrix] {ticker}: keine Feature-Datei – übersprungen")
+            continue
+        if not len(block["date"]):
+            continue
+        block["ticker"] = np.full(len(block["date"]), i, dtype=np.int32)
+        pending.append(block)
+        rows += len(block["date"])
+        if rows >= chunk_rows:
+            yield flush()
+            rows = 0
+    if pending:
+        yield flush()
+
+
+def build_matrix(
+    tickers: list[str],
+    name: str = "default",
+    columns: list[str] | None = None,
+    horizons=HORIZONS,
+    start=None,
+    end=None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> str:
+    """
+    Schreibt die Matrix blockweise nach data/ml/matrix/{name}/ (ersetzt eine
+    vorhandene atomar). Parameter wie iter_chunks().
+
+    Rückgabe:
+        Pfad des Matrix-Verzeichnisses
+    """
+    columns = list(columns or default_columns())
+    horizons = tuple(horizons)
+    path = _matrix_path(name)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+
+    parts = []
+    for i, block in enumerate(iter_chunks(tickers, columns, horizons, start, end, chunk_rows)):
+        for kind, values in block.items():
+            np.save(_part(tmp, kind, i), values)
+        parts.append(int(len(block["date"])))
+
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({
+            "version": MATRIX_VERSION, "features": columns, "feature_types": feature_types(columns),
+            "horizons": list(horizons), "tickers": list(tickers), "parts": parts,
+            "start": None if start is None else str(start), "end": None if end is None else str(end),
+        }, f)
+
+    _swap_dir(tmp, path)
+    print(f"[feature_matrix] {name}: {sum(parts)} Zeilen × {len(columns)} Features in {len(parts)} Teil(en)")
+    return path
+
+
+def open_matrix(name: str = "default") -> dict | None:
+    """
+    Öffnet eine geschriebene Matrix (lädt keine Daten).
+
+    Rückgabe:
+        meta.json-Inhalt plus path – oder None wenn keine passende Matrix existiert
+    """
+    path = _matrix_path(name)
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    if meta.get("version") != MATRIX_VERSION:
+        return None
+    return {**meta, "path": path}
+
+
+def iter_parts(matrix: dict) -> Iterator[dict]:
+    """Teile einer Matrix als Memory-Maps {"X", "y", "ticker", "date"}."""
+    for i in range(len(matrix["parts"])):
+        yield {
+            kind: np.load(_part(matrix["path"], kind, i), mmap_mode="r")
+            for kind in ("X", "y", "ticker", "date")
+        }
+
+
+def to_dmatrix(
+    matrix: dict,
+    horizon: int | None = None,
+    target: str = "direction",
+    threshold: float = 0.0,
+    external: bool = False,
+    cache_dir: str | None = None,
+    max_bin: int = 256,
+):
+    """
+    XGBoost-Matrix aus den Teilen, über xgboost.DataIter Teil für Teil
+    eingelesen. Zeilen ohne Ziel (NaN) werden ausgelassen.
+
+    Parameter:
+        matrix    : open_matrix()-Ergebnis
+        horizon   : Horizont des Ziels (Standard: erster der Matrix)
+        target    : "direction" (1 wenn ret_h > threshold, sonst 0) oder "return" (ret_h)
+        threshold : Schwelle für "direction"
+        external  : True = DMatrix im External-Memory-Modus (Cache auf Platte),
+                    False = QuantileDMatrix (quantisiert im RAM, für tree_method="hist")
+        cache_dir : Verzeichnis für den External-Memory-Cache (Standard: temporär)
+        max_bin   : Histogramm-Bins der QuantileDMatrix
+
+    Rückgabe:
+        xgboost.QuantileDMatrix bzw. xgboost.DMatrix
+
+    Raises:
+        ImportError wenn xgboost nicht installiert ist
+        ValueError bei unbekanntem Horizont oder Ziel
+    """
+    if xgboost is None:
+        raise ImportError("xgboost nicht installiert – pip install xgboost")
+    horizon = matrix["horizons"][0] if horizon is None else horizon
+    if horizon not in matrix["horizons"]:
+        raise ValueError(f"Horizont {horizon} nicht in der Matrix {matrix['horizons']}")
+    if target not in ("direction", "return"):
+        raise ValueError(f"Unbekanntes Ziel: {target!r} (erlaubt: 'direction', 'return')")
+    j = matrix["horizons"].index(horizon)
+    names, types = matrix["features"], matrix["feature_types"]
+    cache_prefix = None
+    if external:
+        cache_prefix = os.path.join(cache_dir or tempfile.mkdtemp(prefix="ta_xgb_"), "cache")
+
+    class _Parts(xgboost.DataIter):
+        def __init__(self):
+            self._parts = None
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data) -> bool:
+            if self._parts is None:
+                self._parts = iter_parts(matrix)
+            part = next(self._parts, None)
+            if part is None:
+                return False
+            y = np.asarray(part["y"][:, j])
+            keep = np.isfinite(y)
+            label = (y[keep] > threshold).astype(np.float32) if target == "direction" else y[keep]
+            input_data(data=np.asarray(part["X"])[keep], label=label, feature_names=names, feature_types=types)
+            return True
+
+        def reset(self) -> None:
+            self._parts = None
+
+    if external:
+        return xgboost.DMatrix(_Parts(), enable_categorical=True)
+    return xgboost.QuantileDMatrix(_Parts(), max_bin=max_bin, enable_categorical=True)
@@ -0,0 +1,196 @@
+"""
+ML-Inferenz – ein Batch-Aufruf für alle Ticker des Tagesscans
+─────────────────────────────────────────────────────────────
+Bewertet die letzte Feature-Zeile jedes Tickers mit dem XGBoost-Modell in
+EINEM predict-Aufruf statt je Ticker (der Fixkosten-Anteil eines
+Baum-Ensemble-Aufrufs ist bei einer Zeile um Größenordnungen höher als
+die eigentliche Rechnung).
+
+    - Modell   : einmal je Prozess geladen (load_model), danach wiederverwendet
+    - Features : letzte Zeile je Ticker, kodiert wie in der Trainingsmatrix
+                 (feature_matrix.latest_row). Zwischengespeichert je Ticker mit
+                 (mtime, Größe) der Feature-Datei – unveränderte Ticker werden
+                 nicht erneut gelesen, auch nicht über Läufe hinweg
+                 (data/ml/inference/rows.npz; verworfen bei neuer
+                 feature_matrix.MATRIX_VERSION, d.h. geänderter Kodierung)
+
+Das Modell ist ein xgboost.Booster (binary:logistic) aus
+feature_matrix.to_dmatrix() + xgboost.train(), abgelegt mit
+booster.save_model(MODEL_PATH). Die Feature-Namen und -Typen stammen aus dem
+Modell selbst; fehlen sie, gilt feature_matrix.default_columns().
+
+Verwendung:
+    from src.ml import inference
+
+    ml = inference.predict_latest(["AAPL", "MSFT"])
+    ml["AAPL"]        # {"ml_prob": 0.61, "ml_datum": date(2026, 2, 20)}
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xgboost
+except ImportError:           # optionale Abhängigkeit
+    xgboost = None
+
+from src.data import feature_store
+from src.ml import feature_matrix
+
+ML_DIR     = os.path.join(os.path.dirname(__file__), "..", "..", "data", "ml")
+MODEL_PATH = os.environ.get("ML_MODEL", os.path.join(ML_DIR, "xgb", "model.json"))
+ROWS_PATH  = os.path.join(ML_DIR, "inference", "rows.npz")
+
+_model = None      # einmal je Prozess geladen (load_model)
+_rows  = None      # {"features": [...], "entries": {ticker: (stamp, date, vector)}}
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _stamp(ticker: str) -> tuple[int, int] | None:
+    """(mtime_ns, Größe) der jüngsten Feature-Datei – None ohne Feature-Cache."""
+    parts = feature_store.parquet_parts(ticker)
+    if not parts:
+        return None
+    st = os.stat(parts[-1])
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_rows(features: list[str]) -> dict:
+    """Zeilen-Cache aus dem Speicher bzw. von Platte (nur bei gleichen Features)."""
+    global _rows
+    if _rows is not None and _rows["features"] == features:
+        return _rows
+    entries = {}
+    if os.path.exists(ROWS_PATH):
+        data = np.load(ROWS_PATH, allow_pickle=False)
+        current = "version" in data and int(data["version"]) == feature_matrix.MATRIX_VERSION
+        if current and list(data["features"]) == features:
+            for ticker, stamp, date, vector in zip(data["tickers"], data["stamps"], data["dates"], data["X"]):
+                entries[str(ticker)] = ((int(stamp[0]), int(stamp[1])), int(date), vector)
+    _rows = {"features": features, "entries": entries}
+    return _rows
+
+
+def _save_rows(rows: dict) -> None:
+    entries = rows["entries"]
+    tickers = list(entries)
+    os.makedirs(os.path.dirname(ROWS_PATH), exist_ok=True)
+    tmp = ROWS_PATH + ".tmp.npz"
+    np.savez(
+        tmp,
+        version=np.int64(feature_matrix.MATRIX_VERSION),
+        features=np.array(rows["features"], dtype=str),
+        tickers=np.array(tickers, dtype=str),
+        stamps=np.array([entries[t][0] for t in tickers], dtype=np.int64).reshape(-1, 2),
+        dates=np.array([entries[t][1] for t in tickers], dtype=np.int64),
+        X=np.array([entries[t][2] for t in tickers], dtype=np.float32).reshape(len(tickers), len(rows["features"])),
+    )
+    os.replace(tmp, ROWS_PATH)
+
+
+def _model_features(model) -> tuple[list[str], list[str]]:
+    names = list(model.feature_names or feature_matrix.default_columns())
+    types = list(model.feature_types or feature_matrix.feature_types(names))
+    return names, types
+
+
+def _predict(model, X: np.ndarray, names: list[str], types: list[str]) -> np.ndarray:
+    """Ein predict-Aufruf für die ganze Matrix."""
+    matrix = xgboost.DMatrix(X, feature_names=names, feature_types=types, enable_categorical=True)
+    return np.asarray(model.predict(matrix), dtype=np.float64)
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def load_model(path: str | None = None, reload: bool = False):
+    """
+    Lädt das XGBoost-Modell einmal je Prozess.
+
+    Parameter:
+        path   : Modelldatei (Standard: MODEL_PATH bzw. Umgebungsvariable ML_MODEL)
+        reload : True = erneut von Platte laden
+
+    Rückgabe:
+        xgboost.Booster – None wenn keine Modelldatei existiert
+
+    Raises:
+        ImportError wenn eine Modelldatei existiert, xgboost aber nicht installiert ist
+    """
+    global _model
+    path = path or MODEL_PATH
+    if _model is not None and not reload and _model[0] == path:
+        return _model[1]
+    if not os.path.exists(path):
+        return None
+    if xgboost is None:
+        raise ImportError("xgboost nicht installiert – pip install xgboost")
+    booster = xgboost.Booster()
+    booster.load_model(path)
+    _model = (path, booster)
+    return booster
+
+
+def feature_rows(tickers: list[str], features: list[str]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    Letzte Feature-Zeile je Ticker; nur geänderte Feature-Dateien werden gelesen.
+
+    Parameter:
+        tickers  : Ticker-Liste
+        features : Spalten in Modell-Reihenfolge
+
+    Rückgabe:
+        (Ticker mit Feature-Datei, Datum in ns je Ticker, float32-Matrix Ticker × Features)
+    """
+    rows = _load_rows(list(features))
+    entries = rows["entries"]
+    changed = False
+    found = []
+    for ticker in tickers:
+        stamp = _stamp(ticker)
+        if stamp is None:
+            continue
+        cached = entries.get(ticker)
+        if cached is None or cached[0] != stamp:
+            row = feature_matrix.latest_row(ticker, features)
+            if row is None:
+                continue
+            entries[ticker] = (stamp, row[0], row[1])
+            changed = True
+        found.append(ticker)
+    if changed:
+        _save_rows(rows)
+
+    dates = np.array([entries[t][1] for t in found], dtype=np.int64)
+    X = np.array([entries[t][2] for t in found], dtype=np.float32).reshape(len(found), len(features))
+    return found, dates, X
+
+
+def predict_latest(tickers: list[str], model=None) -> dict[str, dict]:
+    """
+    ML-Wahrscheinlichkeit für den letzten Handelstag aller Ticker in einem Aufruf.
+
+    Parameter:
+        tickers : Ticker-Liste
+        model   : xgboost.Booster (Standard: load_model())
+
+    Rückgabe:
+        {ticker: {"ml_prob": float, "ml_datum": date}} – leer ohne Modell;
+        Ticker ohne Feature-Datei fehlen
+    """
+    model = model if model is not None else load_model()
+    if model is None or not tickers:
+        return {}
+    names, types = _model_features(model)
+    found, dates, X = feature_rows(tickers, names)
+    if not found:
+        return {}
+
+    probs = _predict(model, X, names, types)
+    days = pd.DatetimeIndex(dates.view("M8[ns]")).date
+    return {
+        ticker: {"ml_prob": round(float(p), 4), "ml_datum": day}
+        for ticker, p, day in zip(found, probs, days)
+    }
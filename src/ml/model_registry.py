@@ -0,0 +1,167 @@
+"""
+Model Registry – viele kleine Modelle in einer Datei, Laden nach Bedarf
+───────────────────────────────────────────────────────────────────────
+Für PRML entstehen bis zu 2.197 Modelle (eins je Candlestick-Muster). Statt
+tausender Einzeldateien liegen alle in einer Registry-Datei; geöffnet wird
+sie per Memory-Map, und nur die tatsächlich angefragten Modelle werden
+entpickelt – der Start kostet das Lesen des Inhaltsverzeichnisses, nicht
+aller Modelle.
+
+Layout (ähnlich Parquet: Daten vorne, Inhaltsverzeichnis hinten):
+    [Modell 1 (pickle)] [Modell 2 (pickle)] … [Footer (JSON)] [Footer-Länge uint64 LE] [MAGIC]
+
+    Footer: {"version", "meta": {...}, "entries": {key: {"offset", "length", "info"}}}
+
+Geschrieben wird sequentiell in eine versteckte .tmp-Datei (Modelle
+können eintreffen, während andere noch trainiert werden); commit() hängt
+den Footer an und ersetzt die alte Datei atomar. Leser mit offener
+Memory-Map behalten die alte Version.
+
+Die Registry enthält Pickles – nur selbst geschriebene Dateien öffnen.
+
+Verwendung:
+    from src.ml import model_registry
+
+    writer = model_registry.create(path, meta={"days": 2})
+    model_registry.add(writer, "27", model, info={"accuracy": 0.58})
+    model_registry.commit(writer)
+
+    registry = model_registry.open_registry(path)
+    model    = model_registry.load(registry, "27")    # erst jetzt entpickelt
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+
+MAGIC = b"TAMODEL1"
+REGISTRY_VERSION = 1
+
+_TAIL = struct.Struct("<Q")
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _tmp_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.tmp")
+
+
+def _read_footer(data: mmap.mmap) -> dict | None:
+    tail = len(MAGIC) + _TAIL.size
+    if len(data) < tail or data[-len(MAGIC):] != MAGIC:
+        return None
+    (length,) = _TAIL.unpack(data[-tail:-len(MAGIC)])
+    if length > len(data) - tail:
+        return None
+    return json.loads(data[len(data) - tail - length:len(data) - tail])
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def create(path: str, meta: dict | None = None) -> dict:
+    """
+    Beginnt eine neue Registry (ersetzt path erst bei commit()).
+
+    Parameter:
+        path : Zieldatei
+        meta : JSON-serialisierbare Angaben zur ganzen Registry
+
+    Rückgabe:
+        Writer-dict für add() / commit()
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = _tmp_path(path)
+    return {"path": path, "tmp": tmp, "file": open(tmp, "wb"), "entries": {}, "meta": dict(meta or {})}
+
+
+def add(writer: dict, key: str, model=None, info: dict | None = None, blob: bytes | None = None) -> None:
+    """
+    Hängt ein Modell an.
+
+    Parameter:
+        writer : create()-Ergebnis
+        key    : eindeutiger Schlüssel (z.B. Muster-Code als str)
+        model  : beliebiges picklebares Objekt
+        info   : JSON-serialisierbare Angaben (Accuracy, Stichprobengröße …)
+        blob   : bereits gepickeltes Modell (z.B. aus einem Worker-Prozess) statt model
+
+    Raises:
+        ValueError bei doppeltem Schlüssel
+    """
+    key = str(key)
+    if key in writer["entries"]:
+        raise ValueError(f"Schlüssel {key!r} bereits in der Registry")
+    if blob is None:
+        blob = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    f = writer["file"]
+    writer["entries"][key] = {"offset": f.tell(), "length": len(blob), "info": dict(info or {})}
+    f.write(blob)
+
+
+def commit(writer: dict) -> str:
+    """Schreibt das Inhaltsverzeichnis und ersetzt die Zieldatei atomar."""
+    footer = json.dumps({
+        "version": REGISTRY_VERSION, "meta": writer["meta"], "entries": writer["entries"],
+    }).encode()
+    f = writer["file"]
+    f.write(footer)
+    f.write(_TAIL.pack(len(footer)))
+    f.write(MAGIC)
+    f.close()
+    os.replace(writer["tmp"], writer["path"])
+    return writer["path"]
+
+
+def discard(writer: dict) -> None:
+    """Bricht das Schreiben ab und entfernt die temporäre Datei."""
+    writer["file"].close()
+    if os.path.exists(writer["tmp"]):
+        os.remove(writer["tmp"])
+
+
+def open_registry(path: str) -> dict | None:
+    """
+    Öffnet eine Registry read-only als Memory-Map (lädt kein Modell).
+
+    Rückgabe:
+        dict mit meta, entries ({key: {"offset", "length", "info"}}) und
+        Modell-Cache – oder None wenn keine (gültige) Registry existiert
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    footer = _read_footer(data)
+    if footer is None or footer.get("version") != REGISTRY_VERSION:
+        data.close()
+        return None
+    return {"path": path, "data": data, "meta": footer["meta"], "entries": footer["entries"], "cache": {}}
+
+
+def info(registry: dict, key: str) -> dict:
+    """Angaben zu einem Modell (ohne es zu laden)."""
+    return registry["entries"][str(key)]["info"]
+
+
+def load(registry: dict, key: str):
+    """
+    Modell zu key – beim ersten Zugriff entpickelt, danach aus dem Cache.
+
+    Raises:
+        KeyError wenn key nicht in der Registry ist
+    """
+    key = str(key)
+    if key not in registry["cache"]:
+        entry = registry["entries"][key]
+        start = entry["offset"]
+        registry["cache"][key] = pickle.loads(registry["data"][start:start + entry["length"]])
+    return registry["cache"][key]
+
+
+def close(registry: dict) -> None:
+    """Gibt Memory-Map und geladene Modelle frei."""
+    registry["cache"].clear()
+    registry["data"].close()
@@ -0,0 +1,410 @@
+"""
+PRML – ein Klassifikator je Candlestick-Muster (Training-Farm + Tagesprognose)
+──────────────────────────────────────────────────────────────────────────────
+Umsetzung von 03_ml_analyse/03a_modelle/prml_candlestick_rf.md (Lin et al.
+2021): für jedes 2-/3-Tages-Muster (kerzen.py) wird ein eigener
+Klassifikator auf die Richtung des Schlusskurses nach `horizon` Tagen
+trainiert; behalten werden nur Muster mit Test-Accuracy > ACCURACY_MIN und
+mindestens MIN_SAMPLES Trainingspunkten.
+
+Features je Kerze (FEATURE_NAMES, 11 wie im Paper; × days Kerzen je Muster):
+    shape, loc                     : kerzen.py
+    ma5, ema10                     : Abstand zum Schlusskurs (MA/Close − 1)
+    roc1                           : Volumen zum Vortag (v_t / v_{t−1} − 1)
+    cci10                          : Commodity Channel Index, 10 Tage
+    mom10                          : Kursänderung über 10 Tage (relativ)
+    ad10, obv10                    : A/D- bzw. OBV-Zuwachs über 10 Tage / Volumen über 10 Tage
+    tr, atr10                      : True Range / ATR10 relativ zum Schlusskurs
+Abweichung vom Paper: Kurs- und Volumenniveaus sind skaliert, damit ein
+Modell über alle Ticker hinweg trainiert werden kann.
+
+Training (train_patterns):
+    1. Features und Labels des ganzen Price Panels einmal berechnen und als
+       Memory-Map in ein temporäres Verzeichnis legen
+    2. Je Muster die Vorkommen vor train_end aus dem Pattern Index holen
+       (ein Slice, kein Durchsuchen der Historie)
+    3. Ausgewogen steigend/fallend ziehen (höchstens MAX_SAMPLES), zeitlich
+       80/20 teilen, fitten, Accuracy auf den jüngsten 20 %
+    4. Muster auf einen ProcessPool verteilt, größte zuerst (kurze
+       Nachzügler am Ende statt eines großen Musters, das allein läuft);
+       fertige Modelle gehen sofort in die Model Registry (eine Datei)
+
+Tagesprognose (predict_latest):
+    Codes der letzten Kerze je Ticker bestimmen und nur die Modelle der
+    heute vorkommenden Muster aus der Registry laden.
+
+Standardmodell: Random Forest (scikit-learn, optionale Abhängigkeit). Eigene
+Modelle über make_model – eine Funktion auf Modulebene (für den
+ProcessPool picklebar), die ein Objekt mit fit()/predict_proba()/classes_
+liefert.
+
+Verwendung:
+    from src.ml.prml import predict_latest, train_patterns
+
+    summary = train_patterns(days=2, train_end="2024-01-01", workers=8)
+    signals = predict_latest(days=2, top=10)
+"""
+
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+try:
+    from sklearn.ensemble import RandomForestClassifier
+except ImportError:  # optionale Abhängigkeit
+    RandomForestClassifier = None
+
+from src.data import pattern_index
+from src.data.price_panel import FIELDS, open_panel
+from src.ml import model_registry
+from src.ta.muster import kerzen
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "ml", "prml")
+
+FEATURE_NAMES = ["shape", "loc", "ma5", "ema10", "roc1", "cci10", "mom10", "ad10", "obv10", "tr", "atr10"]
+
+HORIZON      = 1          # Tage bis zum Ziel-Schlusskurs (Paper: 1 Tag am besten)
+ACCURACY_MIN = 0.55       # Paper: Muster mit Accuracy > 55 % behalten
+MIN_SAMPLES  = 1000       # Paper ("Adjust"): seltenere Muster verwerfen
+MAX_SAMPLES  = 5000       # Paper: 5.000 Punkte je Muster, 50 % steigend / 50 % fallend
+TEST_SHARE   = 0.2
+WARMUP       = 128        # Kerzen für die Tagesprognose (EMA10 eingeschwungen)
+TICKER_CHUNK = 64
+
+RF_PARAMS = {"n_estimators": 100, "max_depth": 10, "min_samples_leaf": 4, "n_jobs": 1}
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _registry_path(days: int, horizon: int) -> str:
+    return os.path.join(MODELS_DIR, f"d{days}_h{horizon}.models")
+
+
+def _rolling_sum(values: np.ndarray, n: int) -> np.ndarray:
+    """Summe über n Werte entlang der letzten Achse (erste n−1 NaN)."""
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= n:
+        result[..., n - 1:] = np.lib.stride_tricks.sliding_window_view(values, n, axis=-1).sum(axis=-1)
+    return result
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    flat = values.reshape(-1, values.shape[-1])
+    ema = pd.DataFrame(flat.T).ewm(span=span, adjust=False).mean().to_numpy().T
+    return ema.reshape(values.shape)
+
+
+def _cci(tp: np.ndarray, n: int) -> np.ndarray:
+    result = np.full(tp.shape, np.nan)
+    if tp.shape[-1] >= n:
+        windows = np.lib.stride_tricks.sliding_window_view(tp, n, axis=-1)
+        mean = windows.mean(axis=-1)
+        dev = np.abs(windows - mean[..., None]).mean(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[..., n - 1:] = (tp[..., n - 1:] - mean) / (0.015 * dev)
+    return result
+
+
+def _default_model():
+    if RandomForestClassifier is None:
+        raise ImportError("scikit-learn nicht installiert – pip install scikit-learn oder make_model angeben")
+    return RandomForestClassifier(**RF_PARAMS)
+
+
+def _labels(close: np.ndarray, dates: np.ndarray, horizon: int, end: int | None) -> np.ndarray:
+    """1 = steigt, 0 = fällt, -1 = unbekannt/gleich/Ziel nach end (Ticker × Tag)."""
+    future = np.full(close.shape, np.nan)
+    future[:, :-horizon] = close[:, horizon:]
+    label = np.where(future > close, 1, np.where(future < close, 0, -1))
+    if end is not None:
+        target = np.full(dates.shape, np.iinfo(np.int64).max)
+        target[:, :-horizon] = dates[:, horizon:]
+        label[target >= end] = -1
+    return label.astype(np.int8)
+
+
+def _prepare(panel: dict, directory: str, horizon: int, end: int | None) -> None:
+    """Features (Ticker × Tag × Feature, float32) und Labels als .npy für die Worker."""
+    n_tickers, _, n_days = panel["prices"].shape
+    features = np.lib.format.open_memmap(
+        os.path.join(directory, "features.npy"), mode="w+", dtype=np.float32,
+        shape=(n_tickers, n_days, len(FEATURE_NAMES)),
+    )
+    labels = np.lib.format.open_memmap(
+        os.path.join(directory, "labels.npy"), mode="w+", dtype=np.int8, shape=(n_tickers, n_days),
+    )
+    for start in range(0, n_tickers, TICKER_CHUNK):
+        rows = slice(start, min(start + TICKER_CHUNK, n_tickers))
+        block = np.asarray(panel["prices"][rows], dtype=np.float64)
+        o, h, l, c = (block[:, FIELDS.index(f), :] for f in ("Open", "High", "Low", "Close"))
+        volume = np.asarray(panel["volume"][rows], dtype=np.float64)
+        features[rows] = candle_features(o, h, l, c, volume)
+        labels[rows] = _labels(c, np.asarray(panel["dates"][rows]), horizon, end)
+    features.flush()
+    labels.flush()
+
+
+_data = None       # im Worker: {"features", "labels", "index", ...}
+
+
+def _init_worker(directory: str, days: int, make_model, seed: int) -> None:
+    global _data
+    _data = {
+        "features":   np.load(os.path.join(directory, "features.npy"), mmap_mode="r"),
+        "labels":     np.load(os.path.join(directory, "labels.npy"), mmap_mode="r"),
+        "index":      pattern_index.open_index(days),
+        "days":       days,
+        "make_model": make_model,
+        "seed":       seed,
+    }
+
+
+def _fit_pattern(code: int, min_samples: int, max_samples: int) -> tuple[int, bytes | None, dict]:
+    """
+    Worker-Einstieg: trainiert das Modell eines Musters.
+
+    Rückgabe:
+        (code, gepickeltes Modell oder None wenn zu wenig Daten, Angaben)
+    """
+    days = _data["days"]
+    hits = pattern_index.occurrence_arrays(_data["index"], code)
+    ticker, pos, dates = (np.asarray(hits[k]) for k in ("ticker", "pos", "date"))
+    y = np.asarray(_data["labels"][ticker, pos])
+    up, down = np.flatnonzero(y == 1), np.flatnonzero(y == 0)
+    info = {"n_samples": int(len(up) + len(down)), "up_share": float(len(up) / max(len(up) + len(down), 1))}
+
+    k = min(len(up), len(down), max_samples // 2)
+    if 2 * k < min_samples:
+        return code, None, info
+    rng = np.random.default_rng(_data["seed"] + code)
+    pick = np.concatenate([rng.choice(up, k, replace=False), rng.choice(down, k, replace=False)])
+    pick = pick[np.argsort(dates[pick], kind="stable")]         # zeitlich: jüngste 20 % = Test
+
+    lags = pos[pick, None] - np.arange(days - 1, -1, -1)
+    X = np.asarray(_data["features"][ticker[pick, None], lags]).reshape(len(pick), -1)
+    X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+    y = y[pick]
+    split = int(len(pick) * (1 - TEST_SHARE))
+
+    model = _data["make_model"]()
+    model.fit(X[:split], y[:split])
+    accuracy = float((model.predict(X[split:]) == y[split:]).mean())
+    info.update({"n_train": split, "n_test": len(pick) - split, "accuracy": accuracy})
+    return code, pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), info
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def candle_features(open_, high, low, close, volume) -> np.ndarray:
+    """
+    Die 11 PRML-Features je Kerze (Reihenfolge FEATURE_NAMES).
+
+    Parameter:
+        open_, high, low, close, volume : Arrays gleicher Form (1-D oder Ticker × Tag)
+
+    Rückgabe:
+        float32-Array (…, Tag, Feature); NaN wo das Fenster noch nicht voll ist
+    """
+    o, h, l, c, v = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close, volume))
+    prev_c = np.full(c.shape, np.nan)
+    prev_c[..., 1:] = c[..., :-1]
+    prev_v = np.full(v.shape, np.nan)
+    prev_v[..., 1:] = v[..., :-1]
+    atr = kerzen.average_true_range(h, l, c, 10)
+    tr = np.where(np.isnan(prev_c), h - l, np.fmax(h, prev_c) - np.fmin(l, prev_c))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        clv = np.where(h > l, (2 * c - h - l) / (h - l), 0.0)
+        volume10 = _rolling_sum(v, 10)
+        mom_base = np.full(c.shape, np.nan)
+        mom_base[..., 10:] = c[..., :-10]
+        columns = [
+            kerzen.shape_codes(o, h, l, c, atr),
+            kerzen.loc_codes(h, l, c),
+            _rolling_sum(c, 5) / 5 / c - 1,
+            _ema(c, 10) / c - 1,
+            v / prev_v - 1,
+            _cci((h + l + c) / 3, 10),
+            c / mom_base - 1,
+            _rolling_sum(clv * v, 10) / volume10,
+            _rolling_sum(np.sign(c - prev_c) * v, 10) / volume10,
+            tr / c,
+            atr / c,
+        ]
+    result = np.stack([np.asarray(col, dtype=np.float64) for col in columns], axis=-1)
+    result[~np.isfinite(result)] = np.nan
+    return result.astype(np.float32)
+
+
+def train_patterns(
+    panel: dict | None = None,
+    days: int = 2,
+    horizon: int = HORIZON,
+    train_end=None,
+    make_model=None,
+    workers: int | None = None,
+    accuracy_min: float = ACCURACY_MIN,
+    min_samples: int = MIN_SAMPLES,
+    max_samples: int = MAX_SAMPLES,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Trainiert je Muster einen Klassifikator und schreibt die behaltenen
+    Modelle in die Registry (data/ml/prml/d{days}_h{horizon}.models).
+
+    Parameter:
+        panel        : open_panel()-Ergebnis (Standard: data/prices/panel)
+        days         : Musterlänge (2 → 169, 3 → 2.197 Muster)
+        horizon      : Prognose-Horizont in Handelstagen
+        train_end    : nur Ziel-Kurse vor diesem Datum (Standard: alle)
+        make_model   : Fabrik für ein Modell (Standard: Random Forest)
+        workers      : Prozesse (1 = im aktuellen Prozess, None = alle CPU-Kerne)
+        accuracy_min : Muster mit Test-Accuracy darüber behalten
+        min_samples  : Mindestzahl ausgewogener Datenpunkte je Muster
+        max_samples  : Höchstzahl Datenpunkte je Muster (Hälfte steigend)
+        seed         : Stichprobe je Muster (seed + Code)
+
+    Rückgabe:
+        DataFrame je trainiertem Muster: pattern, n_samples, up_share,
+        n_train, n_test, accuracy, kept – nach Accuracy absteigend
+
+    Raises:
+        FileNotFoundError wenn kein Price Panel existiert
+        ImportError wenn weder scikit-learn noch make_model verfügbar ist
+    """
+    panel = panel or open_panel()
+    if panel is None:
+        raise FileNotFoundError("Kein Price Panel – zuerst materialize_panel() ausführen")
+    if make_model is None:
+        _default_model()                        # ImportError früh, nicht im Worker
+        make_model = _default_model
+
+    index = pattern_index.open_index(days)
+    if index is None or index["tickers"] != panel["tickers"] or index["lengths"] != panel["lengths"]:
+        pattern_index.build_index(panel, days=(days,))
+    counts = pattern_index.counts(pattern_index.open_index(days))
+    # Größte Muster zuerst; Muster mit weniger Vorkommen als min_samples können nicht bestehen
+    codes = [int(c) for c in np.argsort(-counts, kind="stable") if counts[c] >= min_samples]
+
+    end = None if train_end is None else pd.Timestamp(train_end).value
+    writer = model_registry.create(_registry_path(days, horizon), meta={
+        "days": days, "horizon": horizon, "features": FEATURE_NAMES,
+        "train_end": None if train_end is None else str(pd.Timestamp(train_end).date()),
+        "accuracy_min": accuracy_min, "min_samples": min_samples,
+    })
+    rows = []
+
+    def _store(code: int, blob: bytes | None, info: dict) -> None:
+        if blob is None:
+            return
+        kept = info["accuracy"] > accuracy_min
+        rows.append({"pattern": code, **info, "kept": kept})
+        if kept:
+            model_registry.add(writer, str(code), info=info, blob=blob)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="ta_prml_") as directory:
+            _prepare(panel, directory, horizon, end)
+            args = (directory, days, make_model, seed)
+            if workers == 1 or len(codes) <= 1:
+                _init_worker(*args)
+                for code in codes:
+                    _store(*_fit_pattern(code, min_samples, max_samples))
+            else:
+                with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=args) as pool:
+                    futures = [pool.submit(_fit_pattern, code, min_samples, max_samples) for code in codes]
+                    for future in as_completed(futures):
+                        _store(*future.result())
+    except BaseException:
+        model_registry.discard(writer)
+        raise
+    model_registry.commit(writer)
+
+    columns = ["pattern", "n_samples", "up_share", "n_train", "n_test", "accuracy", "kept"]
+    summary = pd.DataFrame(rows, columns=columns)
+    print(f"[prml] {len(summary)} Muster trainiert, {int(summary['kept'].sum())} behalten (d={days}, h={horizon})")
+    return summary.sort_values("accuracy", ascending=False, ignore_index=True)
+
+
+def open_models(days: int = 2, horizon: int = HORIZON) -> dict | None:
+    """Öffnet die Registry eines Trainingslaufs (lädt kein Modell) – None wenn keine existiert."""
+    return model_registry.open_registry(_registry_path(days, horizon))
+
+
+def predict_latest(
+    panel: dict | None = None,
+    days: int = 2,
+    horizon: int = HORIZON,
+    top: int | None = None,
+    registry: dict | None = None,
+    tickers: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Prognose für die letzte Kerze jedes Tickers mit den Modellen der heute
+    vorkommenden Muster – andere Modelle werden nicht geladen.
+
+    Parameter:
+        panel    : open_panel()-Ergebnis (Standard: data/prices/panel)
+        days     : Musterlänge
+        horizon  : Prognose-Horizont (wählt die Registry)
+        top      : nur die `top` Muster mit der höchsten Accuracy (Paper: TOP10)
+        registry : open_models()-Ergebnis (Standard: wird geöffnet)
+        tickers  : nur diese Ticker (Standard: alle im Panel)
+
+    Rückgabe:
+        DataFrame je Ticker mit bewertetem Muster: ticker, date, pattern,
+        prob_up, signal (BUY/SELL), accuracy, n_samples – nach prob_up absteigend
+
+    Raises:
+        FileNotFoundError wenn Price Panel oder Registry fehlen
+    """
+    panel = panel or open_panel()
+    if panel is None:
+        raise FileNotFoundError("Kein Price Panel – zuerst materialize_panel() ausführen")
+    registry = registry or open_models(days, horizon)
+    if registry is None:
+        raise FileNotFoundError(f"Keine PRML-Modelle für d={days}, h={horizon} – zuerst train_patterns() ausführen")
+
+    allowed = sorted(registry["entries"], key=lambda k: -registry["entries"][k]["info"]["accuracy"])
+    allowed = set(allowed[:top] if top else allowed)
+
+    names = [t for t in (tickers or panel["tickers"]) if panel["lengths"][t] >= days]
+    rows = np.array([panel["pos"][t] for t in names], dtype=np.int64)
+    lengths = np.array([panel["lengths"][t] for t in names], dtype=np.int64)
+
+    # Letzte WARMUP Kerzen je Ticker rechtsbündig (davor NaN)
+    cols = lengths[:, None] - WARMUP + np.arange(WARMUP)
+    valid = cols >= 0
+    cols = np.clip(cols, 0, None)
+    block = np.asarray(panel["prices"])[rows[:, None], :, cols]        # Ticker × Tag × Feld
+    block[~valid] = np.nan
+    o, h, l, c = (block[..., FIELDS.index(f)] for f in ("Open", "High", "Low", "Close"))
+    volume = np.where(valid, np.asarray(panel["volume"])[rows[:, None], cols], np.nan)
+
+    features = candle_features(o, h, l, c, volume)
+    codes = kerzen.pattern_codes(features[..., 0], days)[:, -1]
+    dates = np.asarray(panel["dates"])[rows, lengths - 1].view("M8[ns]")
+
+    result = []
+    for code in np.unique(codes[codes >= 0]):
+        if str(code) not in allowed:
+            continue
+        model = model_registry.load(registry, str(code))
+        members = np.flatnonzero(codes == code)
+        X = np.nan_to_num(features[members, -days:, :].reshape(len(members), -1), nan=0.0, posinf=0.0, neginf=0.0)
+        prob = model.predict_proba(X)[:, list(model.classes_).index(1)]
+        info = model_registry.info(registry, str(code))
+        for i, p in zip(members, prob):
+            result.append({
+                "ticker": names[i], "date": dates[i], "pattern": int(code), "prob_up": float(p),
+                "signal": "BUY" if p >= 0.5 else "SELL",
+                "accuracy": info["accuracy"], "n_samples": info["n_samples"],
+            })
+
+    columns = ["ticker", "date", "pattern", "prob_up", "signal", "accuracy", "n_samples"]
+    df = pd.DataFrame(result, columns=columns)
+    return df.sort_values("prob_up", ascending=False, ignore_index=True)
@@ -0,0 +1,257 @@
+"""
+Scanner – paralleler Lauf über das Ticker-Universum
+───────────────────────────────────────────────────
+Ersetzt die sequentielle Schleife get_features → run je Ticker durch zwei
+überlappende Stufen:
+
+    1. Kurse laden   (ThreadPool)  : fetch_many() – Sammel-Download je Batch,
+                                     füllt den lokalen Kurs-Cache
+    2. Analyse       (ProcessPool) : get_features() + run() – CPU-lastig,
+                                     liest die Kurse aus dem warmen Cache
+
+Während die Prozesse Indikatoren rechnen, laden die Threads bereits die
+nächsten Ticker. Ergebnisse werden in Fertigstellungs-Reihenfolge geliefert
+(Generator), nicht erst am Ende.
+
+Fehler-Isolation:
+    - Exception in einer Stufe      → Eintrag mit "error", Lauf geht weiter
+    - Zeitlimit je Stufe überschritten → Eintrag mit TimeoutError; der Worker
+      läuft im Hintergrund zu Ende und belegt so lange seinen Slot. Belegen
+      abgelaufene Aufgaben alle Slots einer Stufe ein weiteres Zeitlimit lang,
+      wird deren Pool ersetzt (ProcessPool: Worker beendet, wie nach einem
+      Absturz; ThreadPool: neue Threads, die alten laufen verwaist aus)
+    - Absturz eines Worker-Prozesses → ProcessPool wird neu gestartet, die
+      betroffenen Ticker einzeln wiederholt; wer den Pool dabei erneut
+      abstürzen lässt, wird als Fehler gemeldet
+
+Panel-Modus (panel=Pfad, siehe src/data/price_panel.py):
+    Die Kurse liegen bereits als Memory-Map vor → keine Kursabruf-Stufe.
+    Jeder Worker öffnet das Panel einmal beim Start und rechnet auf
+    zero-copy-Sichten statt über den Feature Store; alle Prozesse teilen
+    sich dieselben Seiten im Page-Cache.
+
+Es sind nie mehr Aufgaben eingereicht als Worker vorhanden sind – damit
+beginnt das Zeitlimit mit dem tatsächlichen Start, und bei Tausenden Tickern
+liegen nicht Tausende Ergebnisse gleichzeitig im Speicher.
+
+Verwendung:
+    from src.scanner import scan
+
+    for item in scan(tickers, workers=8, timeout=60):
+        if item["error"]:
+            print(item["ticker"], item["error"])
+        else:
+            print_signal(item["result"])
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator
+
+from src.data.feature_store import get_features
+from src.data.price_fetcher import fetch_many
+from src.data.price_panel import open_panel, ticker_frame
+from src.ta.TA_run import run
+
+FETCH_WORKERS = 4          # Threads für den Kursabruf (I/O-gebunden)
+FETCH_BATCH   = 25         # Ticker je Sammel-Download eines Threads
+TIMEOUT       = 120.0      # Sekunden je Ticker und Stufe
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+_panel = None      # im Worker geöffnetes Memory-Map-Panel (Panel-Modus)
+
+
+def _init_worker(panel_path: str) -> None:
+    """Initializer der Worker-Prozesse im Panel-Modus."""
+    global _panel
+    _panel = open_panel(panel_path)
+    if _panel is None:
+        raise FileNotFoundError(f"Kein Panel unter {panel_path}")
+
+
+def _analyse(ticker: str) -> dict:
+    """Läuft im Worker-Prozess: Indikatoren (Feature Store bzw. Panel) + TA-Score."""
+    if _panel is not None:
+        df = ticker_frame(_panel, ticker)
+    else:
+        # run() wertet nur den letzten Handelstag aus → keine Historie deserialisieren
+        df = get_features(ticker, last_n=1)
+    result = run(df, ticker=ticker)
+    # Indikator-DataFrame nicht zurück an den Hauptprozess übertragen
+    result.pop("df", None)
+    return result
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _item(ticker: str, started: float, result: dict | None = None, error: Exception | None = None) -> dict:
+    return {
+        "ticker":   ticker,
+        "result":   result,
+        "error":    None if error is None else f"{type(error).__name__}: {error}",
+        "sekunden": round(time.monotonic() - started, 2),
+    }
+
+
+def _start_pool(workers: int, panel: str | None) -> ProcessPoolExecutor:
+    if panel is None:
+        return ProcessPoolExecutor(workers)
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(panel,))
+
+
+def _stop_pool(pool: ProcessPoolExecutor, kill: bool) -> None:
+    """Beendet den ProcessPool; kill=True bricht hängende Worker ab."""
+    pool.shutdown(wait=not kill, cancel_futures=True)
+    if kill:
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def scan(
+    tickers: list[str],
+    workers: int | None = None,
+    fetch_workers: int = FETCH_WORKERS,
+    timeout: float = TIMEOUT,
+    fetch_batch: int = FETCH_BATCH,
+    panel: str | None = None,
+) -> Iterator[dict]:
+    """
+    Analysiert alle Ticker parallel und liefert die Ergebnisse, sobald sie fertig sind.
+
+    Parameter:
+        tickers       : Liste von Ticker-Symbolen
+        workers       : Prozesse für die Analyse (Standard: Anzahl CPU-Kerne)
+        fetch_workers : Threads für den Kursabruf
+        timeout       : Zeitlimit in Sekunden je Ticker und Stufe
+        fetch_batch   : Ticker je Sammel-Download (ein yfinance-Request)
+        panel         : Pfad eines Memory-Map-Panels → ohne Kursabruf und
+                        Feature Store direkt aus dem Panel rechnen
+
+    Rückgabe (je Ticker, in Fertigstellungs-Reihenfolge):
+        dict mit:
+            ticker   : str
+            result   : dict von run() ohne "df" – None bei Fehler
+            error    : None | 'ExceptionTyp: Meldung'
+            sekunden : float – Laufzeit seit Beginn des Kursabrufs
+                       (Panel-Modus: seit Beginn der Analyse)
+    """
+    workers = workers or os.cpu_count() or 1
+
+    todo    = deque() if panel else deque(tickers)
+    ready   = deque(tickers) if panel else deque()   # Kurse da, wartet auf einen Prozess
+    suspects = deque()             # nach Pool-Absturz: einzeln wiederholen
+    started = {}                   # ticker → Startzeit des Kursabrufs
+    fetching: dict = {}            # Future → ([ticker, ...], deadline)
+    computing: dict = {}           # Future → ([ticker], deadline)
+    stale_io, stale_cpu = set(), set()   # abgelaufen, belegen aber noch einen Slot
+    stuck_io = stuck_cpu = None    # seit wann nur abgelaufene Aufgaben die Stufe blockieren
+    isolated = None                # einzeln laufender Verdächtiger
+
+    io_pool  = ThreadPoolExecutor(fetch_workers, thread_name_prefix="fetch")
+    cpu_pool = _start_pool(workers, panel)
+    try:
+        while todo or ready or suspects or fetching or computing:
+            stale_io  = {f for f in stale_io if not f.done()}
+            stale_cpu = {f for f in stale_cpu if not f.done()}
+
+            # Freie Slots füllen
+            while todo and len(fetching) + len(stale_io) < fetch_workers:
+                batch = [todo.popleft() for _ in range(min(fetch_batch, len(todo)))]
+                now = time.monotonic()
+                started.update(dict.fromkeys(batch, now))
+                fetching[io_pool.submit(fetch_many, batch)] = (batch, now + timeout)
+            if suspects:
+                # Verdächtige allein im Pool → ein erneuter Absturz ist eindeutig zuzuordnen
+                if not computing and not stale_cpu:
+                    ticker = suspects.popleft()
+                    isolated = ticker
+                    computing[cpu_pool.submit(_analyse, ticker)] = ([ticker], time.monotonic() + timeout)
+            else:
+                while ready and len(computing) + len(stale_cpu) < workers:
+                    ticker = ready.popleft()
+                    started.setdefault(ticker, time.monotonic())
+                    computing[cpu_pool.submit(_analyse, ticker)] = ([ticker], time.monotonic() + timeout)
+
+            # Arbeit wartet, aber alle Slots einer Stufe sind von abgelaufenen Aufgaben
+            # belegt → höchstens ein weiteres Zeitlimit warten, dann Pool ersetzen
+            now = time.monotonic()
+            blocked_io  = bool(todo and stale_io and not fetching)
+            blocked_cpu = bool((ready or suspects) and stale_cpu and not computing)
+            stuck_io  = (stuck_io or now) if blocked_io else None
+            stuck_cpu = (stuck_cpu or now) if blocked_cpu else None
+
+            deadlines = [d for _, d in (*fetching.values(), *computing.values())]
+            deadlines += [t + timeout for t in (stuck_io, stuck_cpu) if t is not None]
+            wait_for  = max(0.0, min(deadlines) - now) if deadlines else None
+            done, _ = wait(
+                [*fetching, *computing, *stale_io, *stale_cpu],
+                timeout=wait_for,
+                return_when=FIRST_COMPLETED,
+            )
+
+            broken = []
+            for future in done:
+                if future in fetching:
+                    batch, _ = fetching.pop(future)
+                    error = future.exception()
+                    prices = {} if error is not None else future.result()
+                    for ticker in batch:
+                        if ticker in prices:
+                            ready.append(ticker)
+                        else:
+                            yield _item(ticker, started[ticker], error=error or LookupError("keine Kursdaten"))
+
+                elif future in computing:
+                    [ticker], _ = computing.pop(future)
+                    error = future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        broken.append(ticker)
+                    elif error is None:
+                        yield _item(ticker, started[ticker], result=future.result())
+                    else:
+                        yield _item(ticker, started[ticker], error=error)
+
+            # Abgestürzter Worker-Prozess reißt alle laufenden Aufgaben mit →
+            # neuer Pool, betroffene Ticker einzeln wiederholen
+            if broken:
+                _stop_pool(cpu_pool, kill=True)
+                cpu_pool = _start_pool(workers, panel)
+                stale_cpu = set()
+                for ticker in broken:
+                    if ticker == isolated:
+                        yield _item(ticker, started[ticker], error=BrokenProcessPool("Worker-Prozess abgestürzt"))
+                    else:
+                        suspects.append(ticker)
+            isolated = None if not computing else isolated
+
+            # Zeitlimits
+            now = time.monotonic()
+            for stage, stale in ((fetching, stale_io), (computing, stale_cpu)):
+                for future, (batch, deadline) in list(stage.items()):
+                    if now >= deadline:
+                        del stage[future]
+                        if not future.cancel():
+                            stale.add(future)
+                        for ticker in batch:
+                            yield _item(ticker, started[ticker], error=TimeoutError(f"Zeitlimit {timeout:g}s überschritten"))
+
+            # Blockierte Stufen: Pool ersetzen (Ergebnisse der abgelaufenen Aufgaben sind bereits gemeldet)
+            if stuck_cpu is not None and now >= stuck_cpu + timeout and not any(f.done() for f in stale_cpu):
+                _stop_pool(cpu_pool, kill=True)
+                cpu_pool = _start_pool(workers, panel)
+                stale_cpu, stuck_cpu = set(), None
+            if stuck_io is not None and now >= stuck_io + timeout and not any(f.done() for f in stale_io):
+                io_pool.shutdown(wait=False, cancel_futures=True)
+                io_pool = ThreadPoolExecutor(fetch_workers, thread_name_prefix="fetch")
+                stale_io, stuck_io = set(), None
+
+    finally:
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        _stop_pool(cpu_pool, kill=bool(stale_cpu or computing))
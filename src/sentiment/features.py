@@ -0,0 +1,159 @@
+"""
+Sentiment-Features – tägliche Aggregate je Ticker aus News Store + FinBERT
+──────────────────────────────────────────────────────────────────────────
+Verdichtet die Artikel eines Tickers zu einer Zeile je Handelstag. Ein
+Artikel zählt zum ersten Handelstag, dessen Schlusskurs (16:00 Uhr New York)
+nach der Veröffentlichung liegt – News nach Börsenschluss oder am Wochenende
+wirken erst am nächsten Handelstag. Zeitstempel wie von Alpha Vantage
+geliefert (US-Ostküstenzeit).
+
+Spalten die add_news_sentiment() hinzufügt:
+    news_count       : Anzahl Artikel zum Ticker (0 = keine News)
+    news_relevance   : Summe der Relevanz (Alpha Vantage relevance_score)
+    finbert_score    : relevanzgewichtetes Mittel von positive − negative (−1 … +1)
+    finbert_positive : relevanzgewichtetes Mittel der positive-Wahrscheinlichkeit
+    finbert_negative : relevanzgewichtetes Mittel der negative-Wahrscheinlichkeit
+    av_sentiment     : relevanzgewichtetes Mittel des Alpha-Vantage-Scores
+    Ohne News sind die Mittelwerte NaN.
+
+Ohne Relevanzangabe (z.B. aus alten CSV-Dateien übernommen) zählt jeder
+Artikel mit Gewicht 1.
+
+FinBERT bewertet nur Texte, die noch nicht im Score-Cache liegen (siehe
+finbert.py) – für bereits bewertete Zeiträume wird das Modell nicht geladen.
+
+Feature Store:
+    Nicht Teil der Standard-FEATURE_PIPELINE (die Schritte dort rechnen nur
+    aus OHLCV; dieser braucht News Store und ggf. das FinBERT-Modell).
+    SENTIMENT_STEP deklariert "context": ["ticker"] – get_features(ticker)
+    übergibt den Ticker (siehe feature_graph.py). Der Schritt wird nicht
+    inkrementell fortgeschrieben: ein veralteter Cache wird voll neu
+    berechnet, so landen auch nachträglich geladene News in älteren Zeilen.
+    Dank Score-Cache bewertet FinBERT dabei nur neue Artikel.
+
+Verwendung:
+    from src.sentiment.features import SENTIMENT_STEP, add_news_sentiment, daily_sentiment
+
+    daily = daily_sentiment("AAPL", start="2025-01-01")
+    df    = add_news_sentiment(df, "AAPL")
+
+    from src.data import feature_store
+    feature_store.FEATURE_PIPELINE.append(SENTIMENT_STEP)
+    df = feature_store.get_features("AAPL")        # mit SENTIMENT_COLUMNS
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data import news_store, trading_calendar
+from src.sentiment import finbert
+from src.ta.indikatoren.spalten import emit_columns
+
+SESSION_CLOSE = pd.Timedelta(hours=16)
+
+SENTIMENT_COLUMNS = [
+    "news_count", "news_relevance", "finbert_score",
+    "finbert_positive", "finbert_negative", "av_sentiment",
+]
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame(columns=SENTIMENT_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+def _session_of(times: pd.Series) -> pd.DatetimeIndex:
+    """Erster Handelstag, dessen Schluss (16:00) nicht vor der Veröffentlichung liegt."""
+    sessions = trading_calendar.sessions(
+        times.min().normalize(), times.max().normalize() + pd.Timedelta(days=10),
+    )
+    closes = (sessions + SESSION_CLOSE).to_numpy()
+    return sessions[np.searchsorted(closes, times.to_numpy(), side="left")]
+
+
+def _weighted_mean(df: pd.DataFrame, col: str, weight: pd.Series) -> pd.Series:
+    valid = df[col].notna()
+    w = weight.where(valid, 0.0)
+    total = (df[col].fillna(0.0) * w).groupby(df["Date"]).sum()
+    return total / w.groupby(df["Date"]).sum().replace(0.0, np.nan)
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def daily_sentiment(ticker: str, start=None, end=None, model: dict | None = None) -> pd.DataFrame:
+    """
+    Tägliche Sentiment-Aggregate eines Tickers.
+
+    Parameter:
+        ticker : z.B. "AAPL"
+        start  : erster Tag der Artikel (inklusive)
+        end    : letzter Tag der Artikel (inklusive)
+        model  : finbert.load_model()-Ergebnis (Standard: erst bei Bedarf geladen)
+
+    Rückgabe:
+        DataFrame mit Datums-Index (nur Handelstage mit News) und SENTIMENT_COLUMNS
+    """
+    news = news_store.read_sentiment([ticker], start, end, with_articles=True)
+    if news.empty:
+        return _empty()
+
+    scores = finbert.score_articles(news, model)
+    news = news.assign(
+        Date=_session_of(news["time_published"]),
+        finbert_score=scores["score"].to_numpy(),
+        finbert_positive=scores["positive"].to_numpy(),
+        finbert_negative=scores["negative"].to_numpy(),
+        av_sentiment=news["sentiment_score"],
+    )
+    weight = news["relevance_score"].fillna(1.0)
+
+    daily = pd.DataFrame({
+        "news_count":     news.groupby("Date").size(),
+        "news_relevance": weight.groupby(news["Date"]).sum(),
+    })
+    for col in SENTIMENT_COLUMNS[2:]:
+        daily[col] = _weighted_mean(news, col, weight)
+    daily.index.name = "Date"
+    return daily[SENTIMENT_COLUMNS]
+
+
+def add_news_sentiment(
+    df: pd.DataFrame,
+    ticker: str,
+    model: dict | None = None,
+    out: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Sentiment-Features je Kurszeile (Spalten siehe Modul-Docstring).
+
+    Parameter:
+        df     : DataFrame mit Datums-Index (Handelstage)
+        ticker : Ticker der Kursreihe
+        model  : finbert.load_model()-Ergebnis (Standard: erst bei Bedarf geladen)
+        out    : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
+
+    Rückgabe:
+        DataFrame mit zusätzlichen Spalten SENTIMENT_COLUMNS
+    """
+    index = pd.DatetimeIndex(df.index)
+    if len(index):
+        # Start einige Tage früher: Wochenend-News zählen zum ersten Handelstag
+        daily = daily_sentiment(ticker, index.min() - pd.Timedelta(days=7), index.max(), model)
+    else:
+        daily = _empty()
+    daily = daily.reindex(index.normalize())
+
+    cols = {col: daily[col].to_numpy(dtype=float) for col in SENTIMENT_COLUMNS}
+    cols["news_count"] = np.nan_to_num(cols["news_count"]).astype(np.int64)
+    cols["news_relevance"] = np.nan_to_num(cols["news_relevance"])
+    return emit_columns(df, cols, out)
+
+
+# Pipeline-Schritt für den Feature Store (siehe Modul-Docstring)
+SENTIMENT_STEP = {
+    "fn":      add_news_sentiment,
+    "reads":   [],
+    "writes":  SENTIMENT_COLUMNS,
+    "context": ["ticker"],
+}
@@ -0,0 +1,335 @@
+"""
+FinBERT – Sentiment-Scoring von Finanznachrichten auf der CPU
+─────────────────────────────────────────────────────────────
+Bewertet Texte (Titel + Zusammenfassung eines Artikels) mit FinBERT
+(ProsusAI/finbert): Wahrscheinlichkeiten für positive / negative / neutral,
+dazu score = positive − negative (−1 … +1).
+
+Durchsatz auf der CPU:
+    - Dynamische Batches: alle Texte werden einmal tokenisiert, nach Länge
+      sortiert und zu Batches mit höchstens MAX_BATCH Texten und TOKEN_BUDGET
+      Tokens (Batchgröße × Länge des längsten Texts) gruppiert. Jeder Batch
+      wird nur bis zu seinem längsten Text aufgefüllt – kurze Schlagzeilen
+      rechnen nicht mit 512 Positionen.
+    - int8: das PyTorch-Modell wird standardmäßig dynamisch quantisiert
+      (Linear-Schichten → qint8), ein ONNX-Modell kann mit quantize_onnx()
+      vorab quantisiert werden.
+    - Cache: jedes Ergebnis wird unter sha1(Text) und Modell-Schlüssel
+      gespeichert; derselbe Text wird nie zweimal bewertet, auch nicht über
+      Ticker und Läufe hinweg.
+
+Backends (optionale Abhängigkeiten):
+    "torch" : transformers + torch                 (pip install transformers torch)
+    "onnx"  : onnxruntime + transformers-Tokenizer (pip install onnxruntime transformers)
+              Modelldatei über FINBERT_ONNX, z.B. mit optimum exportiert:
+              optimum-cli export onnx --model ProsusAI/finbert finbert-onnx/
+    Standard: "onnx", wenn FINBERT_ONNX gesetzt und onnxruntime installiert ist,
+    sonst "torch".
+
+Speicher (data/sentiment/scores/):
+    part-….parquet   ← text_hash, model, positive, negative, neutral
+    Append-only, atomar (.tmp + os.replace), ab MAX_PARTS Dateien kompaktiert.
+
+Verwendung:
+    from src.sentiment import finbert
+
+    scores = finbert.score_texts(["Apple beats estimates", "Tesla recalls 2M cars"])
+    scores = finbert.score_articles(news_store.read_articles("2025-01-01"))
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+try:
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+except ImportError:           # optionale Abhängigkeit
+    AutoConfig = AutoModelForSequenceClassification = AutoTokenizer = None
+
+try:
+    import torch
+except ImportError:           # optionale Abhängigkeit
+    torch = None
+
+try:
+    import onnxruntime as ort
+except ImportError:           # optionale Abhängigkeit
+    ort = None
+
+SCORES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "sentiment", "scores")
+
+MODEL_NAME   = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
+ONNX_PATH    = os.getenv("FINBERT_ONNX")      # Pfad zu model.onnx (optional)
+MAX_LENGTH   = 256       # Tokens je Text (Titel + Zusammenfassung; FinBERT max. 512)
+MAX_BATCH    = 64        # Texte je Batch
+TOKEN_BUDGET = 8192      # Batchgröße × aufgefüllte Länge
+MAX_PARTS    = 64        # ab so vielen Cache-Dateien wird kompaktiert
+
+CLASSES = ["positive", "negative", "neutral"]
+
+SCORE_SCHEMA = pa.schema([
+    ("text_hash", pa.string()),
+    ("model",     pa.string()),
+    ("positive",  pa.float32()),
+    ("negative",  pa.float32()),
+    ("neutral",   pa.float32()),
+])
+
+_models: dict[tuple, dict] = {}
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _parts() -> list[str]:
+    if not os.path.isdir(SCORES_DIR):
+        return []
+    return [
+        os.path.join(SCORES_DIR, name) for name in sorted(os.listdir(SCORES_DIR))
+        if name.endswith(".parquet") and not name.startswith(".")
+    ]
+
+
+def _write_part(df: pd.DataFrame) -> str:
+    os.makedirs(SCORES_DIR, exist_ok=True)
+    name = f"part-{time.time_ns()}.parquet"
+    path = os.path.join(SCORES_DIR, name)
+    tmp = os.path.join(SCORES_DIR, f".{name}.tmp")
+    pq.write_table(pa.Table.from_pandas(df[SCORE_SCHEMA.names], schema=SCORE_SCHEMA, preserve_index=False), tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _load_scores(hashes: list[str], model_key: str) -> pd.DataFrame:
+    """Gespeicherte Scores für die Hashes (Index: text_hash)."""
+    parts = _parts()
+    if not parts or not hashes:
+        return SCORE_SCHEMA.empty_table().to_pandas().set_index("text_hash")
+    expr = (ds.field("model") == model_key) & ds.field("text_hash").isin(hashes)
+    df = ds.dataset(parts, schema=SCORE_SCHEMA, format="parquet").to_table(filter=expr).to_pandas()
+    return df.drop_duplicates("text_hash", keep="last").set_index("text_hash")
+
+
+def _store_scores(df: pd.DataFrame) -> None:
+    _write_part(df)
+    if len(_parts()) > MAX_PARTS:
+        compact()
+
+
+def _batches(lengths: np.ndarray, max_batch: int, token_budget: int) -> list[np.ndarray]:
+    """
+    Indizes nach Länge sortiert, gruppiert zu Batches mit höchstens max_batch
+    Texten und höchstens token_budget Tokens (Anzahl × längster Text).
+    """
+    order = np.argsort(lengths, kind="stable")
+    batches, start = [], 0
+    for i in range(1, len(order) + 1):
+        if i == len(order) or i - start >= max_batch or (i - start + 1) * lengths[order[i]] > token_budget:
+            batches.append(order[start:i])
+            start = i
+    return batches
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    z = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return z / z.sum(axis=1, keepdims=True)
+
+
+def _infer(model: dict, batch: dict) -> np.ndarray:
+    """Logits eines aufgefüllten Batches (input_ids, attention_mask …) → Wahrscheinlichkeiten."""
+    if model["backend"] == "onnx":
+        session = model["session"]
+        feed = {i.name: batch[i.name].astype(np.int64) for i in session.get_inputs() if i.name in batch}
+        logits = session.run(None, feed)[0]
+    else:
+        with torch.inference_mode():
+            logits = model["model"](**{k: torch.from_numpy(v) for k, v in batch.items()}).logits.numpy()
+    return _softmax(logits.astype(np.float64))[:, model["columns"]]
+
+
+def _predict(model: dict, texts: list[str], max_batch: int, token_budget: int) -> np.ndarray:
+    """Wahrscheinlichkeiten (n × 3, Reihenfolge CLASSES) in dynamischen Batches."""
+    tokenizer = model["tokenizer"]
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    lengths = np.array([len(ids) for ids in encoded["input_ids"]])
+
+    probs = np.empty((len(texts), len(CLASSES)))
+    for idx in _batches(lengths, max_batch, token_budget):
+        batch = tokenizer.pad(
+            {k: [encoded[k][i] for i in idx] for k in encoded.keys()}, return_tensors="np",
+        )
+        probs[idx] = _infer(model, {k: np.asarray(v) for k, v in batch.items()})
+    return probs
+
+
+def _default_backend() -> str:
+    return "onnx" if ONNX_PATH and ort is not None else "torch"
+
+
+def _model_key(backend: str, quantize: bool = True) -> str:
+    """
+    Cache-Schlüssel einer Modell-Variante – int8 und fp32 rechnen nicht identisch.
+    ONNX: absoluter Pfad, Größe und mtime der Datei – ein neu exportiertes oder
+    quantisiertes Modell unter demselben Namen bekommt einen eigenen Schlüssel.
+    """
+    if backend == "onnx":
+        path = os.path.abspath(ONNX_PATH or "")
+        try:
+            st = os.stat(path)
+        except OSError:
+            return f"{MODEL_NAME}|onnx|{path}"
+        return f"{MODEL_NAME}|onnx|{path}|{st.st_size}|{st.st_mtime_ns}"
+    return f"{MODEL_NAME}|torch|{'int8' if quantize else 'fp32'}"
+
+
+def _label_columns(id2label: dict) -> list[int]:
+    """Modell-Ausgabe → Spaltenreihenfolge CLASSES (Labels je Modell unterschiedlich sortiert)."""
+    by_label = {str(label).lower(): int(i) for i, label in id2label.items()}
+    return [by_label[c] for c in CLASSES]
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def text_hash(text: str) -> str:
+    """Cache-Schlüssel eines Texts."""
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def load_model(backend: str | None = None, quantize: bool = True) -> dict:
+    """
+    Lädt Tokenizer und Modell (je Prozess und Variante einmal).
+
+    Parameter:
+        backend  : "torch" | "onnx" | None (automatisch, siehe Modul-Docstring)
+        quantize : torch: dynamische int8-Quantisierung der Linear-Schichten
+
+    Rückgabe:
+        dict mit backend, key (Cache-Schlüssel), tokenizer, model/session, columns
+
+    Raises:
+        ImportError wenn die Abhängigkeiten des Backends fehlen
+        ValueError  bei unbekanntem Backend oder fehlendem FINBERT_ONNX
+    """
+    backend = backend or _default_backend()
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unbekanntes Backend {backend!r} – erlaubt: torch, onnx")
+    variant = (backend, quantize if backend == "torch" else ONNX_PATH)
+    if variant in _models:
+        return _models[variant]
+
+    if AutoTokenizer is None:
+        raise ImportError("FinBERT benötigt transformers: pip install transformers")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = {"backend": backend, "tokenizer": tokenizer}
+
+    if backend == "onnx":
+        if ort is None:
+            raise ImportError("Backend 'onnx' benötigt onnxruntime: pip install onnxruntime")
+        if not ONNX_PATH:
+            raise ValueError("Backend 'onnx' benötigt den Pfad zum Modell in FINBERT_ONNX")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        model["session"] = ort.InferenceSession(ONNX_PATH, options, providers=["CPUExecutionProvider"])
+        model["columns"] = _label_columns(AutoConfig.from_pretrained(MODEL_NAME).id2label)
+    else:
+        if torch is None:
+            raise ImportError("Backend 'torch' benötigt torch: pip install torch")
+        net = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME).eval()
+        if quantize:
+            net = torch.quantization.quantize_dynamic(net, {torch.nn.Linear}, dtype=torch.qint8)
+        model["model"] = net
+        model["columns"] = _label_columns(net.config.id2label)
+
+    model["key"] = _model_key(backend, quantize)
+    _models[variant] = model
+    return model
+
+
+def quantize_onnx(source: str, target: str) -> str:
+    """
+    Quantisiert ein exportiertes ONNX-Modell dynamisch auf int8 (Gewichte).
+    Danach FINBERT_ONNX=target setzen.
+
+    Raises:
+        ImportError wenn onnxruntime fehlt
+    """
+    if ort is None:
+        raise ImportError("quantize_onnx benötigt onnxruntime: pip install onnxruntime")
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    return target
+
+
+def score_texts(
+    texts: list[str],
+    model: dict | None = None,
+    max_batch: int = MAX_BATCH,
+    token_budget: int = TOKEN_BUDGET,
+) -> pd.DataFrame:
+    """
+    Sentiment je Text – aus dem Cache oder frisch bewertet.
+
+    Parameter:
+        texts        : Texte (Duplikate werden nur einmal bewertet)
+        model        : Ergebnis von load_model() (Standard: erst bei Bedarf geladen)
+        max_batch    : Texte je Batch
+        token_budget : Tokens je Batch (Anzahl × aufgefüllte Länge)
+
+    Rückgabe:
+        DataFrame (Zeilen wie texts) mit positive, negative, neutral, score
+    """
+    hashes = [text_hash(t) for t in texts]
+    unique = dict(zip(hashes, texts))
+    # Schlüssel der Standard-Variante ohne Laden: Treffer brauchen kein Modell
+    key = model["key"] if model is not None else _model_key(_default_backend())
+
+    cached = _load_scores(list(unique), key)
+    todo = [h for h in unique if h not in cached.index]
+    if todo:
+        model = model or load_model()
+        probs = _predict(model, [unique[h] for h in todo], max_batch, token_budget).astype(np.float32)
+        fresh = pd.DataFrame(probs, columns=CLASSES)
+        fresh.insert(0, "model", model["key"])
+        fresh.insert(0, "text_hash", todo)
+        _store_scores(fresh)
+        cached = pd.concat([cached, fresh.set_index("text_hash")])
+
+    result = cached.reindex(hashes)[CLASSES].astype(np.float64).reset_index(drop=True)
+    result["score"] = result["positive"] - result["negative"]
+    return result
+
+
+def article_text(title, summary) -> str:
+    """Eingabetext eines Artikels: Titel und Zusammenfassung."""
+    return " ".join(str(part) for part in (title, summary) if isinstance(part, str) and part)
+
+
+def score_articles(articles: pd.DataFrame, model: dict | None = None) -> pd.DataFrame:
+    """
+    Sentiment je Artikel (Spalten article_id, title, summary wie im News Store).
+
+    Rückgabe:
+        DataFrame mit article_id, positive, negative, neutral, score
+    """
+    texts = [article_text(t, s) for t, s in zip(articles["title"], articles["summary"])]
+    scores = score_texts(texts, model)
+    scores.insert(0, "article_id", articles["article_id"].to_numpy())
+    return scores
+
+
+def compact() -> None:
+    """Fasst alle Cache-Dateien zu einer zusammen. Neue Datei zuerst, dann alte entfernen."""
+    parts = _parts()
+    if len(parts) <= 1:
+        return
+    df = ds.dataset(parts, schema=SCORE_SCHEMA, format="parquet").to_table().to_pandas()
+    new = _write_part(df.drop_duplicates(["text_hash", "model"], keep="last"))
+    for path in parts:
+        if path != new:
+            os.remove(path)
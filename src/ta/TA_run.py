@@ -31,6 +31,12 @@ Verwendung (direkt — ohne Cache):
     df = fetch_prices("AAPL")                      # rohe OHLCV-Daten
     result = run(df, ticker="AAPL", name="Apple Inc.")  # berechnet Indikatoren intern
     print_signal(result)
+
+Historischer Score (alle Handelstage, z.B. für Backtesting):
+    from src.ta.TA_run import score_history
+
+    hist = score_history(get_features("AAPL"))
+    hist["score"], hist["signal"], hist["signals"]     # Series/DataFrame je Datum
 """
 
 import pandas as pd
@@ -40,6 +46,7 @@ from .indikatoren.adx import add_adx, add_parabolic_sar
 from .indikatoren.durchschnitte import add_moving_averages, add_bollinger_bands, add_donchian
 from .indikatoren.oszillatoren import add_rsi, add_macd, add_stochastik
 from .indikatoren.volumen import add_obv, add_volume_context
+from .indikatoren.spalten import assemble_columns
 
 
 # ── Konfiguration ─────────────────────────────────────────────────────────────
@@ -82,28 +89,52 @@ SCORE_THRESHOLDS: dict[str, float] = {
 
 
 # ── Indikator-Pipeline ────────────────────────────────────────────────────────
+# Jeder Schritt deklariert die gelesenen und geschriebenen Spalten. Der Feature
+# Store baut daraus einen Abhängigkeitsgraph (src/data/feature_graph.py) und
+# rechnet unabhängige Schritte parallel. Alle Indikatoren lesen nur OHLCV.
+
+INDICATOR_STEPS: list[dict] = [
+    {"fn": add_adx,             "reads": ["High", "Low", "Close"],
+     "writes": ["di_plus", "di_minus", "adx", "regime"]},
+    {"fn": add_parabolic_sar,   "reads": ["High", "Low"],
+     "writes": ["psar", "psar_bull"]},
+    {"fn": add_moving_averages, "reads": ["Close"],
+     "writes": ["ema_9", "ema_21", "ema_50", "ema_200", "price_vs_ema50", "price_vs_ema200", "ma_alignment"]},
+    {"fn": add_bollinger_bands, "reads": ["Close"],
+     "writes": ["bb_mid", "bb_upper", "bb_lower", "bb_width", "bb_pct", "bb_squeeze"]},
+    {"fn": add_donchian,        "reads": ["High", "Low", "Close"],
+     "writes": ["donchian_high", "donchian_low", "donchian_breakout"]},
+    {"fn": add_rsi,             "reads": ["Close"],
+     "writes": ["rsi", "rsi_zone", "rsi_above50"]},
+    {"fn": add_macd,            "reads": ["Close"],
+     "writes": ["macd", "macd_signal", "macd_hist", "macd_hist_dir"]},
+    {"fn": add_stochastik,      "reads": ["High", "Low", "Close"],
+     "writes": ["stoch_k", "stoch_d", "stoch_zone"]},
+    {"fn": add_obv,             "reads": ["Close", "Volume"],
+     "writes": ["obv", "obv_ema", "obv_trend"]},
+    {"fn": add_volume_context,  "reads": ["Close", "Volume"],
+     "writes": ["vol_sma20", "vol_ratio", "vol_above_avg", "vol_price_signal"]},
+]
+
 
 def add_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Wendet alle TA-Indikatoren in der korrekten Reihenfolge an.
+    Wendet alle TA-Indikatoren aus INDICATOR_STEPS an.
 
     Parameter:
         df : OHLCV DataFrame mit Spalten Open, High, Low, Close, Volume
 
     Rückgabe:
         DataFrame mit allen Indikator-Spalten (siehe claude.md für Übersicht)
+
+    Alle Funktionen laufen im Builder-Modus: Sie schreiben in einen gemeinsamen
+    Spalten-Puffer, der DataFrame wird nur einmal am Ende zusammengesetzt.
+    Sequentiell – die parallele Ausführung übernimmt der Feature Store.
     """
-    df = add_adx(df)
-    df = add_parabolic_sar(df)
-    df = add_moving_averages(df)
-    df = add_bollinger_bands(df)
-    df = add_donchian(df)
-    df = add_rsi(df)
-    df = add_macd(df)
-    df = add_stochastik(df)
-    df = add_obv(df)
-    df = add_volume_context(df)
-    return df
+    cols: dict = {}
+    for step in INDICATOR_STEPS:
+        step["fn"](df, out=cols, **step.get("params", {}))
+    return assemble_columns(df, cols)
 
 
 # ── Scoring ───────────────────────────────────────────────────────────────────
@@ -120,6 +151,9 @@ def _evaluate_signals(row: pd.Series, regime: str) -> dict[str, bool | None]:
     """
     Wertet alle Signale für den letzten Handelstag aus.
 
+    Alle Werte sind Python-bool: _compute_score() prüft `fired is True`,
+    ein numpy.bool_ würde dort nie gezählt.
+
     Rückgabe:
         Dict {signal_name: True | False | None}
         True  = Signal feuert   → +weight
@@ -138,7 +172,7 @@ def _evaluate_signals(row: pd.Series, regime: str) -> dict[str, bool | None]:
 
     di_plus  = _val(row, "di_plus",  0.0)
     di_minus = _val(row, "di_minus", 0.0)
-    s["dmi_bullish"] = di_plus > di_minus
+    s["dmi_bullish"] = bool(di_plus > di_minus)
 
     # PSAR und Donchian: nur in trending zuverlässig; in ranging n/a
     if regime in ("trending", "weak_trend"):
@@ -159,9 +193,9 @@ def _evaluate_signals(row: pd.Series, regime: str) -> dict[str, bool | None]:
         s["rsi_oversold"] = None
 
     s["stoch_oversold"]   = _val(row, "stoch_zone") == "oversold"
-    s["macd_cross"]       = _val(row, "macd", 0.0) > _val(row, "macd_signal", 0.0)
+    s["macd_cross"]       = bool(_val(row, "macd", 0.0) > _val(row, "macd_signal", 0.0))
     s["macd_hist_rising"] = _val(row, "macd_hist_dir") == "rising"
-    s["macd_above_zero"]  = _val(row, "macd", 0.0) > 0
+    s["macd_above_zero"]  = bool(_val(row, "macd", 0.0) > 0)
 
     # ── Gruppe 4: Volumen ─────────────────────────────────────────────────────
     s["obv_rising"]     = _val(row, "obv_trend") == "rising"
@@ -171,7 +205,7 @@ def _evaluate_signals(row: pd.Series, regime: str) -> dict[str, bool | None]:
     # ── Gruppe 5: Bollinger Bänder ────────────────────────────────────────────
     s["bb_squeeze"] = bool(_val(row, "bb_squeeze", False))
     bb_pct = _val(row, "bb_pct", None)
-    s["bb_pct_low"] = bb_pct is not None and bb_pct < 0.2
+    s["bb_pct_low"] = bb_pct is not None and bool(bb_pct < 0.2)
 
     return s
 
@@ -215,6 +249,139 @@ def _classify(score: float, weights: dict[str, float]) -> tuple[str, str]:
         return "NEUTRAL", "–"
 
 
+# ── Historisches Scoring (vektorisiert) ───────────────────────────────────────
+
+def _col(df: pd.DataFrame, col: str, default) -> pd.Series:
+    """Spalte mit `default` anstelle von NaN; fehlende Spalte → konstant `default`."""
+    if col not in df.columns:
+        return pd.Series(default, index=df.index)
+    return df[col].where(df[col].notna(), default)
+
+
+def _label_is(df: pd.DataFrame, col: str, label: str) -> pd.Series:
+    """Label-Vergleich wie _val(row, col) == label; NaN/fehlend → False."""
+    if col not in df.columns:
+        return pd.Series(False, index=df.index)
+    return (df[col] == label).fillna(False).astype(bool)
+
+
+def _evaluate_signal_matrix(df: pd.DataFrame, regime: pd.Series) -> pd.DataFrame:
+    """
+    Vektorisierte Variante von _evaluate_signals() für alle Zeilen zugleich.
+
+    Rückgabe:
+        DataFrame (Zeilen × Signale) mit Dtype "boolean":
+        True / False wie _evaluate_signals, <NA> = im Regime nicht auswertbar.
+        Muss mit _evaluate_signals() inhaltlich synchron bleiben.
+    """
+    s: dict[str, pd.Series] = {}
+
+    # ── Gruppe 1: Trend-Kontext ───────────────────────────────────────────────
+    s["ma_alignment"]    = _label_is(df, "ma_alignment", "bullish")
+    s["price_vs_ema200"] = _label_is(df, "price_vs_ema200", "above")
+    s["price_vs_ema50"]  = _label_is(df, "price_vs_ema50", "above")
+
+    # ── Gruppe 2: Regime & Trendstärke ───────────────────────────────────────
+    s["regime_trending"] = regime == "trending"
+    s["dmi_bullish"]     = _col(df, "di_plus", 0.0) > _col(df, "di_minus", 0.0)
+
+    # PSAR und Donchian: nur in trending zuverlässig; in ranging n/a
+    trend_like = regime.isin(["trending", "weak_trend"])
+    s["psar_bullish"]      = _col(df, "psar_bull", False).astype(bool).where(trend_like)
+    s["donchian_breakout"] = _label_is(df, "donchian_breakout", "up").where(trend_like)
+
+    # ── Gruppe 3: Momentum ────────────────────────────────────────────────────
+    s["rsi_above50"]  = _col(df, "rsi_above50", False).astype(bool)
+    s["rsi_oversold"] = _label_is(df, "rsi_zone", "oversold").where(regime == "ranging")
+
+    macd = _col(df, "macd", 0.0)
+    s["stoch_oversold"]   = _label_is(df, "stoch_zone", "oversold")
+    s["macd_cross"]       = macd > _col(df, "macd_signal", 0.0)
+    s["macd_hist_rising"] = _label_is(df, "macd_hist_dir", "rising")
+    s["macd_above_zero"]  = macd > 0
+
+    # ── Gruppe 4: Volumen ─────────────────────────────────────────────────────
+    s["obv_rising"]      = _label_is(df, "obv_trend", "rising")
+    s["vol_strong_bull"] = _label_is(df, "vol_price_signal", "bullish_strong")
+    s["vol_above_avg"]   = _col(df, "vol_above_avg", False).astype(bool)
+
+    # ── Gruppe 5: Bollinger Bänder ────────────────────────────────────────────
+    s["bb_squeeze"] = _col(df, "bb_squeeze", False).astype(bool)
+    s["bb_pct_low"] = _col(df, "bb_pct", np.inf) < 0.2
+
+    signals = pd.DataFrame(s, index=df.index).astype("boolean")
+
+    # Exhaustion: keine neuen Positionen → alle Signale n/a
+    return signals.mask(regime == "exhaustion")
+
+
+def _classify_series(score: pd.Series, weights: dict[str, float]) -> tuple[pd.Series, pd.Series]:
+    """Vektorisierte Variante von _classify(): (signal, staerke) je Zeile."""
+    score_max = sum(weights.values())
+    if score_max == 0:
+        return (
+            pd.Series("NEUTRAL", index=score.index),
+            pd.Series("–", index=score.index),
+        )
+
+    pct = score / score_max
+    conditions = [
+        pct >= SCORE_THRESHOLDS["STARK"],
+        pct >= SCORE_THRESHOLDS["MITTEL"],
+        pct >= SCORE_THRESHOLDS["WATCH"],
+    ]
+    signal  = np.select(conditions, ["BUY", "BUY", "WATCH"], default="NEUTRAL")
+    staerke = np.select(conditions, ["STARK", "MITTEL", "SCHWACH"], default="–")
+    return pd.Series(signal, index=score.index), pd.Series(staerke, index=score.index)
+
+
+def score_history(
+    df: pd.DataFrame,
+    weights: dict[str, float] | None = None,
+) -> dict:
+    """
+    Berechnet den TA-Score für JEDEN Handelstag statt nur für den letzten.
+
+    Gleiche Logik wie run() (regime-abhängige n/a-Signale, Exhaustion-Override),
+    aber alle Signale als Bool-Spalten über die gesamte Historie – Grundlage
+    für Backtesting und Weight-Tuning.
+
+    Parameter:
+        df      : DataFrame mit Indikatoren (oder OHLCV → werden berechnet)
+        weights : Eigene Weights (Standard: Modul-WEIGHTS)
+
+    Rückgabe:
+        dict mit:
+            signals   : DataFrame (Datum × Signal), Dtype "boolean", <NA> = n/a
+            score     : Series  – Summe der Weights gefeuerter Signale
+            score_max : float   – sum(weights)
+            signal    : Series  – 'BUY' | 'WATCH' | 'NEUTRAL'
+            staerke   : Series  – 'STARK' | 'MITTEL' | 'SCHWACH' | '–'
+            regime    : Series
+    """
+    w = weights if weights is not None else WEIGHTS
+
+    if "rsi" not in df.columns:
+        df = add_all_indicators(df)
+
+    regime  = _col(df, "regime", "ranging").astype(str)
+    signals = _evaluate_signal_matrix(df, regime)
+
+    # Score = Matrix × Weight-Vektor; n/a-Signale zählen wie "nicht gefeuert"
+    fired = signals.fillna(False).to_numpy(dtype=float)
+    score = pd.Series(fired @ np.array([w[k] for k in signals.columns]), index=df.index)
+
+    signal, staerke = _classify_series(score, w)
+    return {
+        "signals":   signals,
+        "score":     score.round(1),
+        "score_max": sum(w.values()),
+        "signal":    signal,
+        "staerke":   staerke,
+        "regime":    regime,
+    }
+
+
 # ── Hauptfunktion ─────────────────────────────────────────────────────────────
 
 def run(
@@ -327,7 +494,7 @@ def print_signal(result: dict, show_details: bool = True) -> None:
     Gibt das TA-Signal in lesbarem Format auf der Konsole aus.
 
     Parameter:
-        result       : Rückgabe von run()
+        result       : Rückgabe von run(), optional mit ml_prob/ml_datum (src/ml/inference.py)
         show_details : True = alle Signale mit Status anzeigen
     """
     sep = "─" * 56
@@ -347,6 +514,9 @@ def print_signal(result: dict, show_details: bool = True) -> None:
     print(f"  Signal:   {result['signal']}")
     print(f"  Stärke:   {result['staerke']}")
     print(f"  Score:    {score:.0f} / {score_max:.0f}  ({pct}%)")
+    if result.get("ml_prob") is not None:
+        stand = f"  (Stand {result['ml_datum']})" if result.get("ml_datum") != result["datum"] else ""
+        print(f"  ML:       {result['ml_prob'] * 100:.0f}% Kursanstieg{stand}")
     print(sep)
 
     if show_details:
@@ -17,108 +17,123 @@ Spalten die add_parabolic_sar() hinzufügt:
 import numpy as np
 import pandas as pd
 
+from .spalten import emit_columns
+
+# Rekursive Schleifen (Wilder-Glättung, SAR) liegen in kernels.py –
+# dort wird je nach installierten Paketen numba oder reines Python gewählt.
+from .kernels import (
+    psar_loop as _psar_loop,
+    wilder_smooth as _wilder_smooth,
+    wilder_smooth_avg as _wilder_smooth_avg,
+)
+
 
 # ── Interne Hilfsfunktionen ──────────────────────────────────────────────────
 
-def _wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+def _directional_movement(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Wilders kumulierte Glättung – für TR und DM.
-    Erster Wert = Summe der ersten `period` Werte.
-    Folgewerte:  S[i] = S[i-1] - S[i-1]/period + values[i]
-
-    Hinweis: Die Division in di_plus/di_minus (smooth_dm / smooth_tr)
-    hebt die fehlende Normalisierung auf – das Ergebnis ist identisch
-    mit dem auf Durchschnitten basierenden Ansatz.
+    True Range und Directional Movement ab dem zweiten Wert.
+    Index 0 dient nur als Vortag → Rückgabe hat Länge len(high) - 1.
     """
-    result = np.full(len(values), np.nan)
-    result[period - 1] = np.nansum(values[:period])
-    for i in range(period, len(values)):
-        result[i] = result[i - 1] - result[i - 1] / period + values[i]
-    return result
+    h, l, prev_close = high[1:], low[1:], close[:-1]
+
+    # True Range: Maximum aus drei Spannweiten
+    tr = np.maximum.reduce([
+        h - l,
+        np.abs(h - prev_close),
+        np.abs(l - prev_close),
+    ])
+
+    # Directional Movement
+    up   = h - high[:-1]
+    down = low[:-1] - l
+
+    dm_plus  = np.where((up > down)  & (up   > 0), up,   0.0)
+    dm_minus = np.where((down > up)  & (down > 0), down, 0.0)
+    return tr, dm_plus, dm_minus
 
 
-def _wilder_smooth_avg(values: np.ndarray, period: int) -> np.ndarray:
+def _di_dx(
+    smooth_tr: np.ndarray,
+    smooth_plus: np.ndarray,
+    smooth_minus: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Directional Indicators und DX aus den geglätteten Summen."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        di_plus  = np.where(smooth_tr > 0, 100 * smooth_plus  / smooth_tr, np.nan)
+        di_minus = np.where(smooth_tr > 0, 100 * smooth_minus / smooth_tr, np.nan)
+        dx_sum = di_plus + di_minus
+        dx = np.where(dx_sum > 0, 100 * np.abs(di_plus - di_minus) / dx_sum, np.nan)
+    return di_plus, di_minus, dx
+
+
+# ── ADX / DMI ────────────────────────────────────────────────────────────────
+
+def _adx_arrays(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int,
+) -> dict[str, np.ndarray]:
     """
-    Wilders Durchschnitts-Glättung – für DX → ADX.
-    Erster Wert = Durchschnitt der ersten `period` gültigen Werte.
-    Folgewerte:  S[i] = (S[i-1] × (period-1) + values[i]) / period
+    Ungerundete ADX-Zwischenergebnisse ab Index 1 (Index 0 hat keinen Vortag).
+
+    Rückgabe:
+        Dict mit smooth_tr, smooth_plus, smooth_minus, di_plus, di_minus, adx
     """
-    result = np.full(len(values), np.nan)
-    valid = np.where(~np.isnan(values))[0]
-    if len(valid) < period:
-        return result
-    start = valid[0]
-    result[start + period - 1] = np.nanmean(values[start : start + period])
-    for i in range(start + period, len(values)):
-        if not np.isnan(values[i]):
-            result[i] = (result[i - 1] * (period - 1) + values[i]) / period
-    return result
+    tr, dm_plus, dm_minus = _directional_movement(high, low, close)
 
+    smooth_tr    = _wilder_smooth(tr,       period)
+    smooth_plus  = _wilder_smooth(dm_plus,  period)
+    smooth_minus = _wilder_smooth(dm_minus, period)
+
+    di_plus, di_minus, dx = _di_dx(smooth_tr, smooth_plus, smooth_minus)
+
+    return {
+        "smooth_tr":    smooth_tr,
+        "smooth_plus":  smooth_plus,
+        "smooth_minus": smooth_minus,
+        "di_plus":      di_plus,
+        "di_minus":     di_minus,
+        "adx":          _wilder_smooth_avg(dx, period),
+    }
 
-# ── ADX / DMI ────────────────────────────────────────────────────────────────
 
-def add_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+def add_adx(df: pd.DataFrame, period: int = 14, out: dict | None = None) -> pd.DataFrame:
     """
     Berechnet ADX, +DI, -DI und Regime-Klassifikation nach Wilders Methode.
 
     Parameter:
         df     : DataFrame mit Spalten High, Low, Close
         period : Glättungsperiode (Standard: 14 nach Wilder)
+        out    : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten: adx, di_plus, di_minus, regime
     """
-    df = df.copy()
     high  = df["High"].to_numpy(dtype=float).flatten()
     low   = df["Low"].to_numpy(dtype=float).flatten()
     close = df["Close"].to_numpy(dtype=float).flatten()
 
-    # True Range: Maximum aus drei Spannweiten
-    prev_close = np.concatenate([[np.nan], close[:-1]])
-    tr = np.maximum.reduce([
-        high - low,
-        np.abs(high - prev_close),
-        np.abs(low  - prev_close),
-    ])
-    tr[0] = np.nan
-
-    # Directional Movement
-    up   = high - np.concatenate([[0.0], high[:-1]])
-    down = np.concatenate([[0.0], low[:-1]]) - low
-    up[0] = 0.0
-    down[0] = 0.0
-
-    dm_plus  = np.where((up > down)  & (up   > 0), up,   0.0)
-    dm_minus = np.where((down > up)  & (down > 0), down, 0.0)
-
-    # Wilders Glättung (Index 0 ist NaN/0, daher ab Index 1)
-    smooth_tr    = _wilder_smooth(tr[1:],       period)
-    smooth_plus  = _wilder_smooth(dm_plus[1:],  period)
-    smooth_minus = _wilder_smooth(dm_minus[1:], period)
-
-    # Directional Indicators
-    with np.errstate(invalid="ignore", divide="ignore"):
-        di_plus  = np.where(smooth_tr > 0, 100 * smooth_plus  / smooth_tr, np.nan)
-        di_minus = np.where(smooth_tr > 0, 100 * smooth_minus / smooth_tr, np.nan)
-
-    # DX → ADX
-    with np.errstate(invalid="ignore", divide="ignore"):
-        dx_sum = di_plus + di_minus
-        dx = np.where(dx_sum > 0, 100 * np.abs(di_plus - di_minus) / dx_sum, np.nan)
-
-    adx = _wilder_smooth_avg(dx, period)
+    a = _adx_arrays(high, low, close, period)
 
     # Auf Originallänge auffüllen (Index 0 wurde übersprungen)
     pad = np.array([np.nan])
-    df["di_plus"]  = np.round(np.concatenate([pad, di_plus]),  2)
-    df["di_minus"] = np.round(np.concatenate([pad, di_minus]), 2)
-    df["adx"]      = np.round(np.concatenate([pad, adx]),      2)
-    df["regime"]   = _classify_regime(df["adx"])
+    adx = pd.Series(np.round(np.concatenate([pad, a["adx"]]), 2), index=df.index)
+    cols = {
+        "di_plus":  np.round(np.concatenate([pad, a["di_plus"]]),  2),
+        "di_minus": np.round(np.concatenate([pad, a["di_minus"]]), 2),
+        "adx":      adx,
+        "regime":   _classify_regime(adx),
+    }
+    return emit_columns(df, cols, out)
 
-    return df
 
-
-def _classify_regime(adx: pd.Series) -> pd.Series:
+def _classify_regime(adx):
     """
     Klassifiziert das Marktregime anhand ADX-Wert und -Richtung.
 
@@ -134,11 +149,11 @@ def _classify_regime(adx: pd.Series) -> pd.Series:
         adx >= 20,
     ]
     choices = ["exhaustion", "trending", "weak_trend"]
-    return pd.Series(
-        np.select(conditions, choices, default="ranging"),
-        index=adx.index,
-        dtype="object",
-    )
+    labels = np.select(conditions, choices, default="ranging")
+    if isinstance(adx, pd.DataFrame):
+        # Panel (Datum × Ticker)
+        return pd.DataFrame(labels, index=adx.index, columns=adx.columns, dtype="object")
+    return pd.Series(labels, index=adx.index, dtype="object")
 
 
 # ── Parabolic SAR ────────────────────────────────────────────────────────────
@@ -148,6 +163,7 @@ def add_parabolic_sar(
     af_start: float = 0.02,
     af_step:  float = 0.02,
     af_max:   float = 0.20,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     Parabolic SAR (Stop and Reverse) nach Wilder.
@@ -160,65 +176,22 @@ def add_parabolic_sar(
         af_start : Startwert Beschleunigungsfaktor (Standard: 0.02)
         af_step  : Erhöhung pro neuem Extrempunkt  (Standard: 0.02)
         af_max   : Maximum Beschleunigungsfaktor   (Standard: 0.20)
+        out      : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten: psar, psar_bull
     """
-    df   = df.copy()
     high = df["High"].to_numpy(dtype=float).flatten()
     low  = df["Low"].to_numpy(dtype=float).flatten()
     n    = len(df)
 
     psar = np.full(n, np.nan)
     bull = np.ones(n, dtype=bool)
-    ep   = high[0]
-    af   = af_start
     psar[0] = low[0]
 
-    for i in range(1, n):
-        if bull[i - 1]:
-            # Aufwärtstrend: SAR bewegt sich aufwärts Richtung EP
-            psar[i] = psar[i - 1] + af * (ep - psar[i - 1])
-            # SAR darf nicht über die letzten zwei Tiefs hinausragen
-            psar[i] = min(psar[i], low[i - 1])
-            if i >= 2:
-                psar[i] = min(psar[i], low[i - 2])
-
-            if low[i] <= psar[i]:
-                # Kurs durchbricht SAR → Wechsel zu Abwärtstrend
-                bull[i] = False
-                psar[i] = ep
-                ep       = low[i]
-                af       = af_start
-            else:
-                bull[i] = True
-                if high[i] > ep:
-                    ep = high[i]
-                    af = min(af + af_step, af_max)
-
-        else:
-            # Abwärtstrend: SAR bewegt sich abwärts Richtung EP
-            psar[i] = psar[i - 1] + af * (ep - psar[i - 1])
-            # SAR darf nicht unter die letzten zwei Hochs fallen
-            psar[i] = max(psar[i], high[i - 1])
-            if i >= 2:
-                psar[i] = max(psar[i], high[i - 2])
-
-            if high[i] >= psar[i]:
-                # Kurs durchbricht SAR → Wechsel zu Aufwärtstrend
-                bull[i] = True
-                psar[i] = ep
-                ep       = high[i]
-                af       = af_start
-            else:
-                bull[i] = False
-                if low[i] < ep:
-                    ep = low[i]
-                    af = min(af + af_step, af_max)
-
-    df["psar"]      = np.round(psar, 4)
-    df["psar_bull"] = bull
-    return df
+    _psar_loop(high, low, psar, bull, high[0], af_start, 1, af_start, af_step, af_max)
+
+    return emit_columns(df, {"psar": np.round(psar, 4), "psar_bull": bull}, out)
 
 
 # ── Convenience ──────────────────────────────────────────────────────────────
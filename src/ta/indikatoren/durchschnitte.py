@@ -30,6 +30,10 @@ Hinweis:
 import numpy as np
 import pandas as pd
 
+from .spalten import emit_columns
+
+EMA_PERIODS = [9, 21, 50, 200]      # Standard von add_moving_averages(); _ma_context braucht genau diese
+
 
 # ── Interne Hilfsfunktionen ──────────────────────────────────────────────────
 
@@ -41,11 +45,60 @@ def _ema(series: pd.Series, period: int) -> pd.Series:
     return series.ewm(span=period, adjust=False).mean()
 
 
+def _window_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Summe der letzten `period` Werte entlang der Zeitachse (Achse 0), je
+    Fenster streng von links nach rechts addiert. Anders als die laufende
+    Summe von rolling().mean() hängt jeder Wert nur von seinem Fenster ab –
+    ein Ausschnitt (inkrementell.py) liefert dieselben Bits wie die ganze
+    Historie. Die ersten period−1 Werte sind NaN.
+    """
+    n = len(values)
+    result = np.full(values.shape, np.nan)
+    if n >= period:
+        total = values[: n - period + 1].copy()
+        for j in range(1, period):
+            total += values[j : n - period + 1 + j]
+        result[period - 1:] = total
+    return result
+
+
+def _like(x, values: np.ndarray):
+    """values mit Index (und Spalten) von x – Series oder DataFrame."""
+    if isinstance(x, pd.DataFrame):
+        return pd.DataFrame(values, index=x.index, columns=x.columns)
+    return pd.Series(values, index=x.index)
+
+
+def _window_mean(x, period: int):
+    """Wie x.rolling(period).mean(), aber je Fenster summiert (_window_sum)."""
+    return _like(x, _window_sum(x.to_numpy(dtype=float), period) / period)
+
+
+def _window_mean_std(close, period: int) -> tuple:
+    """
+    Gleitender Mittelwert und Standardabweichung (ddof=1) je Fenster, wie
+    close.rolling(period).mean() / .std() – close als Series oder DataFrame.
+    """
+    values = close.to_numpy(dtype=float)
+    mean   = _window_sum(values, period) / period
+    sq     = np.full(values.shape, np.nan)
+    n      = len(values)
+    if n >= period:
+        acc = np.zeros(values[period - 1:].shape)
+        for j in range(period):
+            dev  = values[j : n - period + 1 + j] - mean[period - 1:]
+            acc += dev * dev
+        sq[period - 1:] = acc
+    return _like(close, mean), _like(close, np.sqrt(sq / (period - 1)))
+
+
 # ── Gleitende Durchschnitte (EMA) ────────────────────────────────────────────
 
 def add_moving_averages(
     df: pd.DataFrame,
     periods: list[int] = None,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     Berechnet EMAs und MA-Kontext-Spalten.
@@ -53,6 +106,7 @@ def add_moving_averages(
     Parameter:
         df      : DataFrame mit Spalte Close
         periods : EMA-Perioden (Standard: [9, 21, 50, 200])
+        out     : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten:
@@ -63,34 +117,52 @@ def add_moving_averages(
                               'bearish' wenn umgekehrt, sonst 'mixed'
     """
     if periods is None:
-        periods = [9, 21, 50, 200]
+        periods = EMA_PERIODS
 
-    df = df.copy()
-    close = df["Close"]
+    return emit_columns(df, _moving_average_columns(df["Close"], periods), out)
 
-    for p in periods:
-        df[f"ema_{p}"] = _ema(close, p).round(4)
 
-    df["price_vs_ema50"]  = np.where(close > df["ema_50"],  "above", "below")
-    df["price_vs_ema200"] = np.where(close > df["ema_200"], "above", "below")
+def _moving_average_columns(close, periods: list[int]) -> dict:
+    """
+    Spalten von add_moving_averages() als Dict.
+    close darf eine Series (ein Ticker) oder ein DataFrame (Datum × Ticker) sein.
+    """
+    cols = {f"ema_{p}": _ema(close, p).round(4) for p in periods}
+    cols.update(_ma_context(close, cols))
+    return cols
 
+
+def _ma_context(close, ema) -> dict[str, np.ndarray]:
+    """
+    Kontext-Spalten aus Kurs und den gerundeten EMAs.
+
+    Parameter:
+        close : Schlusskurse
+        ema   : Mapping mit Schlüsseln ema_9, ema_21, ema_50, ema_200
+                (DataFrame oder dict von Series)
+
+    Rückgabe:
+        Dict {price_vs_ema50, price_vs_ema200, ma_alignment}
+    """
     bullish = (
-        (df["ema_9"]  > df["ema_21"]) &
-        (df["ema_21"] > df["ema_50"]) &
-        (df["ema_50"] > df["ema_200"])
+        (ema["ema_9"]  > ema["ema_21"]) &
+        (ema["ema_21"] > ema["ema_50"]) &
+        (ema["ema_50"] > ema["ema_200"])
     )
     bearish = (
-        (df["ema_9"]  < df["ema_21"]) &
-        (df["ema_21"] < df["ema_50"]) &
-        (df["ema_50"] < df["ema_200"])
-    )
-    df["ma_alignment"] = np.select(
-        [bullish, bearish],
-        ["bullish", "bearish"],
-        default="mixed",
+        (ema["ema_9"]  < ema["ema_21"]) &
+        (ema["ema_21"] < ema["ema_50"]) &
+        (ema["ema_50"] < ema["ema_200"])
     )
-
-    return df
+    return {
+        "price_vs_ema50":  np.where(close > ema["ema_50"],  "above", "below"),
+        "price_vs_ema200": np.where(close > ema["ema_200"], "above", "below"),
+        "ma_alignment":    np.select(
+            [bullish, bearish],
+            ["bullish", "bearish"],
+            default="mixed",
+        ),
+    }
 
 
 # ── Bollinger Bänder ──────────────────────────────────────────────────────────
@@ -100,6 +172,7 @@ def add_bollinger_bands(
     period: int = 20,
     std_dev: float = 2.0,
     squeeze_lookback: int = 126,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     Bollinger Bänder (SMA-Basis, ±2 Standardabweichungen).
@@ -109,31 +182,36 @@ def add_bollinger_bands(
         period           : Glättungsperiode (Standard: 20 Tage)
         std_dev          : Multiplikator für Standardabweichung (Standard: 2.0)
         squeeze_lookback : Lookback für Squeeze-Erkennung in Tagen (Standard: 126 ≈ 6 Monate)
+        out              : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten:
             bb_mid, bb_upper, bb_lower, bb_width, bb_pct, bb_squeeze
     """
-    df = df.copy()
-    close = df["Close"]
+    return emit_columns(df, _bollinger_columns(df["Close"], period, std_dev, squeeze_lookback), out)
 
-    mid   = close.rolling(period).mean()
-    std   = close.rolling(period).std(ddof=1)
+
+def _bollinger_columns(close, period: int, std_dev: float, squeeze_lookback: int) -> dict:
+    """Spalten von add_bollinger_bands() als Dict (Series oder Datum × Ticker)."""
+    # Je Fenster summiert statt rolling() → inkrementell bitgleich
+    mid, std = _window_mean_std(close, period)
     upper = mid + std_dev * std
     lower = mid - std_dev * std
 
-    df["bb_mid"]   = mid.round(4)
-    df["bb_upper"] = upper.round(4)
-    df["bb_lower"] = lower.round(4)
-    df["bb_width"] = ((upper - lower) / mid).round(4)
-    df["bb_pct"]   = ((close - lower) / (upper - lower)).round(4)
+    cols = {
+        "bb_mid":   mid.round(4),
+        "bb_upper": upper.round(4),
+        "bb_lower": lower.round(4),
+        "bb_width": ((upper - lower) / mid).round(4),
+        "bb_pct":   ((close - lower) / (upper - lower)).round(4),
+    }
 
     # Squeeze: aktuelle Bandbreite ≤ Minimum der letzten `squeeze_lookback` Tage
-    bb_width = df["bb_width"]
+    bb_width = cols["bb_width"]
     rolling_min = bb_width.rolling(squeeze_lookback, min_periods=squeeze_lookback // 2).min()
-    df["bb_squeeze"] = bb_width <= rolling_min
+    cols["bb_squeeze"] = bb_width <= rolling_min
 
-    return df
+    return cols
 
 
 # ── Donchian-Kanal ────────────────────────────────────────────────────────────
@@ -141,6 +219,7 @@ def add_bollinger_bands(
 def add_donchian(
     df: pd.DataFrame,
     period: int = 20,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     Donchian-Kanal – 4-Wochen-Regel nach Park & Irwin (2004).
@@ -151,6 +230,7 @@ def add_donchian(
     Parameter:
         df     : DataFrame mit Spalten High, Low, Close
         period : Kanalbreite in Handelstagen (Standard: 20 ≈ 4 Wochen)
+        out    : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten:
@@ -158,18 +238,23 @@ def add_donchian(
             donchian_low      : Niedrigstes Tief der letzten `period` Tage (exkl. heute)
             donchian_breakout : 'up' | 'down' | None
     """
-    df = df.copy()
+    return emit_columns(df, _donchian_columns(df["High"], df["Low"], df["Close"], period), out)
 
-    df["donchian_high"] = df["High"].shift(1).rolling(period).max().round(4)
-    df["donchian_low"]  = df["Low"].shift(1).rolling(period).min().round(4)
+
+def _donchian_columns(high, low, close, period: int) -> dict:
+    """Spalten von add_donchian() als Dict (Series oder Datum × Ticker)."""
+    donchian_high = high.shift(1).rolling(period).max().round(4)
+    donchian_low  = low.shift(1).rolling(period).min().round(4)
 
     conditions = [
-        df["Close"] > df["donchian_high"],
-        df["Close"] < df["donchian_low"],
+        close > donchian_high,
+        close < donchian_low,
     ]
-    df["donchian_breakout"] = np.select(conditions, ["up", "down"], default="")
-
-    return df
+    return {
+        "donchian_high":     donchian_high,
+        "donchian_low":      donchian_low,
+        "donchian_breakout": np.select(conditions, ["up", "down"], default=""),
+    }
 
 
 # ── Convenience ───────────────────────────────────────────────────────────────
@@ -0,0 +1,68 @@
+"""
+Kategorien der Label-Spalten
+────────────────────────────
+Gemeinsame Code-Tabelle für alle Text-Label der Indikatoren (regime,
+rsi_zone, ma_alignment ...). Die Spalten werden als pandas-Categorical mit
+fester Kategorienliste ausgegeben:
+
+    - Speicher: int8-Codes statt Python-Strings je Zeile
+    - Parquet:  dictionary-encodierte Spalten (kleiner, schneller zu lesen)
+    - Vergleiche wie df["regime"] == "trending" funktionieren unverändert
+
+Die Reihenfolge der Kategorien ist Teil des Formats – label_codes() und
+alle gespeicherten Parquet-Dateien hängen davon ab. Neue Labels nur hinten
+anfügen.
+
+Verwendung:
+    from src.ta.indikatoren.kategorien import LABELS, label_codes
+
+    codes = label_codes(df["regime"])                 # np.int8, -1 = fehlend
+    LABELS["regime"].index("trending")                # → 2
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Spalte → Kategorien in fester Reihenfolge (Index = int8-Code)
+LABELS: dict[str, list[str]] = {
+    "regime":            ["ranging", "weak_trend", "trending", "exhaustion"],
+    "price_vs_ema50":    ["below", "above"],
+    "price_vs_ema200":   ["below", "above"],
+    "ma_alignment":      ["mixed", "bullish", "bearish"],
+    "donchian_breakout": ["", "up", "down"],
+    "rsi_zone":          ["neutral", "overbought", "oversold"],
+    "stoch_zone":        ["neutral", "overbought", "oversold"],
+    "macd_hist_dir":     ["falling", "rising"],
+    "obv_trend":         ["falling", "rising"],
+    "vol_price_signal":  ["", "bullish_strong", "bullish_weak", "bearish_strong", "bearish_weak"],
+}
+
+_DTYPES: dict[str, pd.CategoricalDtype] = {
+    col: pd.CategoricalDtype(categories, ordered=False) for col, categories in LABELS.items()
+}
+
+
+def category_dtype(col: str) -> pd.CategoricalDtype:
+    """Categorical-Dtype einer Label-Spalte."""
+    return _DTYPES[col]
+
+
+def as_category(col: str, values) -> pd.Categorical:
+    """
+    Wandelt Label-Werte (ndarray, Series, Liste) in ein Categorical mit der
+    festen Kategorienliste von `col` um. Unbekannte Werte werden NaN.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    return pd.Categorical(values, dtype=_DTYPES[col])
+
+
+def label_codes(values) -> np.ndarray:
+    """
+    int8-Codes einer Label-Spalte (Index in LABELS[spalte], -1 = fehlend).
+
+    Parameter:
+        values : Categorical-Series, z.B. df["regime"]
+    """
+    return np.asarray(values.cat.codes if isinstance(values, pd.Series) else values.codes, dtype=np.int8)
@@ -0,0 +1,433 @@
+"""
+Rechenkerne für rekursive Indikatoren
+─────────────────────────────────────
+Wilder-Glättung (ADX/DMI) und Parabolic SAR sind Rekursionen, die sich nicht
+mit pandas/NumPy-Spaltenoperationen ausdrücken lassen. Dieses Modul bündelt
+die Schleifen und wählt ein Backend:
+
+    "numba"   : JIT-kompiliert (optional: pip install numba).
+                Gleiche Rechenreihenfolge wie die Python-Schleifen → bitgleich.
+                Standard, sobald numba installiert ist.
+    "python"  : Reine Python-Schleifen – Referenz und Fallback, immer verfügbar.
+    "lfilter" : scipy.signal.lfilter für die Wilder-Glättung (lineare Rekursion
+                in C, optional: pip install scipy). Rechnet S·(1 − 1/p) + x statt
+                S − S/p + x und ist daher NICHT bitgleich (Abweichung im Bereich
+                weniger ULP, nach Rundung auf 2 Stellen praktisch unsichtbar).
+                Nur auf ausdrücklichen Wunsch; PSAR nutzt hier numba/python.
+
+Auswahl:
+    set_backend("python")                 # zur Laufzeit
+    TA_KERNEL_BACKEND=python python ...   # per Umgebungsvariable
+
+Die Startwerte (Summe bzw. Mittelwert der ersten `period` Werte) werden in
+allen Backends mit NumPy berechnet, damit die Summationsreihenfolge
+(paarweise Summation) identisch bleibt.
+
+Für die Panel-Engine (panel.py) gibt es 2-D-Varianten (wilder_smooth_2d,
+wilder_smooth_avg_2d, psar_2d) über Arrays Zeit × Ticker: mit numba eine
+kompilierte Schleife über die Ticker, in Python je Tag eine NumPy-Operation
+über alle Ticker – jeweils bitgleich mit den 1-D-Kernen je Spalte.
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:           # optionale Abhängigkeit
+    numba = None
+
+try:
+    from scipy.signal import lfilter
+except ImportError:           # optionale Abhängigkeit
+    lfilter = None
+
+
+BACKENDS = ("numba", "python", "lfilter")
+
+
+# ── Python-Schleifen (Referenz) ───────────────────────────────────────────────
+# Schreiben in vorbereitete Arrays; von numba unverändert kompilierbar.
+
+def _wilder_sum_loop(result: np.ndarray, values: np.ndarray, period: int, start: int) -> None:
+    """S[i] = S[i-1] - S[i-1]/period + values[i]  für i ≥ start (in-place)."""
+    for i in range(start, len(values)):
+        result[i] = result[i - 1] - result[i - 1] / period + values[i]
+
+
+def _wilder_avg_loop(result: np.ndarray, values: np.ndarray, period: int, start: int) -> None:
+    """S[i] = (S[i-1] × (period-1) + values[i]) / period  für i ≥ start; NaN bleibt NaN."""
+    for i in range(start, len(values)):
+        if not np.isnan(values[i]):
+            result[i] = (result[i - 1] * (period - 1) + values[i]) / period
+
+
+def _psar_loop(
+    high: np.ndarray,
+    low: np.ndarray,
+    psar: np.ndarray,
+    bull: np.ndarray,
+    ep: float,
+    af: float,
+    start: int,
+    af_start: float,
+    af_step: float,
+    af_max: float,
+) -> tuple[float, float]:
+    """
+    Wilders SAR-Rekursion ab Index `start`; füllt psar/bull in-place.
+    Vergleiche entsprechen exakt Pythons min()/max() (erstes Argument gewinnt
+    bei Gleichheit), damit numba und Python identisch rechnen.
+    """
+    for i in range(start, len(psar)):
+        sar = psar[i - 1] + af * (ep - psar[i - 1])
+
+        if bull[i - 1]:
+            # Aufwärtstrend: SAR darf nicht über die letzten zwei Tiefs hinausragen
+            if low[i - 1] < sar:
+                sar = low[i - 1]
+            if i >= 2 and low[i - 2] < sar:
+                sar = low[i - 2]
+
+            if low[i] <= sar:
+                # Kurs durchbricht SAR → Wechsel zu Abwärtstrend
+                bull[i] = False
+                psar[i] = ep
+                ep      = low[i]
+                af      = af_start
+            else:
+                bull[i] = True
+                psar[i] = sar
+                if high[i] > ep:
+                    ep = high[i]
+                    af = af_max if af_max < af + af_step else af + af_step
+
+        else:
+            # Abwärtstrend: SAR darf nicht unter die letzten zwei Hochs fallen
+            if high[i - 1] > sar:
+                sar = high[i - 1]
+            if i >= 2 and high[i - 2] > sar:
+                sar = high[i - 2]
+
+            if high[i] >= sar:
+                # Kurs durchbricht SAR → Wechsel zu Aufwärtstrend
+                bull[i] = True
+                psar[i] = ep
+                ep      = high[i]
+                af      = af_start
+            else:
+                bull[i] = False
+                psar[i] = sar
+                if low[i] < ep:
+                    ep = low[i]
+                    af = af_max if af_max < af + af_step else af + af_step
+
+    return ep, af
+
+
+# ── 2-D: viele Ticker zugleich (Ticker × Zeit, je Zeile ein Ticker) ─────────
+
+def _wilder_sum_loop_2d(result: np.ndarray, values: np.ndarray, period: int, start: int) -> None:
+    """_wilder_sum_loop für alle Ticker zugleich – eine NumPy-Operation je Tag."""
+    for i in range(start, values.shape[1]):
+        result[:, i] = result[:, i - 1] - result[:, i - 1] / period + values[:, i]
+
+
+def _wilder_avg_loop_2d(result: np.ndarray, values: np.ndarray, period: int, starts: np.ndarray) -> None:
+    """_wilder_avg_loop für alle Ticker zugleich; Start je Ticker verschieden."""
+    for i in range(starts.min(), values.shape[1]):
+        v    = values[:, i]
+        step = np.where(np.isnan(v), np.nan, (result[:, i - 1] * (period - 1) + v) / period)
+        result[:, i] = np.where(i >= starts, step, result[:, i])
+
+
+def _psar_loop_2d(
+    high: np.ndarray,
+    low: np.ndarray,
+    psar: np.ndarray,
+    bull: np.ndarray,
+    af_start: float,
+    af_step: float,
+    af_max: float,
+) -> None:
+    """_psar_loop ab Index 1 für alle Ticker zugleich, Vergleiche wie dort."""
+    ep = high[:, 0].copy()
+    af = np.full(high.shape[0], af_start)
+    for i in range(1, high.shape[1]):
+        up     = bull[:, i - 1]
+        sar    = psar[:, i - 1] + af * (ep - psar[:, i - 1])
+        sar_up = np.where(low[:, i - 1] < sar, low[:, i - 1], sar)
+        sar_dn = np.where(high[:, i - 1] > sar, high[:, i - 1], sar)
+        if i >= 2:
+            sar_up = np.where(low[:, i - 2] < sar_up, low[:, i - 2], sar_up)
+            sar_dn = np.where(high[:, i - 2] > sar_dn, high[:, i - 2], sar_dn)
+        sar = np.where(up, sar_up, sar_dn)
+
+        rev_up = up & (low[:, i] <= sar)        # bullish → bearish
+        rev_dn = ~up & (high[:, i] >= sar)      # bearish → bullish
+        rev    = rev_up | rev_dn
+        ext_up = up & ~rev & (high[:, i] > ep)
+        ext_dn = ~up & ~rev & (low[:, i] < ep)
+
+        psar[:, i] = np.where(rev, ep, sar)
+        bull[:, i] = np.where(up, ~rev_up, rev_dn)
+        ep = np.where(rev, np.where(up, low[:, i], high[:, i]),
+             np.where(ext_up, high[:, i], np.where(ext_dn, low[:, i], ep)))
+        af = np.where(rev, af_start, np.where(ext_up | ext_dn, np.minimum(af + af_step, af_max), af))
+
+
+def _row_loops(sum_loop, avg_loop, psar_loop) -> tuple:
+    """
+    2-D-Varianten als Schleife über die 1-D-Kerne je Ticker – für numba
+    (kompiliert, Zeilen zusammenhängend im Speicher) und lfilter.
+    """
+    def sum_rows(result, values, period, start):
+        for j in range(values.shape[0]):
+            sum_loop(result[j], values[j], period, start)
+
+    def avg_rows(result, values, period, starts):
+        for j in range(values.shape[0]):
+            avg_loop(result[j], values[j], period, starts[j])
+
+    def psar_rows(high, low, psar, bull, af_start, af_step, af_max):
+        for j in range(high.shape[0]):
+            psar_loop(high[j], low[j], psar[j], bull[j], high[j, 0], af_start, 1, af_start, af_step, af_max)
+
+    return sum_rows, avg_rows, psar_rows
+
+
+_LOOPS = {
+    "python": (_wilder_sum_loop, _wilder_avg_loop, _psar_loop),
+}
+_LOOPS_2D = {
+    "python": (_wilder_sum_loop_2d, _wilder_avg_loop_2d, _psar_loop_2d),
+}
+
+if numba is not None:
+    _LOOPS["numba"] = tuple(
+        numba.njit(cache=True)(fn) for fn in (_wilder_sum_loop, _wilder_avg_loop, _psar_loop)
+    )
+    _LOOPS_2D["numba"] = tuple(numba.njit(cache=True)(fn) for fn in _row_loops(*_LOOPS["numba"]))
+
+
+# ── scipy.signal.lfilter ─────────────────────────────────────────────────────
+
+def _wilder_sum_lfilter(result: np.ndarray, values: np.ndarray, period: int, start: int) -> None:
+    """Wilder-Summe als IIR-Filter erster Ordnung: y[i] = c·y[i-1] + x[i], c = 1 − 1/period."""
+    if start >= len(values):
+        return
+    c = 1.0 - 1.0 / period
+    result[start:], _ = lfilter([1.0], [1.0, -c], values[start:], zi=[c * result[start - 1]])
+
+
+def _wilder_avg_lfilter(result: np.ndarray, values: np.ndarray, period: int, start: int) -> None:
+    """Wilder-Durchschnitt als IIR-Filter: y[i] = x[i]/period + y[i-1]·(period-1)/period."""
+    if start >= len(values):
+        return
+    c = (period - 1) / period
+    result[start:], _ = lfilter([1.0 / period], [1.0, -c], values[start:], zi=[c * result[start - 1]])
+
+
+# ── Backend-Auswahl ───────────────────────────────────────────────────────────
+
+def available_backends() -> list[str]:
+    """Backends, deren Abhängigkeiten installiert sind."""
+    found = list(_LOOPS)
+    if lfilter is not None:
+        found.append("lfilter")
+    return found
+
+
+def set_backend(name: str) -> None:
+    """
+    Wählt das Backend für alle folgenden Aufrufe.
+
+    Parameter:
+        name : 'numba' | 'python' | 'lfilter'
+
+    Raises:
+        ValueError wenn das Backend unbekannt oder nicht installiert ist
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unbekanntes Kernel-Backend: {name!r} (erlaubt: {BACKENDS})")
+    if name not in available_backends():
+        raise ValueError(f"Kernel-Backend {name!r} nicht verfügbar – Abhängigkeit fehlt")
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def _default_backend() -> str:
+    requested = os.getenv("TA_KERNEL_BACKEND")
+    if requested in available_backends():
+        return requested
+    return "numba" if "numba" in _LOOPS else "python"
+
+
+_backend = _default_backend()
+
+
+def _loops() -> tuple:
+    """(sum_loop, avg_loop, psar_loop) für das aktive Backend."""
+    if _backend == "lfilter":
+        exact = _LOOPS.get("numba", _LOOPS["python"])
+        return _wilder_sum_lfilter, _wilder_avg_lfilter, exact[2]
+    return _LOOPS[_backend]
+
+
+def _loops_2d() -> tuple:
+    """Wie _loops(), für Arrays Ticker × Zeit."""
+    if _backend == "lfilter":
+        exact = _LOOPS_2D.get("numba", _LOOPS_2D["python"])
+        return _row_loops(_wilder_sum_lfilter, _wilder_avg_lfilter, None)[:2] + exact[2:]
+    return _LOOPS_2D[_backend]
+
+
+# ── Öffentliche Kerne ─────────────────────────────────────────────────────────
+
+def wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilders kumulierte Glättung – für TR und DM.
+    Erster Wert = Summe der ersten `period` Werte.
+    Folgewerte:  S[i] = S[i-1] - S[i-1]/period + values[i]
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    result[period - 1] = np.nansum(values[:period])
+    _loops()[0](result, values, period, period)
+    return result
+
+
+def wilder_smooth_avg(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilders Durchschnitts-Glättung – für DX → ADX.
+    Erster Wert = Durchschnitt der ersten `period` gültigen Werte.
+    Folgewerte:  S[i] = (S[i-1] × (period-1) + values[i]) / period
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    valid = np.where(~np.isnan(values))[0]
+    if len(valid) < period:
+        return result
+    start = valid[0]
+    result[start + period - 1] = np.nanmean(values[start : start + period])
+    _loops()[1](result, values, period, start + period)
+    return result
+
+
+def wilder_continue(values: np.ndarray, period: int, last: float) -> np.ndarray:
+    """Setzt wilder_smooth ab einem bekannten letzten Wert `last` fort."""
+    values = np.concatenate([[last], np.asarray(values, dtype=float)])
+    result = np.empty(len(values))
+    result[0] = last
+    _loops()[0](result, values, period, 1)
+    return result[1:]
+
+
+def wilder_continue_avg(values: np.ndarray, period: int, last: float) -> np.ndarray:
+    """
+    Setzt wilder_smooth_avg ab einem bekannten letzten Wert `last` fort.
+    Ein NaN-Wert beendet die Glättung wie im Original (alle Folgewerte NaN).
+    """
+    values = np.concatenate([[last], np.asarray(values, dtype=float)])
+    result = np.full(len(values), np.nan)
+    result[0] = last
+    _loops()[1](result, values, period, 1)
+    return result[1:]
+
+
+def psar_loop(
+    high: np.ndarray,
+    low: np.ndarray,
+    psar: np.ndarray,
+    bull: np.ndarray,
+    ep: float,
+    af: float,
+    start: int,
+    af_start: float,
+    af_step: float,
+    af_max: float,
+) -> tuple[float, float]:
+    """
+    Wilders SAR-Rekursion ab Index `start`; füllt psar/bull in-place.
+    psar[start-1] und bull[start-1] müssen gesetzt sein.
+
+    Rückgabe:
+        (ep, af) nach dem letzten Wert – Zustand für eine spätere Fortsetzung
+    """
+    ep, af = _loops()[2](
+        np.ascontiguousarray(high, dtype=float),
+        np.ascontiguousarray(low, dtype=float),
+        psar, bull, float(ep), float(af), start,
+        float(af_start), float(af_step), float(af_max),
+    )
+    return float(ep), float(af)
+
+
+
+# ── Öffentliche Kerne für Panels (Zeit × Ticker) ─────────────────────────────
+# Gleiche Ergebnisse wie die 1-D-Kerne je Spalte; intern je Ticker eine
+# zusammenhängende Zeile.
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(values, dtype=float).T)
+
+
+def wilder_smooth_2d(values: np.ndarray, period: int) -> np.ndarray:
+    """wilder_smooth für jede Spalte eines Panels (Zeit × Ticker)."""
+    rows   = _rows(values)
+    result = np.full(rows.shape, np.nan)
+    if rows.shape[1] < period:
+        return result.T
+    result[:, period - 1] = np.nansum(rows[:, :period], axis=1)
+    _loops_2d()[0](result, rows, period, period)
+    return result.T
+
+
+def wilder_smooth_avg_2d(values: np.ndarray, period: int, lengths: np.ndarray) -> np.ndarray:
+    """
+    wilder_smooth_avg für jede Spalte eines Panels (Zeit × Ticker).
+    Der Start (erster gültiger Wert) wird je Ticker innerhalb seiner echten
+    Länge `lengths[j]` gesucht; Zeilen danach sind Füllwerte.
+    """
+    rows   = _rows(values)
+    k, n   = rows.shape
+    result = np.full((k, n), np.nan)
+    starts = np.full(k, n)
+    for j in range(k):
+        valid = np.where(~np.isnan(rows[j, :lengths[j]]))[0]
+        if len(valid) < period:
+            continue
+        start = valid[0]
+        result[j, start + period - 1] = np.nanmean(rows[j, start : start + period])
+        starts[j] = start + period
+    if k:
+        _loops_2d()[1](result, rows, period, starts)
+    return result.T
+
+
+def psar_2d(
+    high: np.ndarray,
+    low: np.ndarray,
+    af_start: float,
+    af_step: float,
+    af_max: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parabolic SAR für jede Spalte eines Panels (Zeit × Ticker), wie
+    add_parabolic_sar() je Ticker.
+
+    Rückgabe:
+        (psar, bull) als Arrays Zeit × Ticker
+    """
+    high, low = _rows(high), _rows(low)
+    psar = np.full(high.shape, np.nan)
+    bull = np.ones(high.shape, dtype=bool)
+    if high.shape[1]:
+        psar[:, 0] = low[:, 0]
+        _loops_2d()[2](high, low, psar, bull, float(af_start), float(af_step), float(af_max))
+    return psar.T, bull.T
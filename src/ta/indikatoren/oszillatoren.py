@@ -28,6 +28,9 @@ Quellen:
 import numpy as np
 import pandas as pd
 
+from .spalten import emit_columns
+from .durchschnitte import _window_mean
+
 
 # ── RSI ───────────────────────────────────────────────────────────────────────
 
@@ -36,6 +39,7 @@ def add_rsi(
     period: int = 14,
     overbought: float = 70.0,
     oversold: float = 30.0,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     RSI nach Wilders Methode (com = period−1 → alpha = 1/period).
@@ -49,32 +53,48 @@ def add_rsi(
         period     : Glättungsperiode (Standard: 14 = halber 28-Tage-Zyklus)
         overbought : Schwellenwert Überkauft (Standard: 70)
         oversold   : Schwellenwert Überverkauft (Standard: 30)
+        out        : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten: rsi, rsi_zone, rsi_above50
     """
-    df = df.copy()
-    close = df["Close"]
+    return emit_columns(df, _rsi_columns(df["Close"], period, overbought, oversold), out)
+
 
-    delta = close.diff()
-    gain  = delta.clip(lower=0)
-    loss  = (-delta).clip(lower=0)
+def _rsi_columns(close, period: int, overbought: float, oversold: float) -> dict:
+    """Spalten von add_rsi() als Dict (Series oder Datum × Ticker)."""
+    gain, loss = _gain_loss(close.diff())
 
     # Wilders Glättung: com = period-1 entspricht alpha = 1/period
     avg_gain = gain.ewm(com=period - 1, adjust=False, min_periods=period).mean()
     avg_loss = loss.ewm(com=period - 1, adjust=False, min_periods=period).mean()
 
+    rsi = _rsi_from_averages(avg_gain, avg_loss)
+    return {
+        "rsi":         rsi,
+        "rsi_zone":    _rsi_zone(rsi, overbought, oversold),
+        "rsi_above50": rsi > 50,
+    }
+
+
+def _gain_loss(delta):
+    """Zerlegt Kursänderungen in Gewinne und Verluste (beide ≥ 0)."""
+    return delta.clip(lower=0), (-delta).clip(lower=0)
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    """RSI (gerundet) aus den geglätteten Gewinnen und Verlusten."""
     rs = avg_gain / avg_loss
-    df["rsi"] = (100 - 100 / (1 + rs)).round(2)
+    return (100 - 100 / (1 + rs)).round(2)
+
 
-    df["rsi_zone"] = np.select(
-        [df["rsi"] >= overbought, df["rsi"] <= oversold],
+def _rsi_zone(rsi, overbought: float, oversold: float) -> np.ndarray:
+    """'overbought' | 'oversold' | 'neutral' anhand der Schwellenwerte."""
+    return np.select(
+        [rsi >= overbought, rsi <= oversold],
         ["overbought", "oversold"],
         default="neutral",
     )
-    df["rsi_above50"] = df["rsi"] > 50
-
-    return df
 
 
 # ── MACD ──────────────────────────────────────────────────────────────────────
@@ -84,6 +104,7 @@ def add_macd(
     fast: int = 12,
     slow: int = 26,
     signal: int = 9,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     MACD – Moving Average Convergence/Divergence.
@@ -99,27 +120,33 @@ def add_macd(
         fast   : Periode schnelle EMA (Standard: 12)
         slow   : Periode langsame EMA (Standard: 26)
         signal : Periode Signallinie  (Standard: 9)
+        out    : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten: macd, macd_signal, macd_hist, macd_hist_dir
     """
-    df = df.copy()
-    close = df["Close"]
+    return emit_columns(df, _macd_columns(df["Close"], fast, slow, signal), out)
+
 
+def _macd_columns(close, fast: int, slow: int, signal: int) -> dict:
+    """Spalten von add_macd() als Dict (Series oder Datum × Ticker)."""
     ema_fast    = close.ewm(span=fast,   adjust=False).mean()
     ema_slow    = close.ewm(span=slow,   adjust=False).mean()
     macd_line   = ema_fast - ema_slow
     signal_line = macd_line.ewm(span=signal, adjust=False).mean()
     hist        = macd_line - signal_line
 
-    df["macd"]        = macd_line.round(4)
-    df["macd_signal"] = signal_line.round(4)
-    df["macd_hist"]   = hist.round(4)
+    return {
+        "macd":          macd_line.round(4),
+        "macd_signal":   signal_line.round(4),
+        "macd_hist":     hist.round(4),
+        "macd_hist_dir": _hist_direction(hist),
+    }
 
-    # Richtung des Histogramms: steigend = Kaufdruck nimmt zu
-    df["macd_hist_dir"] = np.where(hist > hist.shift(1), "rising", "falling")
 
-    return df
+def _hist_direction(hist) -> np.ndarray:
+    """Richtung des Histogramms: steigend = Kaufdruck nimmt zu."""
+    return np.where(hist > hist.shift(1), "rising", "falling")
 
 
 # ── Stochastik ────────────────────────────────────────────────────────────────
@@ -131,6 +158,7 @@ def add_stochastik(
     d_period: int = 3,
     overbought: float = 80.0,
     oversold: float = 20.0,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     Langsame Stochastik (%K und %D geglättet).
@@ -151,29 +179,44 @@ def add_stochastik(
         d_period   : Glättung für Slow %D (Standard: 3)
         overbought : Schwellenwert Überkauft (Standard: 80)
         oversold   : Schwellenwert Überverkauft (Standard: 20)
+        out        : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten: stoch_k, stoch_d, stoch_zone
     """
-    df = df.copy()
-
-    low_k  = df["Low"].rolling(k_period).min()
-    high_k = df["High"].rolling(k_period).max()
-    fast_k = 100 * (df["Close"] - low_k) / (high_k - low_k)
-
-    slow_k = fast_k.rolling(smooth).mean()
-    slow_d = slow_k.rolling(d_period).mean()
-
-    df["stoch_k"] = slow_k.round(2)
-    df["stoch_d"] = slow_d.round(2)
-
-    df["stoch_zone"] = np.select(
-        [df["stoch_d"] >= overbought, df["stoch_d"] <= oversold],
-        ["overbought", "oversold"],
-        default="neutral",
+    cols = _stochastik_columns(
+        df["High"], df["Low"], df["Close"], k_period, smooth, d_period, overbought, oversold,
     )
-
-    return df
+    return emit_columns(df, cols, out)
+
+
+def _stochastik_columns(
+    high, low, close,
+    k_period: int,
+    smooth: int,
+    d_period: int,
+    overbought: float,
+    oversold: float,
+) -> dict:
+    """Spalten von add_stochastik() als Dict (Series oder Datum × Ticker)."""
+    low_k  = low.rolling(k_period).min()
+    high_k = high.rolling(k_period).max()
+    fast_k = 100 * (close - low_k) / (high_k - low_k)
+
+    # Je Fenster summiert statt rolling() → inkrementell bitgleich
+    slow_k = _window_mean(fast_k, smooth)
+    slow_d = _window_mean(slow_k, d_period)
+
+    stoch_d = slow_d.round(2)
+    return {
+        "stoch_k":    slow_k.round(2),
+        "stoch_d":    stoch_d,
+        "stoch_zone": np.select(
+            [stoch_d >= overbought, stoch_d <= oversold],
+            ["overbought", "oversold"],
+            default="neutral",
+        ),
+    }
 
 
 # ── Convenience ───────────────────────────────────────────────────────────────
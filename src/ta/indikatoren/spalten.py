@@ -0,0 +1,72 @@
+"""
+Spalten-Ausgabe der Indikator-Funktionen
+────────────────────────────────────────
+Alle add_*-Funktionen berechnen ihre Spalten zuerst als Dict und geben sie
+über emit_columns() aus. Zwei Modi:
+
+    Standard      : df wird kopiert, Spalten werden angehängt, Kopie zurück
+                    (bisheriges Verhalten, df des Aufrufers bleibt unverändert)
+    Builder-Modus : out=dict übergeben → Spalten landen als NumPy-Arrays im
+                    gemeinsamen Puffer, df wird weder kopiert noch verändert
+
+Label-Spalten (regime, rsi_zone ...) werden dabei als Categorical mit der
+festen Code-Tabelle aus kategorien.py ausgegeben.
+
+Der Builder-Modus vermeidet, dass eine Kette von add_*-Aufrufen den
+wachsenden DataFrame bei jedem Schritt kopiert. assemble_columns() baut den
+Ergebnis-DataFrame am Ende in einem Schritt zusammen.
+
+Verwendung:
+    cols = {}
+    add_rsi(df, out=cols)
+    add_macd(df, out=cols)
+    df = assemble_columns(df, cols)
+"""
+
+import numpy as np
+import pandas as pd
+
+from .kategorien import LABELS, as_category
+
+
+def emit_columns(df: pd.DataFrame, cols: dict, out: dict | None = None) -> pd.DataFrame:
+    """
+    Gibt berechnete Spalten aus – als Kopie von df oder in den Puffer `out`.
+
+    Parameter:
+        df   : Eingabe-DataFrame
+        cols : {spalte: Series | ndarray} in Ausgabereihenfolge
+        out  : Spalten-Puffer für den Builder-Modus (Standard: None = Kopie)
+
+    Rückgabe:
+        Kopie von df mit den neuen Spalten, im Builder-Modus df selbst
+    """
+    cols = _with_categories(cols)
+    if out is not None:
+        for col, values in cols.items():
+            out[col] = values.to_numpy() if isinstance(values, pd.Series) else values
+        return df
+
+    df = df.copy()
+    for col, values in cols.items():
+        df[col] = values
+    return df
+
+
+def _with_categories(cols: dict) -> dict:
+    """Label-Spalten (siehe kategorien.py) als Categorical, alle anderen als ndarray/Series."""
+    return {
+        col: as_category(col, values) if col in LABELS
+        else values if isinstance(values, pd.Series) else np.asarray(values)
+        for col, values in cols.items()
+    }
+
+
+def assemble_columns(df: pd.DataFrame, cols: dict) -> pd.DataFrame:
+    """
+    Hängt alle gepufferten Spalten in einem Schritt an df an.
+    Bereits vorhandene Spalten gleichen Namens werden ersetzt.
+    """
+    base = df.drop(columns=[c for c in cols if c in df.columns])
+    # copy=False: die Puffer-Arrays werden übernommen statt ein zweites Mal kopiert
+    return pd.concat([base, pd.DataFrame(cols, index=df.index, copy=False)], axis=1)
@@ -22,12 +22,15 @@ Quelle: Murphy (Kap. 7) – Granville OBV (1963), Volumen-Interpretationsregeln
 import numpy as np
 import pandas as pd
 
+from .spalten import emit_columns
+
 
 # ── OBV ───────────────────────────────────────────────────────────────────────
 
 def add_obv(
     df: pd.DataFrame,
     ema_period: int = 20,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     On-Balance-Volume nach Granville (1963).
@@ -44,24 +47,31 @@ def add_obv(
     Parameter:
         df         : DataFrame mit Spalten Close, Volume
         ema_period : EMA-Periode für OBV-Glättung (Standard: 20)
+        out        : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten: obv, obv_ema, obv_trend
     """
-    df = df.copy()
-    close  = df["Close"]
-    volume = df["Volume"]
+    return emit_columns(df, _obv_columns(df["Close"], df["Volume"], ema_period), out)
+
 
+def _obv_columns(close, volume, ema_period: int) -> dict:
+    """Spalten von add_obv() als Dict (Series oder Datum × Ticker)."""
     direction = np.sign(close.diff()).fillna(0)
     obv = (direction * volume).cumsum()
 
     obv_ema = obv.ewm(span=ema_period, adjust=False).mean()
 
-    df["obv"]       = obv.astype(int)
-    df["obv_ema"]   = obv_ema.round(0).astype(float)
-    df["obv_trend"] = np.where(obv >= obv_ema, "rising", "falling")
+    return {
+        "obv":       obv.astype(int),
+        "obv_ema":   obv_ema.round(0).astype(float),
+        "obv_trend": _obv_trend(obv, obv_ema),
+    }
 
-    return df
+
+def _obv_trend(obv, obv_ema) -> np.ndarray:
+    """'rising' wenn OBV auf oder über seiner EMA liegt, sonst 'falling'."""
+    return np.where(obv >= obv_ema, "rising", "falling")
 
 
 # ── Volumen-Kontext ───────────────────────────────────────────────────────────
@@ -70,6 +80,7 @@ def add_volume_context(
     df: pd.DataFrame,
     sma_period: int = 20,
     high_ratio: float = 1.5,
+    out: dict | None = None,
 ) -> pd.DataFrame:
     """
     Volumen-Kontext: Durchschnitt, Ratio und Kurs/Volumen-Kombination.
@@ -84,21 +95,25 @@ def add_volume_context(
         df         : DataFrame mit Spalten Close, Volume
         sma_period : Lookback für Durchschnittsvolumen (Standard: 20)
         high_ratio : Schwellenwert für vol_above_avg (Standard: 1.0 = Durchschnitt)
+        out        : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
 
     Rückgabe:
         DataFrame mit zusätzlichen Spalten:
             vol_sma20, vol_ratio, vol_above_avg, vol_price_signal
     """
-    df = df.copy()
-    volume = df["Volume"]
-    close  = df["Close"]
+    return emit_columns(df, _volume_context_columns(df["Close"], df["Volume"], sma_period), out)
+
 
+def _volume_context_columns(close, volume, sma_period: int) -> dict:
+    """Spalten von add_volume_context() als Dict (Series oder Datum × Ticker)."""
     vol_sma  = volume.rolling(sma_period).mean()
     vol_ratio = volume / vol_sma
 
-    df["vol_sma20"]     = vol_sma.round(0)
-    df["vol_ratio"]     = vol_ratio.round(3)
-    df["vol_above_avg"] = vol_ratio >= 1.0
+    cols = {
+        "vol_sma20":     vol_sma.round(0),
+        "vol_ratio":     vol_ratio.round(3),
+        "vol_above_avg": vol_ratio >= 1.0,
+    }
 
     price_up   = close > close.shift(1)
     price_down = close < close.shift(1)
@@ -112,9 +127,9 @@ def add_volume_context(
         price_down & vol_down,
     ]
     choices = ["bullish_strong", "bullish_weak", "bearish_strong", "bearish_weak"]
-    df["vol_price_signal"] = np.select(conditions, choices, default="")
+    cols["vol_price_signal"] = np.select(conditions, choices, default="")
 
-    return df
+    return cols
 
 
 # ── Convenience ───────────────────────────────────────────────────────────────
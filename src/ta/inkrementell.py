@@ -0,0 +1,366 @@
+"""
+TA-Modul: Inkrementelle Indikator-Fortschreibung
+────────────────────────────────────────────────
+Berechnet die Indikatoren aus add_all_indicators() nur für neue Handelstage,
+statt die gesamte Historie erneut durch die Pipeline zu schicken.
+
+Prinzip:
+    Rekursive Indikatoren (EMA, MACD, RSI, OBV, ADX, Parabolic SAR) hängen
+    von der gesamten Historie ab. Ihr ungerundeter Endzustand wird nach jeder
+    Berechnung als kleines Dict gespeichert (init_state) und beim nächsten
+    Update fortgesetzt (extend_indicators). Fenster-Indikatoren (Bollinger,
+    Donchian, Stochastik, Volumen-Kontext) brauchen nur die letzten
+    TAIL_ROWS Zeilen und werden auf diesem Ausschnitt neu berechnet.
+
+    Aufwand pro Update: O(neue Zeilen + TAIL_ROWS) statt O(Historie).
+
+Genauigkeit:
+    Die rekursiven Indikatoren verwenden dieselbe Rechenreihenfolge wie die
+    Vollberechnung und sind bitgleich. Gleitende Mittelwerte und
+    Standardabweichungen (Bollinger, Stochastik) werden je Fenster summiert
+    (durchschnitte._window_sum) statt mit der laufenden Summe von pandas
+    rolling() – sonst hinge das letzte Bit von der Länge des Ausschnitts ab
+    und könnte bei Rundungs-Grenzfällen die 4. Nachkommastelle kippen. Min/Max
+    und der Volumen-SMA (ganzzahlige Summen) sind ohnehin exakt. Damit ist
+    jede Spalte bitgleich mit der Vollberechnung.
+
+Parameter:
+    Perioden und Schwellen stammen aus den Standardwerten der add_*-Funktionen
+    (_params) und werden im Zustand mitgespeichert; ändert sich ein Standardwert,
+    passt der alte Zustand nicht mehr → Vollberechnung. Der Feature Store legt
+    zusätzlich die Fingerprints der Pipeline-Schritte ab (feature_graph), damit
+    auch geänderte Formeln den Zustand verwerfen. Schritte mit eigenen "params"
+    werden nie fortgeschrieben.
+
+Verwendung:
+    from src.ta.TA_run import add_all_indicators
+    from src.ta.inkrementell import init_state, extend_indicators
+
+    df    = add_all_indicators(ohlcv)
+    state = init_state(df)
+    rows, state = extend_indicators(df, new_ohlcv, state)
+    df    = pd.concat([df, rows])
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from .indikatoren.adx import (
+    _adx_arrays, _classify_regime, _di_dx, _directional_movement, add_adx, add_parabolic_sar,
+)
+from .indikatoren.kernels import (
+    psar_loop as _psar_loop,
+    wilder_continue as _wilder_continue,
+    wilder_continue_avg as _wilder_continue_avg,
+)
+from .indikatoren.durchschnitte import (
+    EMA_PERIODS, _ema, _ma_context, add_bollinger_bands, add_donchian, add_moving_averages,
+)
+from .indikatoren.oszillatoren import (
+    _gain_loss, _hist_direction, _rsi_from_averages, _rsi_zone, add_macd, add_rsi, add_stochastik,
+)
+from .indikatoren.volumen import _obv_trend, add_obv, add_volume_context
+from .indikatoren.kategorien import LABELS, as_category
+
+
+# ── Konfiguration ─────────────────────────────────────────────────────────────
+# Versionsnummer des Zustandsformats – erhöhen wenn sich die Felder des
+# Zustands ändern (alter Zustand wird dann verworfen).
+
+STATE_VERSION = 3
+
+# Längstes Fenster: Squeeze (126 Tage) über bb_width, das selbst 20 Tage braucht
+TAIL_ROWS = 160
+
+# Kürzere Historien werden immer voll berechnet (Warm-up-Phasen der Indikatoren)
+MIN_HISTORY = 250
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _defaults(fn) -> dict:
+    """Standardwerte der Parameter einer add_*-Funktion."""
+    return {
+        name: p.default for name, p in inspect.signature(fn).parameters.items()
+        if p.default is not inspect.Parameter.empty
+    }
+
+
+def _params() -> dict:
+    """
+    Parameter der Fortschreibung – aus den Standardwerten der add_*-Funktionen
+    gelesen, damit sie nicht von der Vollberechnung abweichen können.
+    Listen statt Tupel: der Wert wird im JSON-Zustand verglichen.
+    """
+    rsi, macd, psar = _defaults(add_rsi), _defaults(add_macd), _defaults(add_parabolic_sar)
+    return {
+        "ema":      list(_defaults(add_moving_averages)["periods"] or EMA_PERIODS),
+        "adx":      _defaults(add_adx)["period"],
+        "rsi":      rsi["period"],
+        "rsi_zone": [rsi["overbought"], rsi["oversold"]],
+        "macd":     [macd["fast"], macd["slow"], macd["signal"]],
+        "obv_ema":  _defaults(add_obv)["ema_period"],
+        "psar":     [psar["af_start"], psar["af_step"], psar["af_max"]],
+    }
+
+
+def _ewm_continue(last: float, values: pd.Series, **ewm_kwargs) -> pd.Series:
+    """
+    Setzt eine ewm(adjust=False)-Glättung ab dem Endwert `last` fort.
+    Der vorangestellte Endwert wird von pandas als Startwert übernommen –
+    die Folgewerte sind bitgleich mit einer Berechnung über die ganze Historie.
+    """
+    seeded = pd.concat([pd.Series([last]), values.reset_index(drop=True)], ignore_index=True)
+    out = seeded.ewm(adjust=False, **ewm_kwargs).mean().iloc[1:]
+    out.index = values.index
+    return out
+
+
+def _ema_continue(last: float, values: pd.Series, period: int) -> pd.Series:
+    return _ewm_continue(last, values, span=period)
+
+
+# ── Zustand ───────────────────────────────────────────────────────────────────
+
+def init_state(df: pd.DataFrame, fingerprints: dict | None = None) -> dict | None:
+    """
+    Berechnet den ungerundeten Endzustand aller rekursiven Indikatoren.
+
+    Parameter:
+        df           : DataFrame mit mindestens Open, High, Low, Close, Volume
+                       (typisch: Rückgabe von add_all_indicators)
+        fingerprints : Fingerprints der Pipeline-Schritte, die df erzeugt haben
+                       (feature_graph.fingerprints) – werden im Zustand abgelegt
+
+    Rückgabe:
+        JSON-serialisierbares Dict oder None wenn die Historie zu kurz ist
+    """
+    if len(df) < MIN_HISTORY:
+        return None
+
+    params = _params()
+    close  = df["Close"]
+    high   = df["High"].to_numpy(dtype=float).flatten()
+    low    = df["Low"].to_numpy(dtype=float).flatten()
+    volume = df["Volume"]
+
+    # ADX: geglättete Summen und ADX selbst
+    a = _adx_arrays(high, low, close.to_numpy(dtype=float).flatten(), params["adx"])
+
+    # Parabolic SAR: Rekursion muss einmal komplett laufen, um EP/AF zu kennen
+    n    = len(df)
+    psar = np.full(n, np.nan)
+    bull = np.ones(n, dtype=bool)
+    psar[0] = low[0]
+    af_start, af_step, af_max = params["psar"]
+    ep, af = _psar_loop(high, low, psar, bull, high[0], af_start, 1, af_start, af_step, af_max)
+
+    # RSI: Wilders Durchschnitte von Gewinn und Verlust
+    gain, loss = _gain_loss(close.diff())
+    avg_gain = gain.ewm(com=params["rsi"] - 1, adjust=False).mean()
+    avg_loss = loss.ewm(com=params["rsi"] - 1, adjust=False).mean()
+
+    # MACD
+    fast, slow, signal = params["macd"]
+    ema_fast    = _ema(close, fast)
+    ema_slow    = _ema(close, slow)
+    macd_line   = ema_fast - ema_slow
+    signal_line = _ema(macd_line, signal)
+
+    # OBV
+    direction = np.sign(close.diff()).fillna(0)
+    obv = (direction * volume).cumsum()
+
+    return {
+        "version":      STATE_VERSION,
+        "params":       params,
+        "fingerprints": fingerprints,
+        "last_date":    str(df.index[-1].date()),
+        "ema":          {str(p): float(_ema(close, p).iloc[-1]) for p in params["ema"]},
+        "smooth_tr":    float(a["smooth_tr"][-1]),
+        "smooth_plus":  float(a["smooth_plus"][-1]),
+        "smooth_minus": float(a["smooth_minus"][-1]),
+        "adx":          float(a["adx"][-1]),
+        "psar":         float(psar[-1]),
+        "psar_bull":    bool(bull[-1]),
+        "psar_ep":      float(ep),
+        "psar_af":      float(af),
+        "avg_gain":     float(avg_gain.iloc[-1]),
+        "avg_loss":     float(avg_loss.iloc[-1]),
+        "ema_fast":     float(ema_fast.iloc[-1]),
+        "ema_slow":     float(ema_slow.iloc[-1]),
+        "macd_signal":  float(signal_line.iloc[-1]),
+        "macd_hist":    float((macd_line - signal_line).iloc[-1]),
+        "obv":          float(obv.iloc[-1]),
+        "obv_ema":      float(_ema(obv, params["obv_ema"]).iloc[-1]),
+    }
+
+
+def state_matches(state: dict | None, cached: pd.DataFrame, fingerprints: dict | None = None) -> bool:
+    """
+    Prüft ob ein gespeicherter Zustand zum gecachten DataFrame passt
+    (gleiche Formatversion und Parameter, gleicher letzter Handelstag, genug
+    Historie und – falls angegeben – gleiche Fingerprints der Pipeline-Schritte).
+    """
+    return (
+        state is not None
+        and state.get("version") == STATE_VERSION
+        and state.get("params") == _params()
+        and (fingerprints is None or state.get("fingerprints") == fingerprints)
+        and state.get("last_date") == str(cached.index[-1].date())
+        and len(cached) >= MIN_HISTORY
+    )
+
+
+# ── Fortschreibung ────────────────────────────────────────────────────────────
+
+def extend_indicators(
+    cached: pd.DataFrame,
+    new: pd.DataFrame,
+    state: dict,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Berechnet alle Indikator-Spalten für neue Handelstage.
+
+    Parameter:
+        cached : Bisheriger Feature-DataFrame (nur die letzten TAIL_ROWS Zeilen
+                 werden gelesen)
+        new    : OHLCV-Zeilen nach dem letzten Datum von `cached`
+        state  : Zustand von init_state() bzw. vom letzten Aufruf
+
+    Rückgabe:
+        (rows, state)
+            rows  : neue Zeilen mit denselben Spalten wie `cached`
+            state : fortgeschriebener Zustand für das nächste Update
+    """
+    m      = len(new)
+    tail   = cached.iloc[-TAIL_ROWS:]
+    window = pd.concat([tail[OHLCV], new[OHLCV]])
+
+    close  = new["Close"]
+    volume = new["Volume"]
+    prev_close = tail["Close"].iloc[-1]
+
+    cols: dict[str, pd.Series | np.ndarray] = {}
+    s = dict(state)
+    params = s["params"]
+    period = params["adx"]
+
+    # ── ADX / DMI ─────────────────────────────────────────────────────────────
+    h = window["High"].to_numpy(dtype=float)[-(m + 1):]
+    l = window["Low"].to_numpy(dtype=float)[-(m + 1):]
+    c = window["Close"].to_numpy(dtype=float)[-(m + 1):]
+
+    tr, dm_plus, dm_minus = _directional_movement(h, l, c)
+    smooth_tr    = _wilder_continue(tr,       period, s["smooth_tr"])
+    smooth_plus  = _wilder_continue(dm_plus,  period, s["smooth_plus"])
+    smooth_minus = _wilder_continue(dm_minus, period, s["smooth_minus"])
+    di_plus, di_minus, dx = _di_dx(smooth_tr, smooth_plus, smooth_minus)
+    adx = _wilder_continue_avg(dx, period, s["adx"])
+
+    cols["di_plus"]  = np.round(di_plus,  2)
+    cols["di_minus"] = np.round(di_minus, 2)
+    cols["adx"]      = np.round(adx,      2)
+    adx_series = pd.concat([tail["adx"].iloc[-1:], pd.Series(cols["adx"], index=new.index)])
+    cols["regime"]   = _classify_regime(adx_series).iloc[1:].to_numpy()
+
+    s.update(
+        smooth_tr=float(smooth_tr[-1]),
+        smooth_plus=float(smooth_plus[-1]),
+        smooth_minus=float(smooth_minus[-1]),
+        adx=float(adx[-1]),
+    )
+
+    # ── Parabolic SAR ─────────────────────────────────────────────────────────
+    # Zwei Vortage für die Tief/Hoch-Begrenzung, danach die neuen Zeilen
+    h2 = window["High"].to_numpy(dtype=float)[-(m + 2):]
+    l2 = window["Low"].to_numpy(dtype=float)[-(m + 2):]
+    psar = np.full(m + 2, np.nan)
+    bull = np.ones(m + 2, dtype=bool)
+    psar[1] = s["psar"]
+    bull[1] = s["psar_bull"]
+    af_start, af_step, af_max = params["psar"]
+    ep, af = _psar_loop(h2, l2, psar, bull, s["psar_ep"], s["psar_af"], 2, af_start, af_step, af_max)
+
+    cols["psar"]      = np.round(psar[2:], 4)
+    cols["psar_bull"] = bull[2:]
+    s.update(psar=float(psar[-1]), psar_bull=bool(bull[-1]), psar_ep=float(ep), psar_af=float(af))
+
+    # ── Gleitende Durchschnitte ───────────────────────────────────────────────
+    ema_cols = {}
+    for p in params["ema"]:
+        ema = _ema_continue(s["ema"][str(p)], close, p)
+        ema_cols[f"ema_{p}"] = ema.round(4)
+        s["ema"] = {**s["ema"], str(p): float(ema.iloc[-1])}
+    cols.update(ema_cols)
+    cols.update(_ma_context(close, ema_cols))
+
+    # ── Fenster-Indikatoren: Neuberechnung auf dem Ausschnitt ─────────────────
+    for fn in (add_bollinger_bands, add_donchian):
+        part = fn(window).iloc[-m:]
+        cols.update({col: part[col].to_numpy() for col in part.columns if col not in window.columns})
+
+    # ── RSI ───────────────────────────────────────────────────────────────────
+    delta = pd.concat([pd.Series([prev_close]), close.reset_index(drop=True)]).diff().iloc[1:]
+    delta.index = new.index
+    gain, loss = _gain_loss(delta)
+    avg_gain = _ewm_continue(s["avg_gain"], gain, com=params["rsi"] - 1)
+    avg_loss = _ewm_continue(s["avg_loss"], loss, com=params["rsi"] - 1)
+
+    cols["rsi"]         = _rsi_from_averages(avg_gain, avg_loss)
+    cols["rsi_zone"]    = _rsi_zone(cols["rsi"], *params["rsi_zone"])
+    cols["rsi_above50"] = cols["rsi"] > 50
+    s.update(avg_gain=float(avg_gain.iloc[-1]), avg_loss=float(avg_loss.iloc[-1]))
+
+    # ── MACD ──────────────────────────────────────────────────────────────────
+    fast, slow, signal = params["macd"]
+    ema_fast    = _ema_continue(s["ema_fast"], close, fast)
+    ema_slow    = _ema_continue(s["ema_slow"], close, slow)
+    macd_line   = ema_fast - ema_slow
+    signal_line = _ema_continue(s["macd_signal"], macd_line, signal)
+    hist        = macd_line - signal_line
+
+    cols["macd"]          = macd_line.round(4)
+    cols["macd_signal"]   = signal_line.round(4)
+    cols["macd_hist"]     = hist.round(4)
+    cols["macd_hist_dir"] = _hist_direction(pd.concat([pd.Series([s["macd_hist"]]), hist]))[1:]
+    s.update(
+        ema_fast=float(ema_fast.iloc[-1]),
+        ema_slow=float(ema_slow.iloc[-1]),
+        macd_signal=float(signal_line.iloc[-1]),
+        macd_hist=float(hist.iloc[-1]),
+    )
+
+    # ── Stochastik ────────────────────────────────────────────────────────────
+    part = add_stochastik(window).iloc[-m:]
+    cols.update({col: part[col].to_numpy() for col in ("stoch_k", "stoch_d", "stoch_zone")})
+
+    # ── OBV ───────────────────────────────────────────────────────────────────
+    direction = np.sign(delta).fillna(0)
+    obv = pd.concat([pd.Series([s["obv"]]), (direction * volume).reset_index(drop=True)]).cumsum().iloc[1:]
+    obv.index = new.index
+    obv_ema = _ema_continue(s["obv_ema"], obv, params["obv_ema"])
+
+    cols["obv"]       = obv.astype(int)
+    cols["obv_ema"]   = obv_ema.round(0).astype(float)
+    cols["obv_trend"] = _obv_trend(obv, obv_ema)
+    s.update(obv=float(obv.iloc[-1]), obv_ema=float(obv_ema.iloc[-1]))
+
+    # ── Volumen-Kontext ───────────────────────────────────────────────────────
+    part = add_volume_context(window).iloc[-m:]
+    cols.update({col: part[col].to_numpy() for col in part.columns if col not in window.columns})
+
+    rows = new[OHLCV].copy()
+    for col, values in cols.items():
+        if col in LABELS:
+            rows[col] = as_category(col, values)
+        else:
+            rows[col] = values.to_numpy() if isinstance(values, pd.Series) else values
+    rows = rows[[col for col in cached.columns if col in rows.columns]]
+
+    s["last_date"] = str(new.index[-1].date())
+    return rows, s
@@ -0,0 +1,249 @@
+"""
+Candlestick-Codes: Shape, Loc und Mehrtages-Muster (PRML)
+────────────────────────────────────────────────────────
+Formale Klassifikation jeder Kerze nach Lin et al. (2021), siehe
+03_ml_analyse/03b_features/candlestick_shape_loc.md. Vektorisiert über
+OHLC-Arrays – 1-D (eine Kursreihe) oder 2-D (Ticker × Tag, z.B. das Price
+Panel); gerechnet wird immer entlang der letzten Achse.
+
+Spalten die add_candle_codes() hinzufügt:
+    candle_shape : Shape 1–13 (0 = undefiniert, ATR noch nicht verfügbar)
+    candle_loc   : Loc 0–7 in der Reihenfolge LOC_LABELS (-1 = erste Kerze)
+    pattern2     : 2-Tages-Muster 0–168  = (Shape[t-1]−1)·13 + (Shape[t]−1)   (-1 = undefiniert)
+    pattern3     : 3-Tages-Muster 0–2196 = (Shape[t-2]−1)·169 + … (-1 = undefiniert)
+
+Shape-Schwellen relativ zur ATR (Mittel der True Range über ATR_PERIOD
+Tage): Körper ≤ DOJI·ATR → Doji-Familie, sonst nach Körperlänge
+kurz/mittel/lang/Limit. Die Limit-Formen (1, 12) gibt es im US-Markt ohne
+harte Limits nur als sehr starke Bewegung ohne Schatten.
+
+Die True-Range-Fenster werden je Fenster summiert (nicht per laufender
+Summe) – jeder Code hängt nur von den letzten ATR_PERIOD + 2 Kerzen ab und
+ist bei Berechnung auf einem Ausschnitt bitgleich zur Vollberechnung
+(Grundlage für extend_codes()).
+
+Verwendung:
+    from src.ta.muster.kerzen import add_candle_codes, pattern_codes, shape_codes
+
+    df     = add_candle_codes(df)
+    shapes = shape_codes(o, h, l, c)             # auch Ticker × Tag
+    codes  = pattern_codes(shapes, days=2)
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..indikatoren.spalten import emit_columns
+
+ATR_PERIOD = 10          # Paper: ATR10
+
+# Schwellen in Vielfachen der ATR
+DOJI          = 0.1      # Körper bis hier → Doji-Familie
+BODY_MEDIUM   = 0.7      # Körper darüber → mittel
+BODY_LONG     = 1.5      # Körper darüber → lang
+BODY_LIMIT    = 2.0      # Körper darüber und ohne Schatten → Limit-Form
+NO_SHADOW     = 0.1      # Schatten bis hier → "kein Schatten"
+SHADOW_MEDIUM = 0.3      # Schatten darüber → mittel (Spinning Top)
+SHADOW_LONG   = 1.0      # beide Schatten darüber → Long Doji
+SHADOW_SINGLE = 1.5      # einseitiger Schatten darüber → Gravestone/Dragonfly
+
+N_SHAPES = 13
+
+SHAPE_LABELS = {
+    1: "limit_bull", 2: "long_bull", 3: "medium_bull", 4: "short_bull",
+    5: "long_doji", 6: "short_doji", 7: "gravestone_doji", 8: "dragonfly_doji",
+    9: "short_bear", 10: "medium_bear", 11: "long_bear", 12: "limit_bear",
+    13: "spinning_top",
+}
+
+# Index = Code in candle_loc
+LOC_LABELS = ["BC_h", "BC_l", "BH_h", "BH_l", "BL_h", "BL_l", "BM_h", "BM_l"]
+
+CANDLE_COLUMNS = ["candle_shape", "candle_loc", "pattern2", "pattern3"]
+
+# Kerzen, von denen der letzte Code abhängt: ATR-Fenster + Vortag (TR) + 3-Tages-Muster
+TAIL_ROWS = ATR_PERIOD + 3
+
+STATE_VERSION = 1
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _shift(values: np.ndarray, fill=np.nan) -> np.ndarray:
+    """Wert des Vortags entlang der letzten Achse."""
+    result = np.empty_like(values)
+    result[..., 0] = fill
+    result[..., 1:] = values[..., :-1]
+    return result
+
+
+def _arrays(df: pd.DataFrame) -> tuple[np.ndarray, ...]:
+    return tuple(df[col].to_numpy(dtype=np.float64) for col in ("Open", "High", "Low", "Close"))
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def average_true_range(high, low, close, period: int = ATR_PERIOD) -> np.ndarray:
+    """
+    ATR als einfacher Mittelwert der True Range (Paper-Definition).
+    Erste Kerze: TR = High − Low. Die ersten period−1 Werte sind NaN.
+    """
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    prev = _shift(close)
+    tr = np.where(np.isnan(prev), high - low, np.fmax(high, prev) - np.fmin(low, prev))
+    result = np.full(tr.shape, np.nan)
+    if tr.shape[-1] >= period:
+        result[..., period - 1:] = np.lib.stride_tricks.sliding_window_view(tr, period, axis=-1).sum(axis=-1) / period
+    return result
+
+
+def shape_codes(open_, high, low, close, atr=None) -> np.ndarray:
+    """
+    Shape 1–13 je Kerze (0 = undefiniert: ATR fehlt oder Kurse fehlen).
+
+    Parameter:
+        open_, high, low, close : Arrays gleicher Form (1-D oder Ticker × Tag)
+        atr                     : ATR (Standard: average_true_range())
+
+    Rückgabe:
+        int8-Array in der Form der Eingabe
+    """
+    o, h, l, c = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    atr = average_true_range(h, l, c) if atr is None else np.asarray(atr, dtype=np.float64)
+
+    body  = np.abs(c - o)
+    upper = h - np.fmax(o, c)
+    lower = np.fmin(o, c) - l
+    doji  = body <= DOJI * atr
+    bare  = (upper <= NO_SHADOW * atr) & (lower <= NO_SHADOW * atr)
+
+    def body_class(limit, long, medium, short):
+        return np.select(
+            [(body > BODY_LIMIT * atr) & bare, body > BODY_LONG * atr, body > BODY_MEDIUM * atr],
+            [limit, long, medium], default=short,
+        )
+
+    doji_shape = np.select(
+        [
+            (upper > SHADOW_SINGLE * atr) & (lower <= NO_SHADOW * atr),
+            (lower > SHADOW_SINGLE * atr) & (upper <= NO_SHADOW * atr),
+            (upper > SHADOW_LONG * atr) & (lower > SHADOW_LONG * atr),
+            (upper > SHADOW_MEDIUM * atr) & (lower > SHADOW_MEDIUM * atr),
+        ],
+        [7, 8, 5, 13], default=6,
+    )
+    shape = np.where(doji, doji_shape, np.where(c > o, body_class(1, 2, 3, 4), body_class(12, 11, 10, 9)))
+
+    valid = np.isfinite(atr) & np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(c)
+    return np.where(valid, shape, 0).astype(np.int8)
+
+
+def loc_codes(high, low, close) -> np.ndarray:
+    """
+    Loc 0–7 je Kerze relativ zur Vorkerze (Reihenfolge LOC_LABELS), -1 für
+    die erste Kerze und fehlende Kurse. Gleichstand zählt als "nicht höher".
+
+    Rückgabe:
+        int8-Array in der Form der Eingabe
+    """
+    h, l, c = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    hp, lp, cp = _shift(h), _shift(l), _shift(c)
+    high_up, low_up, close_up = h > hp, l > lp, c > cp
+
+    group = np.select(
+        [high_up & ~low_up, high_up & low_up, ~high_up & ~low_up],
+        [0, 1, 2], default=3,
+    )
+    code = 2 * group + np.where(close_up, 0, 1)
+    valid = np.isfinite(h) & np.isfinite(l) & np.isfinite(c) & np.isfinite(hp) & np.isfinite(lp) & np.isfinite(cp)
+    return np.where(valid, code, -1).astype(np.int8)
+
+
+def pattern_codes(shapes, days: int = 2) -> np.ndarray:
+    """
+    Mehrtages-Muster aus aufeinanderfolgenden Shapes: Ziffern zur Basis 13,
+    älteste Kerze vorne. 2 Tage → 0–168, 3 Tage → 0–2196.
+
+    Rückgabe:
+        int16-Array in der Form der Eingabe, -1 wo eine der Kerzen
+        undefiniert ist oder weniger als `days` Kerzen vorliegen
+    """
+    shapes = np.asarray(shapes, dtype=np.int16)
+    code = np.zeros(shapes.shape, dtype=np.int16)
+    valid = np.ones(shapes.shape, dtype=bool)
+    for lag in range(days - 1, -1, -1):
+        s = shapes
+        for _ in range(lag):
+            s = _shift(s, fill=0)
+        code = code * N_SHAPES + (s - 1)
+        valid &= s > 0
+    return np.where(valid, code, -1).astype(np.int16)
+
+
+def add_candle_codes(df: pd.DataFrame, out: dict | None = None) -> pd.DataFrame:
+    """
+    Shape, Loc und 2-/3-Tages-Muster je Kerze (Spalten siehe Modul-Docstring).
+
+    Parameter:
+        df  : DataFrame mit Spalten Open, High, Low, Close
+        out : Spalten-Puffer (Builder-Modus, siehe spalten.py) – df wird nicht kopiert
+
+    Rückgabe:
+        DataFrame mit zusätzlichen Spalten: candle_shape, candle_loc, pattern2, pattern3
+    """
+    o, h, l, c = _arrays(df)
+    shapes = shape_codes(o, h, l, c)
+    return emit_columns(df, {
+        "candle_shape": shapes,
+        "candle_loc":   loc_codes(h, l, c),
+        "pattern2":     pattern_codes(shapes, 2),
+        "pattern3":     pattern_codes(shapes, 3),
+    }, out)
+
+
+# ── Inkrementelle Fortschreibung (Feature Store) ──────────────────────────────
+# Kein rekursiver Zustand: die neuen Codes werden auf den letzten TAIL_ROWS
+# Cache-Zeilen plus den neuen Zeilen berechnet. Der Zustand vermerkt nur das
+# letzte Datum, damit ein fremder Cache erkannt wird.
+
+def init_state(df: pd.DataFrame, fingerprints: dict | None = None) -> dict | None:
+    """
+    Zustand nach der letzten Zeile von df (None bei leerem df); fingerprints
+    der erzeugenden Pipeline-Schritte werden mit abgelegt.
+    """
+    if df.empty:
+        return None
+    return {"version": STATE_VERSION, "fingerprints": fingerprints, "last": str(df.index.max())}
+
+
+def state_matches(state: dict | None, cached: pd.DataFrame, fingerprints: dict | None = None) -> bool:
+    """True wenn der Zustand zum Cache und (falls angegeben) zu den Fingerprints passt."""
+    return (
+        state is not None
+        and state.get("version") == STATE_VERSION
+        and (fingerprints is None or state.get("fingerprints") == fingerprints)
+        and not cached.empty
+        and state.get("last") == str(cached.index.max())
+    )
+
+
+def extend_codes(cached: pd.DataFrame, new: pd.DataFrame, state: dict) -> tuple[pd.DataFrame, dict]:
+    """
+    Codes für neue Zeilen, bitgleich zur Vollberechnung.
+
+    Parameter:
+        cached : bisheriger Feature-DataFrame (mit OHLC)
+        new    : neue Zeilen (OHLC, ggf. schon mit weiteren Spalten)
+        state  : Zustand aus init_state()
+
+    Rückgabe:
+        (new mit CANDLE_COLUMNS, neuer Zustand)
+    """
+    ohlc = ["Open", "High", "Low", "Close"]
+    tail = pd.concat([cached[ohlc].iloc[-TAIL_ROWS:], new[ohlc]])
+    cols: dict = {}
+    add_candle_codes(tail, out=cols)
+    rows = new.copy()
+    for col in CANDLE_COLUMNS:
+        rows[col] = cols[col][-len(new):]
+    return rows, {**state, "last": str(new.index.max())}
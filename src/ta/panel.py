@@ -0,0 +1,226 @@
+"""
+TA-Modul: Panel-Engine für viele Ticker
+───────────────────────────────────────
+Berechnet alle Indikatoren aus add_all_indicators() für ein ganzes
+Ticker-Universum in einem Durchlauf – spaltenweise über ein 2-D-Panel
+(Datum × Ticker) statt Ticker für Ticker.
+
+Eingabe:
+    dict {"Open", "High", "Low", "Close", "Volume"} → DataFrame (Datum × Ticker)
+    Fehlende Tage eines Tickers (späterer Börsengang, Handelspausen) sind NaN.
+
+Ausgabe:
+    dict {Indikator-Spalte} → DataFrame (Datum × Ticker)
+    Bool-Spalten als "boolean", obv als "Int64" (pandas-Nullable-Typen),
+    damit fehlende Tage als <NA> markiert werden können. Label-Spalten als
+    Categorical mit der Code-Tabelle aus kategorien.py.
+
+Genauigkeit:
+    Jeder Ticker wird vor der Berechnung "verdichtet": seine gültigen Zeilen
+    rücken lückenlos an den Anfang des Arrays. Damit sieht jede Spalte exakt
+    die Zeitreihe, die auch der Einzel-Ticker-DataFrame enthält. pandas-
+    Operationen (ewm, rolling) laufen spaltenweise mit denselben Kernels,
+    die Rekursionen (Wilder, Parabolic SAR) über die 2-D-Kerne aus kernels.py
+    (numba oder Python, mit identischer Rechenreihenfolge). Ergebnisse sind
+    bitgleich mit den Einzel-Ticker-Funktionen.
+
+Verwendung:
+    from src.ta.panel import build_panel, add_all_indicators_panel, ticker_frame
+
+    panel = build_panel({t: fetch_prices(t) for t in tickers})
+    ind   = add_all_indicators_panel(panel)
+    df    = ticker_frame(panel, ind, "AAPL")   # wie add_all_indicators(AAPL)
+"""
+
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from .indikatoren.adx import (
+    _classify_regime, _di_dx, _directional_movement,
+    add_adx, add_parabolic_sar,
+)
+from .indikatoren.durchschnitte import (
+    EMA_PERIODS, _bollinger_columns, _donchian_columns, _moving_average_columns,
+    add_bollinger_bands, add_donchian,
+)
+from .indikatoren.oszillatoren import (
+    _macd_columns, _rsi_columns, _stochastik_columns,
+    add_macd, add_rsi, add_stochastik,
+)
+from .indikatoren.kategorien import LABELS, category_dtype
+from .indikatoren.kernels import psar_2d, wilder_smooth_2d, wilder_smooth_avg_2d
+from .indikatoren.volumen import (
+    _obv_columns, _volume_context_columns,
+    add_obv, add_volume_context,
+)
+
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+# ── Interne Hilfsfunktionen ───────────────────────────────────────────────────
+
+def _defaults(fn) -> dict:
+    """Standard-Parameter einer add_*-Funktion – hält Panel und Einzel-Ticker synchron."""
+    return {
+        name: p.default
+        for name, p in inspect.signature(fn).parameters.items()
+        if p.default is not inspect.Parameter.empty and name != "out"
+    }
+
+
+def _compact(values: np.ndarray, order: np.ndarray, lengths: np.ndarray, fill: float | None) -> np.ndarray:
+    """
+    Verdichtet jede Spalte: gültige Zeilen zuerst (chronologisch), danach Füllwerte.
+
+    Die Füllzeilen liegen zeitlich NACH allen echten Werten; da alle Indikatoren
+    kausal sind, beeinflussen sie die echten Zeilen nicht. fill=None wiederholt
+    den letzten gültigen Wert, sonst wird der konstante Wert eingesetzt.
+    """
+    out  = np.take_along_axis(values, order, axis=0)
+    tail = np.arange(len(out))[:, None] >= lengths[None, :]
+    if fill is None:
+        last = out[np.maximum(lengths - 1, 0), np.arange(out.shape[1])]
+        out  = np.where(tail, last[None, :], out)
+    else:
+        out = np.where(tail, fill, out)
+    return out
+
+
+def _scatter(
+    col: str,
+    values,
+    order: np.ndarray,
+    valid: np.ndarray,
+    index: pd.Index,
+    columns: pd.Index,
+) -> pd.DataFrame:
+    """Kehrt _compact um: Werte zurück an ihr Datum, fehlende Tage maskieren."""
+    values = values.to_numpy() if isinstance(values, pd.DataFrame) else np.asarray(values)
+    out = np.empty_like(values)
+    np.put_along_axis(out, order, values, axis=0)
+
+    frame = pd.DataFrame(out, index=index, columns=columns)
+    if values.dtype == bool:
+        frame = frame.astype("boolean")
+    elif values.dtype.kind in "iu":
+        frame = frame.astype("Int64")
+    frame = frame.mask(~valid)
+    if col in LABELS:
+        frame = frame.astype(category_dtype(col))
+    return frame
+
+
+def _adx_panel(high, low, close, lengths, period: int) -> dict:
+    """ADX/DMI für alle Ticker – wie add_adx()."""
+    tr, dm_plus, dm_minus = _directional_movement(high, low, close)
+
+    smooth_tr    = wilder_smooth_2d(tr,       period)
+    smooth_plus  = wilder_smooth_2d(dm_plus,  period)
+    smooth_minus = wilder_smooth_2d(dm_minus, period)
+
+    di_plus, di_minus, dx = _di_dx(smooth_tr, smooth_plus, smooth_minus)
+    adx = wilder_smooth_avg_2d(dx, period, np.maximum(lengths - 1, 0))
+
+    pad = np.full((1, high.shape[1]), np.nan)
+    adx = pd.DataFrame(np.round(np.vstack([pad, adx]), 2))
+    return {
+        "di_plus":  np.round(np.vstack([pad, di_plus]),  2),
+        "di_minus": np.round(np.vstack([pad, di_minus]), 2),
+        "adx":      adx,
+        "regime":   _classify_regime(adx),
+    }
+
+
+# ── Öffentliche API ───────────────────────────────────────────────────────────
+
+def build_panel(frames: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """
+    Baut aus Einzel-Ticker-DataFrames ein OHLCV-Panel.
+
+    Parameter:
+        frames : {ticker: DataFrame mit Open, High, Low, Close, Volume}
+
+    Rückgabe:
+        {feld: DataFrame (Datum × Ticker)} – Vereinigung aller Handelstage
+    """
+    return {
+        field: pd.concat({t: df[field] for t, df in frames.items()}, axis=1).sort_index()
+        for field in OHLCV
+    }
+
+
+def add_all_indicators_panel(panel: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """
+    Wendet alle TA-Indikatoren auf ein OHLCV-Panel an.
+
+    Parameter:
+        panel : {"Open", "High", "Low", "Close", "Volume"} → DataFrame (Datum × Ticker)
+
+    Rückgabe:
+        {indikator_spalte: DataFrame (Datum × Ticker)} in derselben
+        Spaltenreihenfolge wie add_all_indicators()
+    """
+    close_raw = panel["Close"]
+    index, columns = close_raw.index, close_raw.columns
+    valid   = close_raw.notna().to_numpy()
+    order   = np.argsort(~valid, axis=0, kind="stable")
+    lengths = valid.sum(axis=0)
+
+    fields = {
+        f: _compact(panel[f].reindex(index=index, columns=columns).to_numpy(dtype=float),
+                    order, lengths, 0.0 if f == "Volume" else None)
+        for f in OHLCV
+    }
+    high, low, close = fields["High"], fields["Low"], fields["Close"]
+    c_df = pd.DataFrame(close)
+    h_df = pd.DataFrame(high)
+    l_df = pd.DataFrame(low)
+    v_df = pd.DataFrame(fields["Volume"])
+
+    cols: dict = {}
+    cols.update(_adx_panel(high, low, close, lengths, **_defaults(add_adx)))
+
+    psar, bull = psar_2d(high, low, **_defaults(add_parabolic_sar))
+    cols["psar"]      = np.round(psar, 4)
+    cols["psar_bull"] = bull
+
+    cols.update(_moving_average_columns(c_df, EMA_PERIODS))
+    cols.update(_bollinger_columns(c_df, **_defaults(add_bollinger_bands)))
+    cols.update(_donchian_columns(h_df, l_df, c_df, **_defaults(add_donchian)))
+    cols.update(_rsi_columns(c_df, **_defaults(add_rsi)))
+    cols.update(_macd_columns(c_df, **_defaults(add_macd)))
+    cols.update(_stochastik_columns(h_df, l_df, c_df, **_defaults(add_stochastik)))
+    cols.update(_obv_columns(c_df, v_df, **_defaults(add_obv)))
+
+    vol_kwargs = _defaults(add_volume_context)
+    cols.update(_volume_context_columns(c_df, v_df, vol_kwargs["sma_period"]))
+
+    return {col: _scatter(col, values, order, valid, index, columns) for col, values in cols.items()}
+
+
+def ticker_frame(
+    panel: dict[str, pd.DataFrame],
+    indicators: dict[str, pd.DataFrame],
+    ticker: str,
+) -> pd.DataFrame:
+    """
+    Schneidet einen Ticker als DataFrame aus – Format wie add_all_indicators().
+
+    Nur Handelstage des Tickers; Nullable-Typen werden zurück in bool/int64
+    gewandelt. Volume bleibt float (Panel enthält NaN für fehlende Tage).
+    """
+    rows = panel["Close"][ticker].notna()
+    data = {f: panel[f].loc[rows, ticker] for f in OHLCV}
+    for col, frame in indicators.items():
+        s = frame.loc[rows, ticker]
+        if s.dtype == "boolean":
+            s = s.astype(bool)
+        elif s.dtype == "Int64":
+            s = s.astype("int64")
+        data[col] = s
+    df = pd.DataFrame(data)
+    df.index.name = panel["Close"].index.name
+    return df
@@ -0,0 +1,62 @@
+"""
+DTW-Suche gegen Brute Force: DTW zu allen Fenstern, dann gierige
+Überlappungs-Unterdrückung in Distanz-Reihenfolge.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import price_panel
+from src.ml import dtw_search
+
+LENGTH = 20
+
+
+@pytest.fixture(scope="module")
+def setup(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("dtw")
+    rng = np.random.default_rng(0)
+    frames = {}
+    for i in range(3):
+        n = 300 + 25 * i
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        frames[f"T{i}"] = pd.DataFrame(
+            {"Open": close, "High": close, "Low": close, "Close": close, "Volume": np.ones(n, dtype=np.int64)},
+            index=pd.bdate_range("2015-01-01", periods=n, name="Date"),
+        )
+    panel = price_panel.open_panel(price_panel.write_panel(frames, str(tmp / "panel")))
+
+    index_dir = dtw_search.INDEX_DIR
+    dtw_search.INDEX_DIR = str(tmp / "index")
+    try:
+        dtw_search.build_index(panel, length=LENGTH)
+        index = dtw_search.open_index(length=LENGTH)
+    finally:
+        dtw_search.INDEX_DIR = index_dir
+    return index, rng
+
+
+def _brute_force(index: dict, query: np.ndarray, k: int, exclusion: int) -> np.ndarray:
+    q = dtw_search.znorm(query)
+    windows = np.asarray(index["windows"], dtype=np.float64)
+    owner = np.asarray(index["ticker"])
+    dist = np.array([dtw_search.dtw_distance(q, w, index["radius"]) for w in windows])
+    chosen = []
+    for j in np.argsort(dist, kind="stable"):
+        if any(owner[c] == owner[j] and abs(c - j) < exclusion for c in chosen):
+            continue
+        chosen.append(j)
+        if len(chosen) == k:
+            break
+    return dist[chosen]
+
+
+@pytest.mark.parametrize("k, exclusion", [(10, 40), (5, LENGTH), (8, 1)])
+def test_search_matches_brute_force(setup, k, exclusion):
+    index, rng = setup
+    for _ in range(15):
+        query = np.exp(np.cumsum(rng.normal(0, 0.02, LENGTH)))
+        expected = _brute_force(index, query, k, exclusion)
+        result = dtw_search.search(index, query, k=k, exclusion=exclusion)
+        np.testing.assert_allclose(result["distance"].to_numpy(), expected, atol=1e-6)
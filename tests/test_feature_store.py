@@ -0,0 +1,130 @@
+"""
+Feature Store: inkrementelle Fortschreibung gegen die Vollberechnung (je
+Spalte bitgleich) und I/O beim Anhängen – nur die letzten Row-Groups lesen,
+nur neue Zeilen schreiben.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.data import feature_store
+
+
+def _ohlcv(n: int, seed: int) -> pd.DataFrame:
+    # Lange Historie auf hohem Kursniveau: hier kippte die laufende Summe von
+    # rolling().mean() Rundungs-Grenzfälle von bb_mid
+    rng   = np.random.default_rng(seed)
+    close = 3700 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high  = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low   = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {"Open": open_.round(3), "High": high.round(3), "Low": low.round(3), "Close": close.round(3),
+         "Volume": rng.integers(100_000, 10_000_000, n)},
+        index=pd.bdate_range("2000-01-03", periods=n, name="Date"),
+    )
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Feature Store im tmp-Verzeichnis; Kurse bis prices["n"] sind "verfügbar"."""
+    prices = {"raw": None, "n": 0}
+    monkeypatch.setattr(feature_store, "FEATURES_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        feature_store, "fetch_prices", lambda ticker, *a, **k: prices["raw"].iloc[:prices["n"]].copy(),
+    )
+    monkeypatch.setattr(
+        feature_store, "_is_up_to_date", lambda last: last >= prices["raw"].index[prices["n"] - 1],
+    )
+    return prices
+
+
+def _assert_columns_equal(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert list(result.columns) == list(expected.columns)
+    assert result.index.equals(expected.index)
+    for col in expected.columns:
+        a, b = result[col], expected[col]
+        if a.dtype.kind == "f":
+            np.testing.assert_array_equal(a.to_numpy(), b.to_numpy(), err_msg=col)
+        else:
+            assert a.astype(object).equals(b.astype(object)), col
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_matches_full(store, seed):
+    raw = _ohlcv(6000, seed)
+    store["raw"], store["n"] = raw, len(raw) - 60
+    feature_store.get_features("X")
+
+    for step in (1, 1, 3, 5, 20, 30):
+        store["n"] += step
+        feature_store.get_features("X", last_n=1)
+
+    assert len(feature_store.parquet_parts("X")) == 7
+    _assert_columns_equal(feature_store.get_features("X"), feature_store._run_pipeline(raw.copy()))
+
+
+def test_update_reads_tail_and_writes_only_new_rows(store, monkeypatch):
+    raw = _ohlcv(3000, 3)
+    store["raw"], store["n"] = raw, 2990
+    feature_store.get_features("X")
+    (base,) = feature_store.parquet_parts("X")
+    base_mtime = os.stat(base).st_mtime_ns
+
+    read = []
+    original = pq.ParquetFile.read_row_groups
+
+    def spy(self, groups, *args, **kwargs):
+        read.append(len(groups))
+        return original(self, groups, *args, **kwargs)
+
+    monkeypatch.setattr(pq.ParquetFile, "read_row_groups", spy)
+    store["n"] = 2995
+    df = feature_store.get_features("X", columns=["bb_mid"], last_n=5)
+
+    # Fortschreibung liest nur die Row-Groups mit den letzten TAIL_ROWS Zeilen
+    assert read[0] <= -(-feature_store.TAIL_ROWS // feature_store.ROW_GROUP_SIZE) + 1
+    parts = feature_store.parquet_parts("X")
+    assert parts[0] == base and len(parts) == 2
+    assert os.stat(base).st_mtime_ns == base_mtime  # Bestand nicht umgeschrieben
+    assert pq.ParquetFile(parts[1]).metadata.num_rows == 5
+    assert list(df.index) == list(raw.index[2990:2995])
+
+
+def test_parts_are_compacted(store, monkeypatch):
+    monkeypatch.setattr(feature_store, "MAX_PARTS", 3)
+    raw = _ohlcv(1000, 4)
+    store["raw"], store["n"] = raw, 995
+    feature_store.get_features("X")
+
+    for _ in range(5):
+        store["n"] += 1
+        feature_store.get_features("X", last_n=1)
+        assert len(feature_store.parquet_parts("X")) <= 3
+
+    _assert_columns_equal(feature_store.get_features("X"), feature_store._run_pipeline(raw.copy()))
+
+
+def add_ticker_code(df: pd.DataFrame, ticker: str, out: dict | None = None) -> pd.DataFrame:
+    out["ticker_code"] = np.full(len(df), sum(map(ord, ticker)), dtype=np.int64)
+    return df
+
+
+def test_context_steps_receive_the_ticker(store, monkeypatch):
+    step = {"fn": add_ticker_code, "reads": [], "writes": ["ticker_code"], "context": ["ticker"]}
+    monkeypatch.setattr(feature_store, "FEATURE_PIPELINE", [*feature_store.FEATURE_PIPELINE, step])
+    raw = _ohlcv(400, 5)
+    store["raw"], store["n"] = raw, 390
+
+    df = feature_store.get_features("AB")
+    assert (df["ticker_code"] == ord("A") + ord("B")).all()
+    assert not os.path.exists(feature_store._state_path("AB"))    # nicht fortschreibbar
+
+    store["n"] = 400
+    df = feature_store.get_features("AB", columns=["ticker_code"])
+    assert len(df) == 400 and (df["ticker_code"] == ord("A") + ord("B")).all()
+    assert len(feature_store.parquet_parts("AB")) == 1             # voll neu berechnet
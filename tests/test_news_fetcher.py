@@ -0,0 +1,155 @@
+"""
+News Fetcher gegen einen lokalen Mock-Server (http.server) statt Alpha Vantage.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from src.data import news_fetcher, news_store
+
+
+class _Api:
+    """Zustand des Mock-Servers: Antwort-Skript, Artikel je Ticker, Request-Protokoll."""
+
+    def __init__(self):
+        self.script = []            # vorab festgelegte Antworten: (status, body)
+        self.articles = {}          # ticker → [Feed-Einträge]
+        self.requests = []          # (Zeit, Query-Parameter)
+        self.lock = threading.Lock()
+
+    def respond(self, params: dict) -> tuple[int, dict]:
+        with self.lock:
+            self.requests.append((time.monotonic(), params))
+            if self.script:
+                return self.script.pop(0)
+        first, last = params["time_from"], params["time_to"]
+        feed = [
+            item for item in self.articles.get(params["tickers"], [])
+            if first <= item["time_published"] <= last
+        ]
+        return 200, {"items": str(len(feed)), "feed": feed[: int(params["limit"])]}
+
+
+def _article(url: str, published: str, tickers: list[str]) -> dict:
+    return {
+        "title": f"Titel {url}", "url": url, "time_published": published,
+        "summary": "…", "source": "Test",
+        "overall_sentiment_score": 0.1, "overall_sentiment_label": "Neutral",
+        "ticker_sentiment": [
+            {"ticker": t, "relevance_score": "0.5", "ticker_sentiment_score": "0.25",
+             "ticker_sentiment_label": "Somewhat-Bullish"}
+            for t in tickers
+        ],
+    }
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    state = _Api()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            status, body = state.respond(params)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(news_store, "STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(news_fetcher, "NEWS_DIR", str(tmp_path / "news"))
+    monkeypatch.setattr(news_fetcher, "BACKOFF", 0.05)
+    state.url = f"http://127.0.0.1:{server.server_address[1]}/query"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _fetch(api, tickers, dates, **kwargs):
+    return news_fetcher.fetch_news_many(
+        tickers, dates, api_key="test", url=api.url, rate_per_minute=60_000, **kwargs,
+    )
+
+
+@pytest.mark.parametrize("throttle", [
+    (429, {}),
+    (200, {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}),
+])
+def test_throttling_is_retried_with_backoff(api, throttle):
+    api.articles["AAPL"] = [_article("a1", "20250303T080000", ["AAPL"])]
+    api.script = [throttle, throttle]
+
+    news = _fetch(api, ["AAPL"], ["2025-03-03"])
+
+    assert list(news["AAPL"]["2025-03-03"]["title"]) == ["Titel a1"]
+    times = [t for t, _ in api.requests]
+    assert len(times) == 3
+    assert times[1] - times[0] >= news_fetcher.BACKOFF
+    assert times[2] - times[1] >= 2 * news_fetcher.BACKOFF
+
+
+def test_full_feed_is_halved_recursively(api, monkeypatch):
+    monkeypatch.setattr(news_fetcher, "FEED_LIMIT", 3)
+    dates = [f"2025-03-{d:02d}" for d in range(3, 8)]
+    api.articles["AAPL"] = [
+        _article(f"a{i}", d.replace("-", "") + "T080000", ["AAPL"]) for i, d in enumerate(dates)
+    ]
+
+    news = _fetch(api, ["AAPL"], dates)
+
+    assert sorted(news["AAPL"]) == dates
+    assert len(api.requests) > 1
+    assert all(len(df) == 1 for df in news["AAPL"].values())
+
+
+def test_shared_articles_are_stored_once(api):
+    shared = _article("shared", "20250303T070000", ["AAPL", "MSFT"])
+    api.articles["AAPL"] = [shared, _article("only-aapl", "20250303T071500", ["AAPL"])]
+    api.articles["MSFT"] = [shared]
+
+    news = _fetch(api, ["AAPL", "MSFT"], ["2025-03-03"])
+
+    assert len(news["AAPL"]["2025-03-03"]) == 2
+    assert list(news["MSFT"]["2025-03-03"]["title"]) == ["Titel shared"]
+    articles = news_store.read_articles("2025-03-03", "2025-03-03")
+    assert sorted(articles["url"]) == ["only-aapl", "shared"]
+    links = news_store.read_sentiment(None, "2025-03-03", "2025-03-03")
+    assert len(links) == 3                 # AAPL×2, MSFT×1 – je (Artikel, Ticker) einmal
+
+
+def test_only_closed_days_are_marked_fetched(api, monkeypatch):
+    # "heute" = 2025-03-05 vor 09:30 New York: Fenster noch offen
+    monkeypatch.setattr(news_fetcher, "_window_closed", lambda d: d < "2025-03-05")
+    dates = ["2025-03-04", "2025-03-05"]
+
+    _fetch(api, ["AAPL"], dates)          # leere Feeds
+    assert news_store.fetched(["AAPL"], dates[0], dates[-1]) == {("AAPL", "2025-03-04")}
+
+    api.articles["AAPL"] = [_article("late", "20250305T090000", ["AAPL"])]
+    before = len(api.requests)
+    news = _fetch(api, ["AAPL"], dates)
+
+    assert len(api.requests) == before + 1
+    assert api.requests[-1][1]["time_from"] == "20250305T0000"
+    assert list(news["AAPL"]["2025-03-05"]["title"]) == ["Titel late"]
+
+
+def test_window_closed():
+    assert news_fetcher._window_closed("2020-01-02")
+    tomorrow = (pd.Timestamp.now(tz=news_fetcher.MARKET_TZ) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert not news_fetcher._window_closed(tomorrow)
@@ -0,0 +1,58 @@
+"""
+Panel-Engine gegen add_all_indicators() je Ticker: bitgleich für alle
+Spalten, auch bei ungleich langen Historien und Handelslücken – für jedes
+exakte Kernel-Backend.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta import TA_run
+from src.ta.indikatoren import kernels
+from src.ta.panel import add_all_indicators_panel, build_panel, ticker_frame
+
+
+def _ohlcv(n: int, seed: int, start: str) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high  = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low   = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {"Open": open_.round(4), "High": high.round(4), "Low": low.round(4), "Close": close.round(4),
+         "Volume": rng.integers(100_000, 10_000_000, n)},
+        index=pd.bdate_range(start, periods=n, name="Date"),
+    )
+
+
+@pytest.fixture(scope="module")
+def frames():
+    gap = _ohlcv(500, 3, "2019-01-02")
+    return {
+        "LONG":  _ohlcv(600, 1, "2019-01-02"),
+        "LATE":  _ohlcv(350, 2, "2020-01-01"),                  # späterer Börsengang
+        "GAP":   gap.drop(gap.index[200:230]),                  # Handelspause
+        "SHORT": _ohlcv(40, 4, "2021-01-04"),                   # kürzer als EMA 200 / ADX-Start
+    }
+
+
+@pytest.mark.parametrize("backend", [b for b in ("python", "numba") if b in kernels.available_backends()])
+def test_panel_matches_single_ticker(frames, backend, monkeypatch):
+    monkeypatch.setattr(kernels, "_backend", backend)
+    panel = build_panel(frames)
+    indicators = add_all_indicators_panel(panel)
+
+    for ticker, df in frames.items():
+        expected = TA_run.add_all_indicators(df)
+        result   = ticker_frame(panel, indicators, ticker)
+
+        assert list(result.columns) == list(expected.columns)
+        assert result.index.equals(expected.index)
+        for col in expected.columns.drop("Volume"):
+            a, b = result[col], expected[col]
+            if isinstance(b.dtype, pd.CategoricalDtype) or b.dtype == object:
+                assert a.astype(object).equals(b.astype(object)), f"{ticker}.{col}"
+            else:
+                np.testing.assert_array_equal(a.to_numpy(), b.to_numpy(), err_msg=f"{ticker}.{col}")
+        np.testing.assert_array_equal(result["Volume"].to_numpy(), expected["Volume"].to_numpy(dtype=float))
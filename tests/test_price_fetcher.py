@@ -0,0 +1,161 @@
+"""
+Price Fetcher gegen ein lokales yfinance-Double (yf.download / yf.Ticker)
+und einen Price Store im tmp-Verzeichnis.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import price_fetcher, price_store
+
+END = "2023-06-01"
+
+
+def _ohlcv(seed: int, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return pd.DataFrame(
+        {
+            "Open": close * 0.99, "High": close * 1.01, "Low": close * 0.98, "Close": close,
+            "Volume": rng.integers(1_000, 10_000, len(dates)).astype("int64"),
+        },
+        index=dates.rename("Date"),
+    )
+
+
+class _Yf:
+    """Ersatz für das yfinance-Modul: feste Kurse je Ticker, Protokoll der Aufrufe."""
+
+    def __init__(self):
+        days = pd.bdate_range("2023-01-02", END, inclusive="left").as_unit("ns")   # wie im Store
+        self.prices = {
+            "A":   _ohlcv(1, days),
+            "B":   _ohlcv(2, days),
+            "C":   _ohlcv(3, days),
+            "D":   _ohlcv(4, days),
+            "GAP": _ohlcv(5, days[::2]),      # handelt nur jeden zweiten Tag
+        }
+        self.downloads = []                   # (Ticker, start, end)
+        self.lookups = []                     # Ticker der .info-Abfragen
+        self.failing = set()                  # .info wirft einmalig eine Exception
+
+    def download(self, tickers, start, end, **kwargs):
+        self.downloads.append((tuple(tickers) if isinstance(tickers, list) else tickers, start, end))
+        window = {
+            t: df.loc[(df.index >= start) & (df.index < end)]
+            for t, df in self.prices.items() if t in tickers
+        }
+        if not any(len(df) for df in window.values()):
+            return pd.DataFrame()
+        # Wie yfinance: gemeinsamer Datumsindex, unbekannte Ticker als NaN-Spalten
+        index = pd.DatetimeIndex(sorted(set().union(*(df.index for df in window.values()))), name="Date")
+        frames = {
+            t: window[t].reindex(index) if t in window else pd.DataFrame(np.nan, index, price_store.COLUMNS)
+            for t in tickers
+        }
+        out = pd.concat(frames, axis=1)
+        out.columns.names = ["Ticker", "Price"]
+        return out
+
+    def Ticker(self, ticker):
+        yf = self
+
+        class _Ticker:
+            @property
+            def info(self):
+                yf.lookups.append(ticker)
+                if ticker in yf.failing:
+                    yf.failing.discard(ticker)
+                    raise RuntimeError("Rate limit")
+                return {"longName": f"{ticker} Inc."}
+
+        return _Ticker()
+
+
+@pytest.fixture
+def yf(tmp_path, monkeypatch):
+    fake = _Yf()
+    monkeypatch.setattr(price_fetcher.yf, "download", fake.download)
+    monkeypatch.setattr(price_fetcher.yf, "Ticker", fake.Ticker)
+    monkeypatch.setattr(price_fetcher, "PRICES_DIR", str(tmp_path / "prices"))
+    monkeypatch.setattr(price_fetcher, "NAMES_FILE", str(tmp_path / "prices" / "names.json"))
+    monkeypatch.setattr(price_store, "STORE_DIR", str(tmp_path / "prices" / "ohlcv"))
+    return fake
+
+
+def test_batch_is_split_per_ticker(yf):
+    result = price_fetcher._fetch_batch_from_yfinance(["A", "GAP", "NOPE"], "2023-01-01", END)
+
+    assert sorted(result) == ["A", "GAP"]                 # NOPE: nur NaN → fehlt
+    for ticker, df in result.items():
+        pd.testing.assert_frame_equal(df, yf.prices[ticker], check_freq=False)
+        assert df.columns.name is None
+        assert df["Volume"].dtype == "int64"
+    assert yf.downloads == [(("A", "GAP", "NOPE"), "2023-01-01", END)]
+
+
+def test_batch_without_any_data_is_empty(yf):
+    assert price_fetcher._fetch_batch_from_yfinance(["NOPE", "NADA"], "2023-01-01", END) == {}
+
+
+def test_fetch_many_groups_by_incremental_start(yf):
+    for ticker, last in [("A", "2023-01-31"), ("B", "2023-01-31"), ("C", "2023-02-28")]:
+        price_store.append(ticker, yf.prices[ticker].loc[:last])
+
+    result = price_fetcher.fetch_many(["A", "B", "C", "D", "NOPE", "A"], start="2023-01-01", end=END)
+
+    assert sorted(yf.downloads) == sorted([
+        (("A", "B"),    "2023-02-01", END),
+        (("C",),        "2023-03-01", END),
+        (("D", "NOPE"), "2023-01-01", END),
+    ])
+    assert sorted(result) == ["A", "B", "C", "D"]
+    for ticker in result:
+        pd.testing.assert_frame_equal(result[ticker], yf.prices[ticker], check_freq=False)
+
+
+def test_fetch_many_respects_batch_size(yf):
+    price_fetcher.fetch_many(["A", "B", "C", "D", "GAP"], start="2023-01-01", end=END, batch_size=2)
+
+    assert [len(tickers) for tickers, _, _ in yf.downloads] == [2, 2, 1]
+
+
+def test_new_bars_are_appended_to_the_store(yf):
+    price_store.append("A", yf.prices["A"].loc[:"2023-01-31"])
+    first = price_store._parts("A")
+
+    price_fetcher.fetch_many(["A"], end=END)
+
+    parts = price_store._parts("A")
+    assert len(parts) == 2 and first[0] in parts          # alte Datei bleibt unverändert
+    pd.testing.assert_frame_equal(price_store.read("A"), yf.prices["A"], check_freq=False)
+
+
+def test_up_to_date_cache_is_not_requested(yf, monkeypatch):
+    price_store.append("A", yf.prices["A"])
+    monkeypatch.setattr(price_fetcher, "_is_up_to_date", lambda df: True)
+
+    result = price_fetcher.fetch_many(["A"], end=END)
+
+    assert yf.downloads == []
+    pd.testing.assert_frame_equal(result["A"], yf.prices["A"], check_freq=False)
+
+
+def test_company_names_are_cached_and_failures_retried(yf):
+    yf.failing = {"B"}
+
+    names = price_fetcher.get_company_names(["A", "B"])
+
+    assert names == {"A": "A Inc.", "B": "B"}             # Fehlschlag → Symbol
+    with open(price_fetcher.NAMES_FILE) as f:
+        assert json.load(f) == {"A": "A Inc."}
+
+    names = price_fetcher.get_company_names(["A", "B"])
+
+    assert names == {"A": "A Inc.", "B": "B Inc."}
+    assert yf.lookups == ["A", "B", "B"]                  # A aus names.json
+    with open(price_fetcher.NAMES_FILE) as f:
+        assert json.load(f) == {"A": "A Inc.", "B": "B Inc."}
@@ -0,0 +1,50 @@
+"""
+score_history() gegen run(): der letzte Handelstag der Historie liefert
+dieselben Signale, denselben Score und dieselbe Klassifikation wie die
+Live-Auswertung desselben DataFrames.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta import TA_run
+
+
+def _ohlcv(n: int, seed: int) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high  = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low   = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    return pd.DataFrame(
+        {"Open": open_.round(4), "High": high.round(4), "Low": low.round(4), "Close": close.round(4),
+         "Volume": rng.integers(100_000, 10_000_000, n)},
+        index=pd.bdate_range("2018-01-02", periods=n, name="Date"),
+    )
+
+
+@pytest.fixture(scope="module", params=[0, 1, 2])
+def indicators(request):
+    return TA_run.add_all_indicators(_ohlcv(500, request.param))
+
+
+def test_last_bar_of_history_matches_run(indicators):
+    for end in range(250, len(indicators) + 1, 5):
+        df     = indicators.iloc[:end]
+        live   = TA_run.run(df)
+        hist   = TA_run.score_history(df)
+        last   = hist["signals"].iloc[-1]
+
+        assert {k: None if pd.isna(v) else bool(v) for k, v in last.items()} == live["signals"], end
+        assert hist["score"].iloc[-1] == live["score"], end
+        assert hist["signal"].iloc[-1] == live["signal"], end
+        assert hist["staerke"].iloc[-1] == live["staerke"], end
+
+
+def test_numpy_comparisons_count_in_run_score(indicators):
+    # dmi_bullish, macd_cross, macd_above_zero und bb_pct_low entstehen aus
+    # numpy-Vergleichen; sie müssen als Python-bool in den Score eingehen
+    live = TA_run.run(indicators)
+    assert all(v is None or type(v) is bool for v in live["signals"].values())
+    assert live["score"] == round(sum(TA_run.WEIGHTS[k] for k, v in live["signals"].items() if v), 1)